@@ -0,0 +1,90 @@
+"""Arena benchmark: SnakeArena tick time against the number of snakes, next to a naive all-bodies collision check.
+
+Each arena gets a square grid with about `--cells-per-snake` cells per snake and `--food-per-snake` food items each. Bots
+keep their heading while the next cell is free and otherwise turn towards a free neighbour; dead snakes respawn so the
+population stays constant. Before every tick the same deaths are also worked out the way a list-per-snake arena
+would (each head tested against every body list, O(snakes x total length)) and checked against the tick's result.
+
+    python games/snake/benchmarks/bench_arena.py --snakes 10 100 300 1000 --ticks 300
+"""
+import argparse
+import gc
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_engine  # noqa: E402
+
+
+def steer(arena, rng):
+    """Keeps each bot's heading if the cell ahead is free, else picks a free neighbour (if any)."""
+    board = arena.board
+    for snake in arena.snakes.values():
+        if not snake.alive: continue
+        x, y = snake.body[0]
+        dx, dy = snake_engine.SNAKE_DIRECTIONS[snake.direction]
+        if board.is_free(x + dx, y + dy) and rng.random() > 0.05: continue
+        options = [d for d, (dx, dy) in snake_engine.SNAKE_DIRECTIONS.items()
+                   if snake_engine.snake_can_turn(snake.moved_direction, d) and board.is_free(x + dx, y + dy)]
+        if options: arena.turn(snake.id, rng.choice(options))
+
+
+def naive_deaths(arena):
+    """Deaths as a list-based arena finds them: every new head against every (already moved-up) body list."""
+    moves = []
+    for snake in arena.snakes.values():
+        if not snake.alive: continue
+        dx, dy = snake_engine.SNAKE_DIRECTIONS[snake.direction]
+        head = (snake.body[0][0] + dx, snake.body[0][1] + dy)
+        body = list(snake.body) if head in arena.food else list(snake.body)[:-1]
+        moves.append((snake.id, head, body))
+    start = time.perf_counter()
+    width, height = arena.board.width, arena.board.height
+    dead = set()
+    for snake_id, head, _ in moves:
+        if not (0 <= head[0] < width and 0 <= head[1] < height) or any(head in body for _, _, body in moves) \
+                or any(other_head == head for other_id, other_head, _ in moves if other_id != snake_id):
+            dead.add(snake_id)
+    return dead, time.perf_counter() - start
+
+
+def run(snakes, ticks, cells_per_snake, food_per_snake, seed, naive):
+    side = int(math.sqrt(snakes * cells_per_snake))
+    arena = snake_engine.SnakeArena(side, side, max(1, int(snakes * food_per_snake)), seed=seed)
+    rng = random.Random(seed)
+    for _ in range(snakes): arena.join()
+    tick_ms = []; naive_ms = []; mismatches = 0; lengths = []
+    gc.collect()
+    for _ in range(ticks):
+        steer(arena, rng)
+        if naive: expected, seconds = naive_deaths(arena); naive_ms.append(seconds * 1000)
+        dead = arena.tick(); tick_ms.append(arena.stats['last_ms'])
+        if naive: mismatches += set(dead) != expected
+        lengths.append(sum(len(s.body) for s in arena.snakes.values() if s.alive))
+        for snake_id in dead: arena.respawn(snake_id)
+    return side, tick_ms, naive_ms, mismatches, sum(lengths) / len(lengths), arena.stats
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--snakes', type=int, nargs='+', default=[10, 100, 300, 1000])
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--cells-per-snake', type=int, default=100)
+    parser.add_argument('--food-per-snake', type=float, default=3)
+    parser.add_argument('--no-naive', action='store_true', help="skip the naive collision check (slow with many snakes)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'snakes':>6} {'grid':>9} {'body cells':>10} | {'tick mean':>10} {'tick p99':>9} {'tick max':>9} | {'naive mean':>10} {'match':>6} | deaths head-on")
+    for snakes in args.snakes:
+        side, tick_ms, naive_ms, mismatches, cells, stats = run(snakes, args.ticks, args.cells_per_snake, args.food_per_snake, args.seed, not args.no_naive)
+        ordered = sorted(tick_ms)
+        naive = f"{sum(naive_ms) / len(naive_ms):7.3f} ms {args.ticks - mismatches:>3d}/{args.ticks}" if naive_ms else f"{'-':>10} {'-':>6}"
+        print(f"{snakes:6d} {side:4d}x{side:<4d} {cells:10.0f} | {sum(tick_ms) / len(tick_ms):7.3f} ms {ordered[int(len(ordered) * 0.99)]:6.3f} ms "
+              f"{ordered[-1]:6.3f} ms | {naive} | {stats['deaths']:6d} {stats['head_on']:7d}")
+
+
+if __name__ == '__main__':
+    main_cli()
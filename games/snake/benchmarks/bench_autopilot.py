@@ -0,0 +1,87 @@
+"""Autopilot benchmark: game results and per-tick decision cost of SnakeAutopilot, cached paths vs. a search every tick.
+
+Plays `--games` classic games per grid size with the autopilot steering a SnakeEngine until it dies, fills the grid or
+runs out of `--max-steps` (counted as neither a win nor a death), once with the path cache and once searching from
+scratch every tick. Then fills a SnakeArena with `--bots` autopilot snakes (no Hamiltonian moves; dead bots respawn)
+and times all their decisions per tick. "bots/tick" divides the server's snake tick (`--tick-ms`) by the mean
+decision cost.
+
+    python games/snake/benchmarks/bench_autopilot.py --sizes 10 20 --games 20 --bots 50 200
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_autopilot  # noqa: E402
+import snake_engine  # noqa: E402
+
+
+def play(size, games, max_steps, seed, cache):
+    """Returns (scores, wins, deaths, decision times in ms, cache hit fraction)."""
+    scores = []; wins = 0; deaths = 0; samples = []; hits = 0; decisions = 0
+    for game in range(games):
+        engine = snake_engine.SnakeEngine(size, size, seed=seed + game)
+        pilot = snake_autopilot.SnakeAutopilot(engine.board, cache=cache)
+        gc.collect()
+        for _ in range(max_steps):
+            pilot.steer(engine); samples.append(pilot.stats['last_ms'])
+            engine.step()
+            if engine.is_over: break
+        scores.append(engine.score); wins += engine.won; deaths += engine.is_over and not engine.won
+        hits += pilot.stats['cache_hits']; decisions += pilot.stats['decisions']
+    return scores, wins, deaths, samples, hits / decisions
+
+
+def arena(bots, ticks, seed):
+    """Returns (mean ms to decide for every bot in one tick, max, mean live body cells, arena tick ms)."""
+    side = int((bots * 100) ** 0.5)
+    board_arena = snake_engine.SnakeArena(side, side, bots * 2, seed=seed)
+    pilots = {}
+    for _ in range(bots):
+        snake_id = board_arena.join()
+        if snake_id is not None: pilots[snake_id] = snake_autopilot.SnakeAutopilot(board_arena.board, use_cycle=False)
+    totals = []; cells = []; tick_ms = []
+    gc.collect()
+    for _ in range(ticks):
+        start = time.perf_counter()
+        for snake_id, pilot in pilots.items():
+            snake = board_arena.snakes[snake_id]
+            if not snake.alive: continue
+            direction = pilot.decide(snake.body, snake.moved_direction, board_arena.food)
+            if direction is not None: board_arena.turn(snake_id, direction)
+        totals.append((time.perf_counter() - start) * 1000)
+        for snake_id in board_arena.tick(): board_arena.respawn(snake_id)
+        tick_ms.append(board_arena.stats['last_ms'])
+        cells.append(sum(len(s.body) for s in board_arena.snakes.values() if s.alive))
+    return sum(totals) / len(totals), max(totals), sum(cells) / len(cells), sum(tick_ms) / len(tick_ms), side
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20])
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--max-steps', type=int, default=50000)
+    parser.add_argument('--bots', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--tick-ms', type=float, default=150.0, help="server snake tick (SNAKE_GAME_SPEED)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'grid':>7} {'cache':>5} | {'mean score':>10} {'max':>5} {'wins':>7} {'deaths':>6} | {'mean ms':>8} {'p99 ms':>7} {'max ms':>7} {'hits':>5} | {'bots/tick':>9}")
+    for size in args.sizes:
+        for cache in (True, False):
+            scores, wins, deaths, samples, hit_rate = play(size, args.games, args.max_steps, args.seed, cache)
+            ordered = sorted(samples); mean = sum(samples) / len(samples)
+            print(f"{size:3d}x{size:<3d} {'on' if cache else 'off':>5} | {sum(scores) / len(scores):10.1f} {max(scores):5d} {wins:3d}/{args.games:<3d} {deaths:6d} | "
+                  f"{mean:8.4f} {ordered[int(len(ordered) * 0.99)]:7.3f} {ordered[-1]:7.3f} {hit_rate:5.0%} | {args.tick_ms / mean:9,.0f}")
+    print(f"arena bots ({args.ticks} ticks, no cycle moves)")
+    print(f"{'bots':>5} {'grid':>7} {'body cells':>10} | {'decide ms/tick':>14} {'max':>7} | {'arena tick ms':>13} | {'share of tick':>13}")
+    for bots in args.bots:
+        mean, peak, cells, tick_ms, side = arena(bots, args.ticks, args.seed)
+        print(f"{bots:5d} {side:3d}x{side:<3d} {cells:10.0f} | {mean:14.3f} {peak:7.2f} | {tick_ms:13.3f} | {mean / args.tick_ms:13.1%}")
+
+
+if __name__ == '__main__':
+    main_cli()
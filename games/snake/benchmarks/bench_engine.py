@@ -0,0 +1,105 @@
+"""Snake engine benchmark: step and food-placement cost against grid size and fill, old list snake vs. SnakeEngine.
+
+The old snake is what both front ends did before snake_engine.py: a list body grown with insert(0, ...), self-collision
+by `new_head in body`, and food placed by drawing random cells until one misses the body. For every grid size and
+fill fraction a snake of that length is laid along a row-by-row serpentine, then driven further along it for `--steps`
+steps (timing one step each); food placement is timed separately on the same body.
+
+    python games/snake/benchmarks/bench_engine.py --sizes 20 100 1000 --fills 0.1 0.5 0.9
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_engine  # noqa: E402
+
+
+def serpentine(width, height):
+    """Cells row by row, alternating direction, so consecutive cells are always neighbours."""
+    for y in range(height):
+        for x in (range(width) if y % 2 == 0 else range(width - 1, -1, -1)): yield x, y
+
+
+class ListSnake:
+    """The old front ends' snake, kept here for comparison."""
+
+    def __init__(self, width, height, body, rng):
+        self.width = width; self.height = height; self.body = list(body); self.rng = rng
+        self.food = self.place_food()
+
+    def place_food(self):
+        while True:
+            cell = (self.rng.randint(0, self.width - 1), self.rng.randint(0, self.height - 1))
+            if cell not in self.body: return cell
+
+    def step_to(self, new_head):
+        if not (0 <= new_head[0] < self.width and 0 <= new_head[1] < self.height) or new_head in self.body: return False
+        self.body.insert(0, new_head)
+        if new_head == self.food: self.food = self.place_food()
+        else: self.body.pop()
+        return True
+
+
+def direction_between(a, b):
+    return {(0, -1): 'UP', (0, 1): 'DOWN', (-1, 0): 'LEFT', (1, 0): 'RIGHT'}[(b[0] - a[0], b[1] - a[1])]
+
+
+def time_steps(width, height, length, steps, seed, old):
+    """Mean and max microseconds per step while following the serpentine; returns (mean, max, steps run)."""
+    path = list(serpentine(width, height)); body = path[length - 1::-1]
+    steps = min(steps, len(path) - length)
+    rng = random.Random(seed); samples = []
+    if old:
+        snake = ListSnake(width, height, body, rng); gc.collect()  # Setup garbage would otherwise be collected mid-run
+        for k in range(steps):
+            start = time.perf_counter(); snake.step_to(path[length + k]); samples.append(time.perf_counter() - start)
+    else:
+        engine = snake_engine.SnakeEngine(width, height, seed=seed, body=body, direction=direction_between(body[1], body[0]) if length > 1 else 'RIGHT')
+        gc.collect()
+        for k in range(steps):
+            engine.turn(direction_between(engine.head, path[length + k]))
+            start = time.perf_counter(); engine.step(); samples.append(time.perf_counter() - start)
+            if engine.is_over: break
+    return sum(samples) / len(samples) * 1e6, max(samples) * 1e6, len(samples)
+
+
+def time_food(width, height, length, repeat, seed, old):
+    """Mean microseconds to place one food on a body of `length` cells."""
+    body = list(serpentine(width, height))[length - 1::-1]; rng = random.Random(seed)
+    if old:
+        snake = ListSnake(width, height, body, rng); place = snake.place_food
+    else:
+        engine = snake_engine.SnakeEngine(width, height, seed=seed, body=body)
+        def place(): return engine.board.random_free(rng)
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(repeat): place()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 300, 1000])
+    parser.add_argument('--fills', type=float, nargs='+', default=[0.1, 0.5, 0.9])
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--old-steps', type=int, default=100, help="steps for the old snake (slow on big grids)")
+    parser.add_argument('--food-repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'grid':>9} {'fill':>5} {'length':>8} | {'old step us':>11} {'new step us':>11} {'new max':>8} | {'old food us':>11} {'new food us':>11}")
+    for size in args.sizes:
+        for fill in args.fills:
+            length = max(2, int(size * size * fill))
+            old_mean, _, _ = time_steps(size, size, length, args.old_steps, args.seed, old=True)
+            new_mean, new_max, _ = time_steps(size, size, length, args.steps, args.seed, old=False)
+            old_food = time_food(size, size, length, max(1, args.food_repeat // 10), args.seed, old=True)
+            new_food = time_food(size, size, length, args.food_repeat, args.seed, old=False)
+            print(f"{size:4d}x{size:<4d} {fill:5.0%} {length:8d} | {old_mean:11.1f} {new_mean:11.2f} {new_max:8.1f} | {old_food:11.1f} {new_food:11.2f}")
+
+
+if __name__ == '__main__':
+    main_cli()
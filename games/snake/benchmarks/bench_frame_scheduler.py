@@ -0,0 +1,90 @@
+"""Frame loop benchmark: game speed under growing frame cost, chained `after(period)` vs. TkFrameScheduler.
+
+The chained loop is what SnakeGame.run_game did before tk_frame_scheduler: do the frame, then `after(GAME_SPEED, ...)`
+again. Each frame busy-waits `--work` ms (half in the step, half in the draw) and the loop runs for `--seconds`; the
+table shows game steps per second against the target of one per `--period`, frames drawn, and the scheduler's
+caught-up and dropped steps and wake-up lateness. Timers run on a small `after()` event loop standing in for Tk's, so no
+display is needed; its wake-ups are as punctual as time.sleep allows, which flatters neither loop.
+
+    python games/snake/benchmarks/bench_frame_scheduler.py --period 30 --work 0 10 25 40 100 --seconds 2
+"""
+import argparse
+import heapq
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tk_frame_scheduler  # noqa: E402
+
+
+class AfterLoop:
+    """The part of a Tk widget the frame loops use: `after`, `after_cancel` and a mainloop that stops at `until`."""
+
+    def __init__(self):
+        self.timers = []; self.cancelled = set(); self.ids = itertools.count()
+
+    def after(self, ms, callback):
+        timer_id = next(self.ids)
+        heapq.heappush(self.timers, (time.monotonic() + ms / 1000, timer_id, callback))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def run(self, until):
+        while self.timers:
+            due, timer_id, callback = heapq.heappop(self.timers)
+            if timer_id in self.cancelled: continue
+            if due > until: return
+            delay = due - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            callback()
+
+
+def busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end: pass
+
+
+def run_chained(period_ms, work_ms, seconds):
+    """Returns (steps, frames) of the old loop."""
+    loop = AfterLoop(); counts = {'steps': 0}
+
+    def frame():
+        busy(work_ms / 2); counts['steps'] += 1; busy(work_ms / 2)
+        loop.after(period_ms, frame)
+    loop.after(0, frame); loop.run(time.monotonic() + seconds)
+    return counts['steps'], counts['steps']
+
+
+def run_scheduled(period_ms, work_ms, seconds):
+    """Returns (steps, frames, scheduler stats)."""
+    loop = AfterLoop()
+    scheduler = tk_frame_scheduler.TkFrameScheduler(loop, period_ms, lambda: busy(work_ms / 2), lambda: busy(work_ms / 2))
+    scheduler.start(); loop.run(time.monotonic() + seconds); scheduler.stop()
+    stats = scheduler.stats
+    return stats['steps'], stats['frames'], stats
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--period', type=float, default=30.0, help="ms per game step (GAME_SPEED)")
+    parser.add_argument('--work', type=float, nargs='+', default=[0, 10, 25, 40, 100], help="ms of work per frame")
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+    target = 1000 / args.period
+    print(f"{args.period:g} ms period (target {target:.1f} steps/s), {args.seconds:g} s per run")
+    print(f"{'work ms':>7} | {'chained steps/s':>15} {'speed':>6} | {'scheduled steps/s':>17} {'speed':>6} {'frames/s':>8} "
+          f"{'caught up':>9} {'dropped':>7} {'late avg ms':>11}")
+    for work in args.work:
+        chained_steps, _ = run_chained(args.period, work, args.seconds)
+        steps, frames, stats = run_scheduled(args.period, work, args.seconds)
+        chained_rate = chained_steps / args.seconds; rate = steps / args.seconds
+        print(f"{work:7g} | {chained_rate:15.1f} {chained_rate / target:6.0%} | {rate:17.1f} {rate / target:6.0%} "
+              f"{frames / args.seconds:8.1f} {stats['caught_up']:9d} {stats['dropped_steps']:7d} {stats['late_avg_ms']:11.2f}")
+
+
+if __name__ == '__main__':
+    main_cli()
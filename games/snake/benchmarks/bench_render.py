@@ -0,0 +1,74 @@
+"""Tkinter render benchmark: frame time against snake length, full redraw vs. SnakeCanvasRenderer (needs a display).
+
+The full redraw is what SnakeGame.draw_game did before main.SnakeCanvasRenderer: canvas.delete("all") and one new
+rectangle per segment plus the food, every frame. For every length a snake is laid along a row-by-row serpentine of a
+`--grid` square grid and driven further along it for `--frames` frames; each frame is one engine step, the draw and
+`update_idletasks()`, so Tk's repaint is part of the time. Run it under Xvfb on a headless machine:
+
+    xvfb-run python games/snake/benchmarks/bench_render.py --lengths 10 500 2000 --frames 200
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+import snake_engine  # noqa: E402
+from bench_engine import direction_between, serpentine  # noqa: E402
+
+
+class FullRedraw:
+    """The old renderer, kept here for comparison."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def draw(self, engine):
+        self.canvas.delete("all")
+        for segment in engine.body:
+            self.canvas.create_rectangle(*main.grid_coords(segment), fill=main.SNAKE_COLOR, outline=main.BACKGROUND_COLOR)
+        if engine.food is not None:
+            self.canvas.create_rectangle(*main.grid_coords(engine.food), fill=main.FOOD_COLOR, outline=main.BACKGROUND_COLOR)
+
+
+def time_frames(root, size, length, frames, seed, renderer_class):
+    """Mean and max ms per frame for a snake of `length` on a `size` x `size` grid."""
+    canvas = tk.Canvas(root, width=size * main.GRID_SIZE, height=size * main.GRID_SIZE, bg=main.BACKGROUND_COLOR)
+    canvas.pack(); root.update()
+    path = list(serpentine(size, size)); body = path[length - 1::-1]
+    engine = snake_engine.SnakeEngine(size, size, seed=seed, body=body, direction=direction_between(body[1], body[0]))
+    renderer = renderer_class(canvas)
+    renderer.draw(engine); canvas.update_idletasks(); gc.collect()
+    samples = []
+    for k in range(min(frames, len(path) - length)):
+        engine.turn(direction_between(engine.head, path[length + k]))
+        start = time.perf_counter()
+        engine.step(); renderer.draw(engine); canvas.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+    canvas.destroy()
+    return sum(samples) / len(samples), max(samples)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 100, 500, 2000])
+    parser.add_argument('--grid', type=int, default=60, help="cells per side; must fit the longest snake plus --frames")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    root = tk.Tk()
+    print(f"{args.grid}x{args.grid} grid, {args.frames} frames")
+    print(f"{'length':>7} | {'full mean ms':>12} {'full max':>8} | {'incr mean ms':>12} {'incr max':>8}")
+    for length in args.lengths:
+        full_mean, full_max = time_frames(root, args.grid, length, args.frames, args.seed, FullRedraw)
+        incr_mean, incr_max = time_frames(root, args.grid, length, args.frames, args.seed, main.SnakeCanvasRenderer)
+        print(f"{length:7d} | {full_mean:12.3f} {full_max:8.2f} | {incr_mean:12.3f} {incr_max:8.2f}")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main_cli()
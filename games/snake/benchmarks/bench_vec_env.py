@@ -0,0 +1,88 @@
+"""Batched environment benchmark: SnakeVecEnv steps per second against the number of games, plus a rules check.
+
+Every game is driven by the same vectorized bot: of the three moves that do not reverse (straight, left, right) it
+picks a safe one, preferring moves towards the food, with random tie-breaks. Only `env.step` is timed, not the bot.
+
+The check plays `--check-games` games for `--check-steps` steps next to one SnakeEngine per game: each engine gets the
+batch's food cell and the same action, and its body, score and death must match the batch's after every step.
+
+    python games/snake/benchmarks/bench_vec_env.py --counts 256 4096 16384 --grid 20 20 --steps 500
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_engine  # noqa: E402
+import snake_vec_env  # noqa: E402
+
+
+def bot_actions(env, obs, rng):
+    """A safe move (straight, left or right of the last one) for every game, towards the food where it can."""
+    moves = np.stack([env.moved, snake_vec_env.SNAKE_VEC_LEFT_OF[env.moved], snake_vec_env.SNAKE_VEC_RIGHT_OF[env.moved]], axis=1)
+    rows = env.rows[:, None]
+    preference = (1 - obs[:, 0:3]) * 4.0 + obs[rows, 7 + moves] * 2.0 + rng.random(moves.shape)
+    return moves[env.rows, preference.argmax(axis=1)]
+
+
+def throughput(count, width, height, steps, seed):
+    """Returns (env steps per second, mean ms per batched step, episodes finished, mean finished score)."""
+    env = snake_vec_env.SnakeVecEnv(count, width, height, seed=seed)
+    rng = np.random.default_rng(seed); obs = env.observe(); elapsed = 0.0; scores = []
+    gc.collect()
+    for _ in range(steps):
+        actions = bot_actions(env, obs, rng)
+        start = time.perf_counter(); obs, _, dones, info = env.step(actions); elapsed += time.perf_counter() - start
+        scores.append(info['scores'][dones])
+    finished = np.concatenate(scores)
+    return count * steps / elapsed, elapsed / steps * 1000, len(finished), finished.mean() if len(finished) else 0.0
+
+
+def check(count, width, height, steps, seed):
+    """Steps the batch next to SnakeEngines; returns the number of (game, step) pairs that disagreed."""
+    env = snake_vec_env.SnakeVecEnv(count, width, height, seed=seed)
+    rng = np.random.default_rng(seed); obs = env.observe(); mismatches = 0
+    engines = [snake_engine.SnakeEngine(width, height) for _ in range(count)]
+    for _ in range(steps):
+        actions = bot_actions(env, obs, rng)
+        if rng.random() < 0.05: actions = rng.integers(0, 4, size=count)  # Now and then a reversal or a crash
+        for row, engine in enumerate(engines):
+            engine.food = divmod(int(env.food[row]), width)[::-1]
+            engine.turn(snake_vec_env.SNAKE_VEC_DIRECTIONS[actions[row]])
+            engine.step()
+        obs, _, dones, info = env.step(actions)
+        for row, engine in enumerate(engines):
+            if dones[row]:
+                mismatches += not engine.is_over or engine.score != info['scores'][row]
+                engines[row] = snake_engine.SnakeEngine(width, height)
+            else:
+                mismatches += engine.is_over or list(engine.body) != env.body_cells(row) or engine.score != env.score[row]
+    return mismatches
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[1, 64, 1024, 4096, 16384])
+    parser.add_argument('--grid', type=int, nargs=2, default=[20, 20], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--check-games', type=int, default=64)
+    parser.add_argument('--check-steps', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    width, height = args.grid
+    if args.check_games:
+        mismatches = check(args.check_games, width, height, args.check_steps, args.seed)
+        print(f"rules check: {args.check_games} games x {args.check_steps} steps against SnakeEngine, {mismatches} mismatches")
+    print(f"{width}x{height} grid, {args.steps} steps")
+    print(f"{'games':>6} | {'steps/s':>12} {'ms/step':>8} | {'episodes':>8} {'mean score':>10}")
+    for count in args.counts:
+        rate, ms, episodes, mean_score = throughput(count, width, height, args.steps, args.seed)
+        print(f"{count:6d} | {rate:12,.0f} {ms:8.3f} | {episodes:8d} {mean_score:10.1f}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -1,5 +1,8 @@
+import collections
 import tkinter as tk
-import random
+
+from snake_engine import SnakeEngine
+from tk_frame_scheduler import TkFrameScheduler
 
 # Game Constants
 WIDTH = 600
@@ -10,7 +13,76 @@ GRID_HEIGHT = HEIGHT // GRID_SIZE
 SNAKE_COLOR = "#33CC33"  # Green
 FOOD_COLOR = "#FF0000"   # Red
 BACKGROUND_COLOR = "#F0F0F0" # Light Gray
-GAME_SPEED = 150  # Milliseconds
+GAME_SPEED = 150  # Milliseconds per step, held by TkFrameScheduler whatever a frame costs
+FOOD_SCORE = 10
+KEY_DIRECTIONS = {"Up": "UP", "Down": "DOWN", "Left": "LEFT", "Right": "RIGHT"}
+FRAME_LOG_EVERY = 100  # Frames per logged frame-time line (15 s at GAME_SPEED)
+
+
+def grid_coords(pos):
+    x, y = pos
+    return x * GRID_SIZE, y * GRID_SIZE, (x + 1) * GRID_SIZE, (y + 1) * GRID_SIZE
+
+
+class SnakeCanvasRenderer:
+    """Keeps one canvas rectangle per body segment and moves them instead of redrawing the board.
+
+    `segments` holds the rectangle ids head first, like the engine's body, and `cells` the cell each one is drawn on.
+    TkFrameScheduler may run several steps before a draw, so `draw()` works out how many cells the snake advanced
+    since the last one (where the drawn head now sits in the body, checked against the new tail) and recycles that
+    many tail rectangles as new head cells, adding one for each cell it grew; the food rectangle is moved to the new
+    food. A frame costs a number of canvas operations proportional to the steps it covers, whatever the snake's length.
+    When the body no longer lines up with what was drawn, every rectangle is moved to its cell instead. After the canvas
+    has been cleared, `reset()` makes the next `draw()` build everything again.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.reset()
+
+    def reset(self):
+        self.segments = collections.deque()
+        self.cells = collections.deque()
+        self.food_item = None
+        self.drawn_food = None
+
+    def _advanced(self, body):
+        """Cells the head moved since the last draw, or None when the body does not continue the drawn snake."""
+        cells = self.cells; grown = len(body) - len(cells)
+        if not cells or grown < 0: return None
+        for advanced, cell in enumerate(body):
+            if advanced >= grown and cell == cells[0] and body[-1] == cells[len(body) - advanced - 1]: return advanced
+        return None
+
+    def _add(self, cell):
+        return self.canvas.create_rectangle(*grid_coords(cell), fill=SNAKE_COLOR, outline=BACKGROUND_COLOR)
+
+    def draw(self, engine):
+        body = engine.body; segments = self.segments; cells = self.cells; canvas = self.canvas
+        advanced = self._advanced(body)
+        if advanced is None:  # Nothing drawn yet, or more steps than the snake is long: move every rectangle
+            while len(segments) > len(body): canvas.delete(segments.pop())
+            for index, cell in enumerate(body):
+                if index < len(segments): canvas.coords(segments[index], *grid_coords(cell))
+                else: segments.append(self._add(cell))
+            self.cells = collections.deque(body)
+        else:  # The tail's rectangles become the new head cells; growth adds rectangles for the rest
+            recycled = [segments.pop() for _ in range(advanced - (len(body) - len(cells)))]
+            for _ in recycled: cells.pop()
+            for index in range(advanced - 1, -1, -1):
+                cell = body[index]
+                if recycled: item = recycled.pop(); canvas.coords(item, *grid_coords(cell))
+                else: item = self._add(cell)
+                segments.appendleft(item); cells.appendleft(cell)
+        if engine.food != self.drawn_food:
+            if engine.food is None:
+                canvas.delete(self.food_item); self.food_item = None
+            elif self.food_item is None:
+                self.food_item = canvas.create_rectangle(*grid_coords(engine.food), fill=FOOD_COLOR, outline=BACKGROUND_COLOR)
+            else:
+                canvas.coords(self.food_item, *grid_coords(engine.food))
+            self.drawn_food = engine.food
+
 
 class SnakeGame:
     def __init__(self, master):
@@ -32,6 +104,8 @@ class SnakeGame:
 
         self.game_over_label = None
         self.restart_button = None
+        self.renderer = SnakeCanvasRenderer(self.canvas)
+        self.scheduler = TkFrameScheduler(self.master, GAME_SPEED, self.move_snake, self.draw_frame)
 
         self.show_start_screen()
 
@@ -46,99 +120,64 @@ class SnakeGame:
 
 
     def initialize_game_state(self):
-        self.snake = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.snake_direction = "Right"
-        self.food_pos = self.generate_food()
-        self.score = 0
+        self.engine = SnakeEngine(GRID_WIDTH, GRID_HEIGHT, food_score=FOOD_SCORE)  # Shared with the web server's snake
         self.game_over = False
+        self.canvas.delete("all"); self.renderer.reset()
+        self.scheduler.take_window()
         self.update_score_display()
 
     def start_game_pressed(self):
         self.start_button.pack_forget()
         self.initialize_game_state()
         self.master.bind("<KeyPress>", self.on_key_press)
-        self.run_game()
-
-    def generate_food(self):
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            if (x, y) not in self.snake:
-                return (x, y)
-
-    def draw_grid_item(self, pos, color):
-        x, y = pos
-        self.canvas.create_rectangle(x * GRID_SIZE, y * GRID_SIZE,
-                                     (x + 1) * GRID_SIZE, (y + 1) * GRID_SIZE,
-                                     fill=color, outline=BACKGROUND_COLOR)
+        self.scheduler.start()
 
     def draw_game(self):
-        self.canvas.delete("all")
-        # Draw snake
-        for segment in self.snake:
-            self.draw_grid_item(segment, SNAKE_COLOR)
-        # Draw food
-        self.draw_grid_item(self.food_pos, FOOD_COLOR)
+        self.renderer.draw(self.engine)  # Moves existing rectangles; see SnakeCanvasRenderer
 
     def move_snake(self):
         if self.game_over:
             return
 
-        head_x, head_y = self.snake[0]
-
-        if self.snake_direction == "Up":
-            new_head = (head_x, head_y - 1)
-        elif self.snake_direction == "Down":
-            new_head = (head_x, head_y + 1)
-        elif self.snake_direction == "Left":
-            new_head = (head_x - 1, head_y)
-        elif self.snake_direction == "Right":
-            new_head = (head_x + 1, head_y)
-        else: # Should not happen
-            return
-
-        self.snake.insert(0, new_head)
-
-        # Check for collision with food
-        if new_head == self.food_pos:
-            self.score += 10
+        score = self.engine.score
+        self.engine.step()  # Wall and self collisions end the engine's game; eating places new food
+        if self.engine.score != score:
             self.update_score_display()
-            self.food_pos = self.generate_food()
-        else:
-            self.snake.pop()
-
-        # Check for collisions (wall or self)
-        if (new_head[0] < 0 or new_head[0] >= GRID_WIDTH or
-            new_head[1] < 0 or new_head[1] >= GRID_HEIGHT or
-            new_head in self.snake[1:]):
+        if self.engine.is_over:
             self.end_game()
 
     def update_score_display(self):
-        self.score_var.set(f"Score: {self.score}")
+        self.score_var.set(f"Score: {self.engine.score}")
 
     def on_key_press(self, event):
-        new_direction = event.keysym
-        if new_direction == "Up" and self.snake_direction != "Down":
-            self.snake_direction = "Up"
-        elif new_direction == "Down" and self.snake_direction != "Up":
-            self.snake_direction = "Down"
-        elif new_direction == "Left" and self.snake_direction != "Right":
-            self.snake_direction = "Left"
-        elif new_direction == "Right" and self.snake_direction != "Left":
-            self.snake_direction = "Right"
-
-    def run_game(self):
-        if self.game_over:
-            return
-        self.move_snake()
+        direction = KEY_DIRECTIONS.get(event.keysym)
+        if direction:
+            self.engine.turn(direction)  # Reversing onto the snake's own neck is ignored
+
+    def draw_frame(self):
         self.draw_game()
-        self.master.after(GAME_SPEED, self.run_game)
+        self.canvas.update_idletasks()  # Let Tk repaint now, so the scheduler's frame time includes the redraw
+        if len(self.scheduler.window) >= FRAME_LOG_EVERY:
+            self.log_frame_times()
+
+    def log_frame_times(self):
+        """Prints the frame times since the last call (every FRAME_LOG_EVERY frames and at game end)."""
+        times = self.scheduler.take_window()
+        if not times:
+            return
+        stats = self.scheduler.stats
+        print(f"Snake frames: {len(times)} at length {len(self.engine.body)}, "
+              f"avg {sum(times) / len(times):.2f} ms, max {max(times):.2f} ms; "
+              f"late wake-ups avg {stats['late_avg_ms']:.2f} ms, steps caught up {stats['caught_up']}, dropped {stats['dropped_steps']}")
 
     def end_game(self):
         self.game_over = True
         self.master.unbind("<KeyPress>")
+        self.scheduler.stop()
+        self.log_frame_times()
         self.canvas.delete("all")
-        self.game_over_label = tk.Label(self.master, text=f"Game Over! Your Score: {self.score}", font=("Arial", 18, "bold"), fg="red", bg=BACKGROUND_COLOR)
+        self.renderer.reset(); self.draw_game()  # The final position stays on the cleared canvas
+        self.game_over_label = tk.Label(self.master, text=f"Game Over! Your Score: {self.engine.score}", font=("Arial", 18, "bold"), fg="red", bg=BACKGROUND_COLOR)
         self.game_over_label.pack(pady=20)
 
         self.restart_button = tk.Button(self.master, text="Restart", font=("Arial", 14), command=self.restart_game)
@@ -0,0 +1,199 @@
+"""Autopilot for snakes on a SnakeBoard: steers a SnakeEngine (demo/attract mode) or an arena snake (bots, load tests).
+
+The snake heads for the nearest food along a breadth-first search path. The path is cached and reused tick after tick
+until that food is gone or the next cell on it is taken, so most ticks cost one occupancy lookup instead of a search.
+(A lone snake's own body never enters cells ahead of its head; only other snakes can block a path that was clear.)
+
+A snake alone on its grid also follows a Hamiltonian cycle of the grid (snake_hamiltonian_cycle). Its body always lies
+on the stretch of the cycle from its tail up to its head, and every move keeps it that way: a step along the food path
+is only taken as a shortcut when it lands ahead of the head in cycle order, not past the food and still
+SNAKE_AUTOPILOT_CYCLE_MARGIN cells short of the tail; otherwise the snake takes the cell after its head on the cycle, which is always free. Shortcuts run
+out as the grid fills, so a nearly full grid is finished on the cycle alone and the snake cannot trap itself.
+
+Without a cycle (arena snakes, or grids with no Hamiltonian cycle) a new path is only adopted if, with the body moved
+along it and grown by one, the new head can still reach the new tail (tail-following safety check). Failing that the
+snake chases its tail, and as a last resort takes the free neighbour opening onto the largest area.
+
+Cells are numbered y * width + x as on SnakeBoard. `stats` has the per-decision cost, so a tick budget can be divided
+by `avg_ms` to see how many bots one loop can drive.
+"""
+import collections
+import functools
+import time
+from array import array
+
+from snake_engine import SNAKE_DIRECTIONS
+
+SNAKE_AUTOPILOT_CYCLE_MARGIN = 4  # Free cells a cycle shortcut must leave ahead of the tail, so the growing body keeps room
+SNAKE_AUTOPILOT_TIMING_SMOOTHING = 0.1  # Weight of the newest decision in the moving-average decision time
+
+
+@functools.lru_cache(maxsize=8)
+def snake_hamiltonian_cycle(width, height):
+    """Position of every cell along a Hamiltonian cycle of the grid (an array indexed by cell), or None if there is none.
+
+    Row 0 runs left to right, the remaining rows snake back and forth over columns 1.., and column 0 leads back up to
+    the start. That needs an even number of rows; with an odd number the same is done on the transposed grid. A grid
+    with both sides odd (or a side of 1) has no Hamiltonian cycle.
+    """
+    if width < 2 or height < 2 or (width % 2 and height % 2): return None
+    transposed = height % 2 == 1
+    rows, cols = (width, height) if transposed else (height, width)
+    path = [(0, c) for c in range(cols)]
+    for r in range(1, rows):
+        path.extend((r, c) for c in (range(cols - 1, 0, -1) if r % 2 else range(1, cols)))
+    path.extend((r, 0) for r in range(rows - 1, 0, -1))
+    order = array('i', [0]) * (width * height)
+    for position, (r, c) in enumerate(path):
+        x, y = (r, c) if transposed else (c, r)
+        order[y * width + x] = position
+    return order
+
+
+@functools.lru_cache(maxsize=8)
+def snake_grid_neighbours(width, height):
+    """The up/down/left/right neighbours of every cell, inside the grid."""
+    neighbours = []
+    for cell in range(width * height):
+        y, x = divmod(cell, width)
+        neighbours.append(tuple(near for near, ok in ((cell - width, y > 0), (cell + width, y < height - 1), (cell - 1, x > 0), (cell + 1, x < width - 1)) if ok))
+    return neighbours
+
+
+class SnakeAutopilot:
+    """Picks directions for one snake on `board`. `decide()` works on any body deque; `steer()` drives a SnakeEngine.
+
+    `use_cycle` enables the Hamiltonian cycle; leave it off for a snake that shares its board (the cycle only keeps a
+    snake safe from itself). With `cache` False every decision searches from scratch, for comparison.
+    """
+
+    def __init__(self, board, use_cycle=True, cache=True):
+        self.board = board; self.width = board.width; self.cells = board.width * board.height
+        self.neighbours = snake_grid_neighbours(board.width, board.height)
+        self.cycle = snake_hamiltonian_cycle(board.width, board.height) if use_cycle else None
+        self.cache = cache
+        self.path = collections.deque(); self.target = None
+        self.stats = {'decisions': 0, 'cache_hits': 0, 'searches': 0, 'unsafe_paths': 0, 'cycle_moves': 0, 'tail_moves': 0,
+                      'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0}
+
+    def steer(self, engine):
+        """Turns `engine` for its next step; returns the chosen direction (None keeps the current one)."""
+        direction = self.decide(engine.body, engine.moved_direction, () if engine.food is None else (engine.food,))
+        if direction is not None: engine.turn(direction)
+        return direction
+
+    def decide(self, body, moved_direction, food):
+        """Direction for the snake whose `body` (head first) last moved `moved_direction`, given the food (x, y) cells.
+
+        Only the head and tail are read unless a new path has to be searched for and checked.
+        """
+        start = time.perf_counter()
+        width = self.width
+        head = body[0][1] * width + body[0][0]; tail = body[-1][1] * width + body[-1][0]
+        behind = self._behind(head, moved_direction)  # The neck, or for a one-cell snake the reversal the engine would ignore
+        step = None
+        if self.cycle is not None:
+            step = self._cycle_step(body, head, tail, food, behind)
+            if step == behind or (self.board.occupied[step] and step != tail): step = None  # Body not laid along the cycle
+        if step is None: step = self._free_step(body, head, tail, food, behind)
+        self._record((time.perf_counter() - start) * 1000)
+        return None if step is None else self._direction(head, step)
+
+    def _record(self, ms):
+        stats = self.stats; stats['decisions'] += 1; stats['last_ms'] = ms
+        stats['avg_ms'] = ms if stats['decisions'] == 1 else stats['avg_ms'] + (ms - stats['avg_ms']) * SNAKE_AUTOPILOT_TIMING_SMOOTHING
+        if ms > stats['max_ms']: stats['max_ms'] = ms
+
+    def _direction(self, head, cell):
+        delta = cell - head
+        return 'UP' if delta == -self.width else 'DOWN' if delta == self.width else 'LEFT' if delta == -1 else 'RIGHT'
+
+    def _behind(self, head, moved_direction):
+        dx, dy = SNAKE_DIRECTIONS[moved_direction]
+        return head - dy * self.width - dx
+
+    def _cached_step(self, head, food):
+        if not self.path: return None
+        step = self.path[0]
+        if self.target not in food or self.board.occupied[step] or step not in self.neighbours[head]:
+            self.path.clear(); self.target = None
+            return None
+        self.path.popleft(); self.stats['cache_hits'] += 1
+        return step
+
+    def _search(self, occupied, start, goals, forbidden):
+        """Cells after `start` up to the nearest goal through free cells (goals may be occupied), or None."""
+        neighbours = self.neighbours
+        parent = {start: start, forbidden: forbidden}; queue = collections.deque((start,))
+        while queue:
+            cell = queue.popleft()
+            for near in neighbours[cell]:
+                if near in parent: continue
+                parent[near] = cell
+                if near in goals:
+                    path = [near]
+                    while parent[path[-1]] != start: path.append(parent[path[-1]])
+                    return path[::-1]
+                if not occupied[near]: queue.append(near)
+        return None
+
+    def _food_step(self, body, head, food, behind, check_tail):
+        """First cell of a path to the nearest food, from the cache or a new search (cached when it passes the checks)."""
+        step = self._cached_step(head, food)
+        if step is not None or not food: return step
+        self.stats['searches'] += 1
+        width = self.width
+        path = self._search(self.board.occupied, head, {y * width + x for x, y in food}, behind)
+        if path is None: return None
+        if check_tail and not self._tail_reachable_after(body, path):
+            self.stats['unsafe_paths'] += 1
+            return None
+        if self.cache: self.path = collections.deque(path[1:]); self.target = divmod(path[-1], width)[::-1]
+        return path[0]
+
+    def _tail_reachable_after(self, body, path):
+        """True if, after moving along `path` and growing by one, the head can still reach the tail."""
+        if len(body) < 2: return True  # Two cells long: the tail is the neck, and any free neighbour will do
+        width = self.width; length = len(body) + 1
+        occupied = bytearray(self.board.occupied)
+        moved = path[::-1] + [y * width + x for x, y in body]
+        for cell in moved[length:]: occupied[cell] = 0
+        for cell in path: occupied[cell] = 1
+        return self._search(occupied, moved[0], {moved[length - 1]}, moved[1]) is not None
+
+    def _cycle_step(self, body, head, tail, food, behind):
+        """The food path's next cell if it is a safe shortcut along the cycle, else the cell after the head on the cycle.
+
+        A shortcut never lands past the food in cycle order, so the head closes in on the food every tick and reaches it
+        within one lap even when every shortcut is refused.
+        """
+        order = self.cycle; total = self.cells; at = order[head]; width = self.width
+        limit = ((order[tail] - at) % total or total) - SNAKE_AUTOPILOT_CYCLE_MARGIN  # Gaps below this stay short of the tail
+        if limit > 2:  # Room for a shortcut (a gap of 2 or more) at all
+            step = self._food_step(body, head, food, behind, check_tail=False)
+            if step is not None:
+                gap = (order[step] - at) % total
+                if 0 < gap < limit and gap <= min((order[y * width + x] - at) % total for x, y in food): return step  # Never past the food
+            self.path.clear(); self.target = None  # Leaving the path; the next search starts from the new head
+        self.stats['cycle_moves'] += 1
+        return next(near for near in self.neighbours[head] if (order[near] - at) % total == 1)
+
+    def _free_step(self, body, head, tail, food, behind):
+        step = self._food_step(body, head, food, behind, check_tail=True)
+        if step is not None: return step
+        if len(body) > 2:  # Chase the tail: it keeps moving out of the way
+            path = self._search(self.board.occupied, head, {tail}, behind)
+            if path is not None: self.stats['tail_moves'] += 1; return path[0]
+        return self._roomiest_step(head, behind)
+
+    def _roomiest_step(self, head, behind):
+        """Last resort: the free neighbour (other than `behind`) with the most free cells reachable from it."""
+        occupied = self.board.occupied; neighbours = self.neighbours; best = None; best_area = -1
+        for near in neighbours[head]:
+            if occupied[near] or near == behind: continue
+            seen = {near}; queue = collections.deque((near,))
+            while queue:
+                for cell in neighbours[queue.popleft()]:
+                    if cell not in seen and not occupied[cell]: seen.add(cell); queue.append(cell)
+            if len(seen) > best_area: best = near; best_area = len(seen)
+        return best
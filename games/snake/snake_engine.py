@@ -0,0 +1,238 @@
+"""Snake rules shared by the tkinter game (main.py here) and the web server (games/tank_game/main.py).
+
+SnakeEngine is the classic single snake; SnakeArena runs many snakes on one grid for the server's arena mode.
+
+Every operation a tick needs is O(1) whatever the snake's length or the grid's size:
+  - the body is a deque of (x, y) cells, head first, so growing at the head and dropping the tail never shift it;
+  - SnakeBoard keeps an occupancy bytearray (one byte per cell) for collision checks;
+  - SnakeBoard also keeps every free cell in an array, with a second array holding each cell's position in it, so a
+    cell is taken or released by swapping with the last entry and food lands on a uniformly random free cell in one
+    draw instead of retrying random cells until one misses the snake.
+"""
+import collections
+import random
+import time
+from array import array
+
+SNAKE_DIRECTIONS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+SNAKE_OPPOSITES = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+SNAKE_MOVED = 'moved'
+SNAKE_ATE = 'ate'
+SNAKE_DIED = 'died'
+SNAKE_WON = 'won'  # Ate the last free cell: the snake fills the grid
+SNAKE_ARENA_SPAWN_LENGTH = 3
+SNAKE_ARENA_SPAWN_ATTEMPTS = 50  # Random spots tried for a new snake before the arena counts as full
+SNAKE_ARENA_TIMING_SMOOTHING = 0.1  # Weight of the newest tick in SnakeArena's moving-average tick time
+
+
+def snake_can_turn(moved_direction, direction):
+    """True unless `direction` is unknown or would reverse the last move onto the snake's own neck."""
+    return direction in SNAKE_DIRECTIONS and direction != SNAKE_OPPOSITES[moved_direction]
+
+
+class SnakeBoard:
+    """Occupancy of a width x height grid. Cells are numbered y * width + x."""
+
+    def __init__(self, width, height):
+        self.width = width; self.height = height
+        self.occupied = bytearray(width * height)
+        self.free = array('i', range(width * height))  # Every free cell, in no particular order
+        self.where = array('i', range(width * height))  # Cell -> its index in `free`, -1 while occupied
+
+    def is_free(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and not self.occupied[y * self.width + x]
+
+    def occupy(self, x, y):
+        cell = y * self.width + x
+        self.occupied[cell] = 1
+        index = self.where[cell]; last = self.free.pop()
+        if last != cell: self.free[index] = last; self.where[last] = index
+        self.where[cell] = -1
+
+    def release(self, x, y):
+        cell = y * self.width + x
+        self.occupied[cell] = 0
+        self.where[cell] = len(self.free); self.free.append(cell)
+
+    def free_count(self):
+        return len(self.free)
+
+    def random_free(self, rng):
+        """A uniformly random free (x, y), or None when the grid is full."""
+        if not self.free: return None
+        return divmod(self.free[rng.randrange(len(self.free))], self.width)[::-1]
+
+
+class SnakeEngine:
+    """One snake on its own board. `step()` advances it one cell and returns SNAKE_MOVED/ATE/DIED/WON.
+
+    `body` (head first) and `direction` set the starting snake; by default it is one cell in the middle heading right.
+    Each food eaten adds `food_score` to `score`. `seed` fixes where food appears.
+    """
+
+    def __init__(self, width, height, seed=None, body=None, direction='RIGHT', food_score=1):
+        self.board = SnakeBoard(width, height)
+        self.rng = random.Random(seed)
+        self.food_score = food_score
+        self.body = collections.deque(body or [(width // 2, height // 2)])
+        for x, y in self.body: self.board.occupy(x, y)
+        self.direction = self.moved_direction = direction
+        self.score = 0
+        self.is_over = False
+        self.won = False
+        self.food = self.board.random_free(self.rng)
+
+    @property
+    def head(self):
+        return self.body[0]
+
+    def turn(self, direction):
+        """Sets the heading for the next step; a reversal onto the neck is ignored. Returns whether it took."""
+        if not snake_can_turn(self.moved_direction, direction): return False
+        self.direction = direction
+        return True
+
+    def step(self):
+        if self.is_over: return SNAKE_DIED
+        dx, dy = SNAKE_DIRECTIONS[self.direction]
+        x, y = self.body[0]; x += dx; y += dy
+        board = self.board; body = self.body
+        eating = (x, y) == self.food
+        if not eating:  # The tail moves out of the way first, so following it closely is allowed
+            tail = body.pop(); board.release(*tail)
+        if not board.is_free(x, y):
+            if not eating: body.append(tail); board.occupy(*tail)
+            self.is_over = True
+            return SNAKE_DIED
+        body.appendleft((x, y)); board.occupy(x, y)
+        self.moved_direction = self.direction
+        if not eating: return SNAKE_MOVED
+        self.score += self.food_score
+        self.food = board.random_free(self.rng)
+        if self.food is None:
+            self.is_over = self.won = True
+            return SNAKE_WON
+        return SNAKE_ATE
+
+    def snapshot(self):
+        """The snake's part of a state message: body as a list, food, score, direction and game-over flag."""
+        return {'snake_body': list(self.body), 'food_pos': self.food, 'score': self.score, 'direction': self.direction,
+                'is_game_over': self.is_over, 'grid_width': self.board.width, 'grid_height': self.board.height}
+
+
+class SnakeArenaSnake:
+    __slots__ = ('id', 'body', 'direction', 'moved_direction', 'score', 'alive')
+
+    def __init__(self, snake_id, body, direction):
+        self.id = snake_id; self.body = collections.deque(body)
+        self.direction = self.moved_direction = direction
+        self.score = 0; self.alive = True
+
+
+class SnakeArena:
+    """Many snakes on one grid, all advanced together by `tick()`.
+
+    Every body cell of every snake is marked on one shared SnakeBoard, so a tick costs O(snakes) whatever their total
+    length. Moves are simultaneous: tails that are not growing leave first, then each head is checked against the
+    board. Two or more heads entering the same cell is a head-on collision and kills all of them; so does a head entering
+    another snake's head, which by then is that snake's neck. Dead snakes leave the grid and keep their record (with
+    `alive` False) until removed. `food_count` food items are kept on the grid. `stats` holds per-tick timings.
+    """
+
+    def __init__(self, width, height, food_count, seed=None):
+        self.board = SnakeBoard(width, height)
+        self.rng = random.Random(seed)
+        self.food_count = food_count
+        self.food = set()
+        self.snakes = {}
+        self.next_id = 1
+        self.ticks = 0
+        self.stats = {'ticks': 0, 'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0, 'deaths': 0, 'head_on': 0}
+        self._top_up_food()
+
+    def _top_up_food(self):
+        board = self.board; food = self.food
+        for _ in range(SNAKE_ARENA_SPAWN_ATTEMPTS):
+            if len(food) >= self.food_count or board.free_count() <= len(food): return
+            cell = board.random_free(self.rng)
+            food.add(cell)
+
+    def _spawn_body(self):
+        board = self.board
+        for _ in range(SNAKE_ARENA_SPAWN_ATTEMPTS):
+            head = board.random_free(self.rng)
+            if head is None: return None, None
+            direction = self.rng.choice(tuple(SNAKE_DIRECTIONS))
+            dx, dy = SNAKE_DIRECTIONS[direction]
+            cells = [(head[0] - dx * i, head[1] - dy * i) for i in range(-1, SNAKE_ARENA_SPAWN_LENGTH)]  # One free cell ahead too
+            if all(board.is_free(x, y) and (x, y) not in self.food for x, y in cells): return cells[1:], direction
+        return None, None
+
+    def join(self):
+        """Spawns a snake on a free stretch of the grid; returns its id, or None when no room was found."""
+        body, direction = self._spawn_body()
+        if body is None: return None
+        snake = SnakeArenaSnake(self.next_id, body, direction); self.next_id += 1
+        for x, y in body: self.board.occupy(x, y)
+        self.snakes[snake.id] = snake
+        return snake.id
+
+    def respawn(self, snake_id):
+        """Puts a dead snake back on the grid under the same id (score reset). Returns False when there is no room."""
+        snake = self.snakes.get(snake_id)
+        if snake is None or snake.alive: return snake is not None
+        body, direction = self._spawn_body()
+        if body is None: return False
+        snake.body = collections.deque(body); snake.direction = snake.moved_direction = direction
+        snake.score = 0; snake.alive = True
+        for x, y in body: self.board.occupy(x, y)
+        return True
+
+    def remove(self, snake_id):
+        snake = self.snakes.pop(snake_id, None)
+        if snake is not None and snake.alive:
+            for x, y in snake.body: self.board.release(x, y)
+
+    def turn(self, snake_id, direction):
+        snake = self.snakes.get(snake_id)
+        if snake is None or not snake.alive or not snake_can_turn(snake.moved_direction, direction): return False
+        snake.direction = direction
+        return True
+
+    def tick(self):
+        """Advances every live snake one cell. Returns the ids of the snakes that died this tick."""
+        start = time.perf_counter()
+        board = self.board; food = self.food
+        moving = []; heads = {}
+        for snake in self.snakes.values():
+            if not snake.alive: continue
+            dx, dy = SNAKE_DIRECTIONS[snake.direction]
+            x, y = snake.body[0]; head = (x + dx, y + dy)
+            eating = head in food
+            if not eating: board.release(*snake.body.pop())  # Tails leave before any head arrives
+            moving.append((snake, head, eating)); heads[head] = heads.get(head, 0) + 1
+        dead = []
+        for snake, head, eating in moving:  # Decide every death before any dead body leaves the board
+            if heads[head] > 1: self.stats['head_on'] += 1
+            elif board.is_free(*head): continue
+            dead.append(snake); snake.alive = False
+        for snake in dead:
+            for x, y in snake.body: board.release(x, y)
+        for snake, head, eating in moving:
+            if not snake.alive: continue
+            snake.body.appendleft(head); board.occupy(*head); snake.moved_direction = snake.direction
+            if eating: food.discard(head); snake.score += 1
+        self._top_up_food()
+        self.ticks += 1; self.stats['deaths'] += len(dead)
+        self._record_tick((time.perf_counter() - start) * 1000)
+        return [snake.id for snake in dead]
+
+    def _record_tick(self, ms):
+        stats = self.stats; stats['ticks'] += 1; stats['last_ms'] = ms
+        stats['avg_ms'] = ms if stats['ticks'] == 1 else stats['avg_ms'] + (ms - stats['avg_ms']) * SNAKE_ARENA_TIMING_SMOOTHING
+        if ms > stats['max_ms']: stats['max_ms'] = ms
+
+    def snapshot(self):
+        """Arena state message: every snake (id, body, score, alive, direction), the food and the grid size."""
+        return {'snakes': [{'id': s.id, 'body': list(s.body), 'score': s.score, 'alive': s.alive, 'direction': s.direction} for s in self.snakes.values()],
+                'food': list(self.food), 'tick': self.ticks, 'grid_width': self.board.width, 'grid_height': self.board.height}
@@ -0,0 +1,149 @@
+"""Many classic snake games stepped together on NumPy arrays, for training and evaluating bots and for load generation.
+
+SnakeVecEnv runs `count` independent games of SnakeEngine's rules (snake_engine.py) on one width x height grid size:
+one snake starting as a single cell in the middle heading right, a reversal onto the neck ignored, the tail leaving
+before the head arrives, growth by one cell per food, food on a uniformly random free cell, and a win once the snake
+fills the grid. `step(actions)` takes one direction index per game (SNAKE_VEC_DIRECTIONS order) and advances them all
+with a fixed number of array operations, whatever the number of games.
+
+Layout, with cells numbered y * width + x as in SnakeBoard:
+  - `occupied` is a (count, cells) uint8 array, one row per game;
+  - each body is a ring buffer of cells in a (count, cells) int32 array: `head_index` points at the head and the tail
+    sits `length - 1` slots behind it, so a step writes one slot and moves the tail by arithmetic alone;
+  - food is drawn by SNAKE_VEC_FOOD_TRIES vectorized random draws per eating game, falling back to picking the k-th
+    free cell of its row only for games whose draws all landed on the snake (nearly full grids).
+Finished games are reset inside `step()`, so the observations it returns already belong to the next episode; the
+finished episodes' scores are in the returned info.
+"""
+import numpy as np
+
+from snake_engine import SNAKE_DIRECTIONS
+
+SNAKE_VEC_DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')  # Action index -> direction, as in game_wire.WIRE_SNAKE_DIRECTIONS
+SNAKE_VEC_DX = np.array([SNAKE_DIRECTIONS[d][0] for d in SNAKE_VEC_DIRECTIONS], dtype=np.int32)
+SNAKE_VEC_DY = np.array([SNAKE_DIRECTIONS[d][1] for d in SNAKE_VEC_DIRECTIONS], dtype=np.int32)
+SNAKE_VEC_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+SNAKE_VEC_LEFT_OF = np.array([2, 3, 1, 0], dtype=np.int8)  # Direction after turning left from UP/DOWN/LEFT/RIGHT
+SNAKE_VEC_RIGHT_OF = np.array([3, 2, 0, 1], dtype=np.int8)
+SNAKE_VEC_FOOD_TRIES = 8  # Random draws per eating game before falling back to the exact k-th free cell
+SNAKE_VEC_OBSERVATION_SIZE = 11
+
+
+class SnakeVecEnv:
+    """`count` snake games on width x height grids, stepped together.
+
+    `step(actions)` returns (observations, rewards, dones, info). Observations are SNAKE_VEC_OBSERVATION_SIZE uint8
+    features per game: danger straight ahead, to the left and to the right of the last move, the last move one-hot
+    (UP, DOWN, LEFT, RIGHT) and whether food lies up, down, left or right of the head. Rewards are `food_reward` for
+    eating and `-death_penalty` for dying. A game is done when the snake dies, fills the grid, or (with `max_steps`)
+    has run that many steps. info holds 'scores', 'won' and 'steps' of the games that finished, valid where done.
+    `grids()` renders full boards for callers that want more than the features.
+    """
+
+    def __init__(self, count, width, height, seed=None, food_reward=1.0, death_penalty=1.0, max_steps=None):
+        self.count = count; self.width = width; self.height = height; self.cells = width * height
+        self.food_reward = food_reward; self.death_penalty = death_penalty; self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(count)
+        self.base = self.rows * self.cells  # Offset of each game's row in the flattened arrays
+        self.occupied = np.zeros((count, self.cells), dtype=np.uint8)
+        self.body = np.zeros((count, self.cells), dtype=np.int32)
+        self.head_index = np.zeros(count, dtype=np.int32)
+        self.length = np.zeros(count, dtype=np.int32)
+        self.head_x = np.zeros(count, dtype=np.int32); self.head_y = np.zeros(count, dtype=np.int32)
+        self.food = np.zeros(count, dtype=np.int32)
+        self.moved = np.zeros(count, dtype=np.int8)
+        self.score = np.zeros(count, dtype=np.int32)
+        self.steps = np.zeros(count, dtype=np.int32)
+        self.total_steps = 0; self.episodes = 0
+        self._reset_rows(self.rows)
+
+    def reset(self):
+        self._reset_rows(self.rows)
+        return self.observe()
+
+    def _reset_rows(self, rows):
+        self.occupied[rows] = 0
+        x, y = self.width // 2, self.height // 2; cell = y * self.width + x
+        self.body[rows, 0] = cell; self.head_index[rows] = 0; self.length[rows] = 1
+        self.occupied[rows, cell] = 1
+        self.head_x[rows] = x; self.head_y[rows] = y
+        self.moved[rows] = SNAKE_VEC_DIRECTIONS.index('RIGHT')
+        self.score[rows] = 0; self.steps[rows] = 0
+        self.food[rows] = self._random_free(rows)
+
+    def _random_free(self, rows):
+        """A uniformly random free cell for each game in `rows` (none of them may be full)."""
+        flat = self.occupied.reshape(-1)
+        draws = self.rng.integers(0, self.cells, size=(len(rows), SNAKE_VEC_FOOD_TRIES), dtype=np.int32)
+        free = flat[self.base[rows, None] + draws] == 0
+        found = free.any(axis=1)
+        cells = draws[np.arange(len(rows)), free.argmax(axis=1)]
+        missed = np.flatnonzero(~found)
+        if len(missed):  # Rejection never landed: pick the k-th free cell of the row exactly
+            missed_rows = rows[missed]
+            free_rows = self.occupied[missed_rows] == 0
+            k = self.rng.integers(0, self.cells - self.length[missed_rows])
+            cells[missed] = (np.cumsum(free_rows, axis=1) > k[:, None]).argmax(axis=1)
+        return cells
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int8)
+        flat_occupied = self.occupied.reshape(-1); flat_body = self.body.reshape(-1)
+        direction = np.where(actions == SNAKE_VEC_OPPOSITE[self.moved], self.moved, actions)
+        x = self.head_x + SNAKE_VEC_DX[direction]; y = self.head_y + SNAKE_VEC_DY[direction]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        cell = np.where(inside, y * self.width + x, 0)
+        eating = inside & (cell == self.food)
+        tail = self.base + flat_body[self.base + (self.head_index - self.length + 1) % self.cells]
+        leaving = tail[~eating]
+        flat_occupied[leaving] = 0  # The tail moves out of the way first, so following it closely is allowed
+        dead = ~inside | (flat_occupied[self.base + cell] != 0)
+        flat_occupied[tail[dead & ~eating]] = 1  # A dying snake keeps its tail
+        alive = ~dead
+        head_index = np.where(alive, (self.head_index + 1) % self.cells, self.head_index)
+        moving = self.base[alive] + cell[alive]
+        flat_body[self.base[alive] + head_index[alive]] = cell[alive]; flat_occupied[moving] = 1
+        self.head_index = head_index
+        self.head_x = np.where(alive, x, self.head_x); self.head_y = np.where(alive, y, self.head_y)
+        self.moved = np.where(alive, direction, self.moved).astype(np.int8)
+        grew = eating & alive
+        self.length += grew; self.score += grew
+        won = grew & (self.length == self.cells)
+        placing = np.flatnonzero(grew & ~won)
+        if len(placing): self.food[placing] = self._random_free(placing)
+        self.steps += 1; self.total_steps += self.count
+        rewards = grew * np.float32(self.food_reward) - dead * np.float32(self.death_penalty)
+        dones = dead | won
+        if self.max_steps is not None: dones |= self.steps >= self.max_steps
+        info = {'scores': self.score.copy(), 'won': won, 'steps': self.steps.copy()}
+        finished = np.flatnonzero(dones)
+        if len(finished): self._reset_rows(finished); self.episodes += len(finished)
+        return self.observe(), rewards.astype(np.float32), dones, info
+
+    def _blocked(self, direction):
+        x = self.head_x + SNAKE_VEC_DX[direction]; y = self.head_y + SNAKE_VEC_DY[direction]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return ~inside | (self.occupied.reshape(-1)[self.base + np.where(inside, y * self.width + x, 0)] != 0)
+
+    def observe(self):
+        obs = np.zeros((self.count, SNAKE_VEC_OBSERVATION_SIZE), dtype=np.uint8)
+        moved = self.moved
+        obs[:, 0] = self._blocked(moved); obs[:, 1] = self._blocked(SNAKE_VEC_LEFT_OF[moved]); obs[:, 2] = self._blocked(SNAKE_VEC_RIGHT_OF[moved])
+        obs[self.rows, 3 + moved] = 1
+        food_y, food_x = np.divmod(self.food, self.width)
+        obs[:, 7] = food_y < self.head_y; obs[:, 8] = food_y > self.head_y
+        obs[:, 9] = food_x < self.head_x; obs[:, 10] = food_x > self.head_x
+        return obs
+
+    def body_cells(self, row):
+        """One game's body as (x, y) cells, head first, the way SnakeEngine.body holds it."""
+        slots = (self.head_index[row] - np.arange(self.length[row])) % self.cells
+        return [(int(c) % self.width, int(c) // self.width) for c in self.body[row, slots]]
+
+    def grids(self):
+        """(count, height, width) int8 boards: 0 empty, 1 body, 2 head, 3 food."""
+        grids = self.occupied.astype(np.int8)
+        grids[self.rows, self.food] = 3
+        grids[self.rows, self.head_y * self.width + self.head_x] = 2
+        return grids.reshape(self.count, self.height, self.width)
@@ -0,0 +1,77 @@
+"""Fixed-rate frame loop for tkinter games, on a monotonic clock instead of chained `after(period)` calls.
+
+Calling `after(period, ...)` again at the end of each frame makes the real period the delay plus the frame's own work,
+so a game slows down as its frames get heavier. TkFrameScheduler keeps a grid of deadlines, one `period_ms` apart on
+time.monotonic(), and asks Tk to wake it at the next one, so time spent working comes off the next delay. When a wake-up
+is late by more than a period (the work overran, or the event loop was busy), the game steps missed since then run
+back to back, up to `max_catchup` of them, and are drawn once; only a backlog beyond that is dropped. Game speed
+therefore holds under overload and only the frame rate gives.
+
+Used by the tkinter snake (main.py here). Another tkinter game can adopt it the way games/tank_game/main.py imports
+snake_engine: put games/snake on sys.path and import TkFrameScheduler.
+"""
+import math
+import time
+
+TK_FRAME_TIMING_SMOOTHING = 0.1  # Weight of the newest frame in the moving averages
+
+
+class TkFrameScheduler:
+    """Runs `step()` every `period_ms` and `draw()` after each batch of steps, on `widget`'s Tk event loop.
+
+    `start()` runs the first frame at once; `stop()` cancels the loop and may be called from inside `step()` (the batch
+    then ends without drawing). `stats` keeps running counts and timings: `frames` drawn, `steps` run, `caught_up`
+    steps run late in a batch (frames whose drawing was skipped), `dropped_steps` given up beyond `max_catchup`, and
+    work time (`last_ms`/`avg_ms`/`max_ms`) and wake-up lateness (`late_avg_ms`/`late_max_ms`) in milliseconds.
+    `take_window()` returns the work times of the frames since its previous call, for periodic log lines.
+    """
+
+    def __init__(self, widget, period_ms, step, draw=None, max_catchup=4):
+        self.widget = widget; self.period = period_ms / 1000
+        self.step = step; self.draw = draw; self.max_catchup = max_catchup
+        self.running = False; self.next_deadline = 0.0; self.after_id = None
+        self.window = []
+        self.stats = {'frames': 0, 'steps': 0, 'caught_up': 0, 'dropped_steps': 0, 'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0,
+                      'late_avg_ms': 0.0, 'late_max_ms': 0.0}
+
+    def start(self):
+        self.stop()
+        self.running = True; self.next_deadline = time.monotonic()
+        self._frame()
+
+    def stop(self):
+        self.running = False
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id); self.after_id = None
+
+    def take_window(self):
+        window = self.window; self.window = []
+        return window
+
+    def _frame(self):
+        self.after_id = None
+        if not self.running: return
+        now = time.monotonic(); stats = self.stats
+        late_ms = max(0.0, (now - self.next_deadline) * 1000)
+        steps = 0
+        while now >= self.next_deadline and steps < self.max_catchup:
+            self.step(); steps += 1; self.next_deadline += self.period
+            if not self.running: return
+        if now >= self.next_deadline:  # Still behind after catching up: give up the backlog rather than slow the game
+            missed = int((now - self.next_deadline) / self.period) + 1
+            stats['dropped_steps'] += missed; self.next_deadline += missed * self.period
+        if steps:
+            if self.draw is not None: self.draw()
+            ms = (time.monotonic() - now) * 1000
+            stats['steps'] += steps; stats['caught_up'] += steps - 1; self._record(ms, late_ms)
+            self.window.append(ms)
+        delay_ms = math.ceil(max(0.0, self.next_deadline - time.monotonic()) * 1000)  # Rounded up: an early wake-up only waits again
+        self.after_id = self.widget.after(delay_ms, self._frame)
+
+    def _record(self, ms, late_ms):
+        stats = self.stats; stats['frames'] += 1; stats['last_ms'] = ms
+        first = stats['frames'] == 1
+        stats['avg_ms'] = ms if first else stats['avg_ms'] + (ms - stats['avg_ms']) * TK_FRAME_TIMING_SMOOTHING
+        stats['late_avg_ms'] = late_ms if first else stats['late_avg_ms'] + (late_ms - stats['late_avg_ms']) * TK_FRAME_TIMING_SMOOTHING
+        if ms > stats['max_ms']: stats['max_ms'] = ms
+        if late_ms > stats['late_max_ms']: stats['late_max_ms'] = late_ms
@@ -0,0 +1,71 @@
+"""AI level-of-detail benchmark: tick time with many AI tanks, every tank thinking every tick vs. staggered thinks.
+
+Fills a level-5 battle with `--ai` AI tanks spread over the open cells of the arena and steps the engine with an idle
+player kept alive, so no tank dies and the level never ends. The "every tick" rows pin TANK_AI_THINK_INTERVALS to 1
+and lift the budget; the "lod" rows use the distance bands and a per-tick think budget of `--budget`. Reports mean
+and p99 tick time, the AI phase share and think updates per tick.
+
+    python games/tank_game/benchmarks/bench_ai_lod.py --ai 50 200 --ticks 2000 --budget 16
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+
+LEVEL = 5
+
+
+def crowd(eng, count, rng):
+    """Replaces the engine's AI tanks with `count` level-LEVEL tanks on random walkable cells away from the player."""
+    state = eng.state; eng.nav.sync(state['map']['obstacles'])
+    template = engine.tank_generate_level_layout(eng.seed, LEVEL)['ai_tanks'][0]
+    open_cells = [(r, c) for r in range(eng.nav.rows) for c in range(eng.nav.cols) if eng.nav.walkable[r, c]]
+    player = state['player_tank']; tanks = []
+    while len(tanks) < count:
+        x, y = eng.nav.cell_center(rng.choice(open_cells))
+        if math.hypot(x - player['x'], y - player['y']) < 150: continue
+        tanks.append(engine.TankAIBrain.strip(template, id=engine.tank_next_entity_id(state), x=x, y=y, angle=rng.uniform(0, 2 * math.pi)))
+    state['ai_tanks'] = tanks; state['ai_brains'] = {tank['id']: engine.TankAIBrain.from_layout(template) for tank in tanks}
+
+
+def run(count, ticks, seed, budget, every_tick):
+    intervals = engine.TANK_AI_THINK_INTERVALS
+    if every_tick: engine.TANK_AI_THINK_INTERVALS = ((math.inf, 1),)
+    try:
+        eng = engine.TankEngine(seed=seed, profile=True, levels=None, ai_think_budget=None if every_tick else budget)
+        crowd(eng, count, random.Random(seed))
+        samples = []
+        for _ in range(ticks):
+            start = time.perf_counter(); eng.step(); samples.append((time.perf_counter() - start) * 1000)
+            state = eng.state; state['is_over'] = False; state['player_tank']['status'] = 'active'  # Keep the battle going
+        return eng, sorted(samples)
+    finally:
+        engine.TANK_AI_THINK_INTERVALS = intervals
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ai', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--ticks', type=int, default=1000)
+    parser.add_argument('--budget', type=int, default=engine.TANK_AI_THINK_BUDGET)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    budget_ms = engine.TANK_GAME_LOOP_INTERVAL * 1000
+    print(f"{'AI tanks':>8} {'mode':<10} {'mean ms':>8} {'p99 ms':>8} {'ai phase':>9} {'thinks/tick':>12} {'deferred/tick':>14}")
+    for count in args.ai:
+        for label, every_tick in (('every tick', True), ('lod', False)):
+            eng, samples = run(count, args.ticks, args.seed, args.budget, every_tick)
+            mean = sum(samples) / len(samples); total = sum(eng.phase_ms.values())
+            print(f"{count:8d} {label:<10} {mean:8.3f} {samples[int(len(samples) * 0.99)]:8.3f} "
+                  f"{eng.phase_ms['ai'] / total if total else 0:9.1%} {eng.counters['ai_thinks'] / args.ticks:12.1f} "
+                  f"{eng.counters['ai_thinks_deferred'] / args.ticks:14.1f}")
+    print(f"(tick budget {budget_ms:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main_cli()
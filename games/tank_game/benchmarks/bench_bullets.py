@@ -0,0 +1,46 @@
+"""Tick-time benchmark for bullet-heavy tank rooms.
+
+Holds the arena at a fixed number of live bullets (topped up outside the timed region) and reports the mean and worst
+`tank_tick` time for each bullet count, next to the TANK_GAME_LOOP_INTERVAL budget.
+
+    python games/tank_game/benchmarks/bench_bullets.py --counts 1000 2000 5000 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+from bench_collision import top_up_bullets  # noqa: E402
+
+
+def run(count, ticks, seed):
+    rng = random.Random(seed); tick_rng = random.Random(seed + 1)
+    state = engine.tank_new_game_state(tick_rng); grid = engine.tank_new_spatial_grid(); samples = []
+    for _ in range(ticks):
+        top_up_bullets(state, count, rng)
+        state['is_over'] = False; state['player_tank']['status'] = 'active'
+        start = time.perf_counter()
+        engine.tank_tick(state, grid, tick_rng)
+        samples.append(time.perf_counter() - start)
+    return sum(samples) / len(samples) * 1000, max(samples) * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[500, 1000, 2000, 5000, 10000])
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    budget_ms = engine.TANK_GAME_LOOP_INTERVAL * 1000
+    print(f"tick budget {budget_ms:.0f} ms, {args.ticks} ticks per run")
+    for count in args.counts:
+        mean_ms, worst_ms = run(count, args.ticks, args.seed)
+        print(f"  {count:6d} bullets: mean {mean_ms:7.3f} ms/tick, worst {worst_ms:7.3f} ms ({mean_ms / budget_ms:5.1%} of budget)")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,107 @@
+"""Tick-time benchmark for tank collision detection: uniform spatial grid vs. the previous linear scans.
+
+Keeps the arena topped up with `--bullets` live bullets, runs `tank_tick` for `--ticks` ticks against each index with
+the same random seed, and checks both runs end in the same state (compared without entity ids).
+
+    python games/tank_game/benchmarks/bench_collision.py --bullets 600 --obstacles 40
+"""
+import argparse
+import copy
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+
+
+class TankLinearIndex:
+    """Same interface as TankSpatialGrid, but every query scans the whole layer (the pre-grid behaviour)."""
+    def __init__(self):
+        self.layers = {}
+
+    def build(self, name, entities, bbox_of=None):
+        self.layers[name] = (entities, bbox_of)
+
+    def source(self, name):
+        layer = self.layers.get(name)
+        return layer[0] if layer else None
+
+    def query(self, name, x, y, w, h):
+        entities, bbox_of = self.layers.get(name, ([], None))
+        hits = []
+        for entity in entities:
+            bbox = bbox_of(entity) if bbox_of else (entity['x'], entity['y'], entity['width'], entity['height'])
+            if engine.tank_check_aabb_collision({'x': x, 'y': y, 'width': w, 'height': h},
+                                              {'x': bbox[0], 'y': bbox[1], 'width': bbox[2], 'height': bbox[3]}):
+                hits.append(entity)
+        return hits
+
+    def any_hit(self, name, x, y, w, h):
+        return bool(self.query(name, x, y, w, h))
+
+
+def build_state(seed, extra_obstacles):
+    rng = random.Random(seed)
+    state = engine.tank_new_game_state(rng)
+    for _ in range(extra_obstacles):
+        w, h = rng.randint(20, 60), rng.randint(20, 60)
+        state['map']['obstacles'].append({'id': f'bench-{_}', 'x': rng.uniform(0, engine.TANK_GAME_CANVAS_WIDTH - w),
+                                          'y': rng.uniform(0, engine.TANK_GAME_CANVAS_HEIGHT * 0.5 - h), 'width': w, 'height': h})
+    return state
+
+
+def top_up_bullets(state, count, rng):
+    bullets = state['bullets']
+    while len(bullets) < count:
+        owner = engine.TANK_BULLET_OWNER_AI if rng.random() < 0.5 else engine.TANK_BULLET_OWNER_PLAYER
+        bullets.spawn(rng.uniform(1, engine.TANK_GAME_CANVAS_WIDTH - 1), rng.uniform(1, engine.TANK_GAME_CANVAS_HEIGHT - 1),
+                      rng.uniform(0, 2 * math.pi), engine.TANK_BULLET_SPEED, owner, '#fff')
+
+
+def run(index, template, ticks, bullets, seed):
+    state = copy.deepcopy(template)
+    ai_template = copy.deepcopy(template['ai_tanks']); brain_template = copy.deepcopy(template['ai_brains'])
+    rng = random.Random(seed); tick_rng = random.Random(seed + 1); elapsed = 0.0
+    for _ in range(ticks):
+        # Keep the scenario stationary: bullets stay topped up, the player survives and destroyed AI tanks respawn.
+        top_up_bullets(state, bullets, rng)
+        state['is_over'] = False; state['player_tank']['status'] = 'active'
+        if len(state['ai_tanks']) < len(ai_template): state['ai_tanks'] = copy.deepcopy(ai_template); state['ai_brains'] = copy.deepcopy(brain_template)
+        start = time.perf_counter()
+        engine.tank_tick(state, index, tick_rng)
+        elapsed += time.perf_counter() - start
+    return elapsed, state
+
+
+def strip_ids(value):
+    if isinstance(value, engine.TankBulletStore): return strip_ids(value.to_payload())
+    if isinstance(value, engine.TankAIBrain): return {name: getattr(value, name) for name in value.__slots__}
+    if isinstance(value, dict): return {k: strip_ids(v) for k, v in value.items() if k != 'id'}
+    if isinstance(value, list): return [strip_ids(v) for v in value]
+    return value
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=400)
+    parser.add_argument('--bullets', type=int, default=600)
+    parser.add_argument('--obstacles', type=int, default=40, help='extra obstacles on top of the generated map')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    template = build_state(args.seed, args.obstacles)
+    linear_time, linear_state = run(TankLinearIndex(), template, args.ticks, args.bullets, args.seed)
+    grid_time, grid_state = run(engine.tank_new_spatial_grid(), template, args.ticks, args.bullets, args.seed)
+
+    print(f"{args.bullets} bullets, {len(template['map']['obstacles'])} obstacles, {len(template['targets'])} targets, "
+          f"{len(template['ai_tanks'])} AI tanks, {args.ticks} ticks")
+    print(f"  linear scan : {linear_time / args.ticks * 1000:8.3f} ms/tick")
+    print(f"  spatial grid: {grid_time / args.ticks * 1000:8.3f} ms/tick  ({linear_time / grid_time:.1f}x)")
+    print(f"  same outcome: {strip_ids(linear_state) == strip_ids(grid_state)}")
+
+
+if __name__ == '__main__':
+    main_cli()
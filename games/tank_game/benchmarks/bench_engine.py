@@ -0,0 +1,99 @@
+"""Batch benchmark for the headless TankEngine: ticks/sec, per-phase cost and allocations per tick.
+
+Runs `--ticks` engine steps as fast as possible with a scripted player that turns towards the nearest AI tank and
+fires. A level that is not cleared within `--level-ticks` has its remaining AI tanks removed, so a run walks through
+many levels; a destroyed player restarts the battle. A second, shorter pass under tracemalloc measures memory
+allocated within each tick (peak above the pre-tick baseline) and the blocks still alive after it.
+
+    python games/tank_game/benchmarks/bench_engine.py --ticks 20000 --seed 3
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+
+PLAYER = 'bench'
+
+
+def bot_inputs(state, seq):
+    """One tick of scripted input: rotate towards the nearest AI tank, fire when roughly lined up, creep forward."""
+    player = state['player_tank']; targets = [t for t in state['ai_tanks'] if t['status'] == 'active']
+    if not targets or player['status'] != 'active': return {}
+    nearest = min(targets, key=lambda t: (t['x'] - player['x']) ** 2 + (t['y'] - player['y']) ** 2)
+    error = (math.atan2(nearest['y'] - player['y'], nearest['x'] - player['x']) - player['angle'] + math.pi) % (2 * math.pi) - math.pi
+    inputs = [(seq, 'rotate', 'right' if error > 0 else 'left')] if abs(error) > engine.TANK_ROTATION_SPEED / 2 else []
+    if abs(error) < 0.15: inputs.append((seq + 1, 'shoot', None))
+    inputs.append((seq + 2, 'move', 'forward'))
+    return {PLAYER: inputs}
+
+
+def run(ticks, seed, level_ticks, profile=True, on_tick=None, navigation=True, tick_interval=engine.TANK_GAME_LOOP_INTERVAL):
+    """Steps one engine `ticks` times; returns (engine, seconds, levels reached, restarts)."""
+    eng = engine.TankEngine(seed=seed, profile=profile, navigation=navigation, tick_interval=tick_interval)
+    seq = 0; level_start = 0; levels = 0; restarts = 0; level = eng.state['current_level']; elapsed = 0.0
+    for tick in range(ticks):
+        state = eng.state
+        if state['is_over']: eng.reset(); restarts += 1; level_start = tick; level = eng.state['current_level']
+        elif tick - level_start >= level_ticks: state['ai_tanks'] = []  # Force the level-up this tick
+        inputs = bot_inputs(eng.state, seq); seq += 3
+        if on_tick: on_tick(True)
+        start = time.perf_counter()
+        eng.step(inputs)
+        elapsed += time.perf_counter() - start
+        if on_tick: on_tick(False)
+        if eng.state['current_level'] != level: levels += 1; level = eng.state['current_level']; level_start = tick
+    return eng, elapsed, levels, restarts
+
+
+class AllocationProbe:
+    """Collects, per tick, the peak bytes allocated above the pre-tick level and the change in live blocks."""
+
+    def __init__(self):
+        self.peak_bytes = []; self.net_blocks = []; self._before = None
+
+    def __call__(self, before):
+        if before:
+            tracemalloc.reset_peak(); self._before = (tracemalloc.get_traced_memory()[0], sys.getallocatedblocks())
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_bytes.append(peak - self._before[0]); self.net_blocks.append(sys.getallocatedblocks() - self._before[1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--level-ticks', type=int, default=400, help="ticks before an uncleared level is forced to end")
+    parser.add_argument('--alloc-ticks', type=int, default=2000, help="ticks in the tracemalloc pass (0 to skip)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    eng, elapsed, levels, restarts = run(args.ticks, args.seed, args.level_ticks)
+    budget_ms = engine.TANK_GAME_LOOP_INTERVAL * 1000
+    print(f"{args.ticks} ticks in {elapsed:.2f} s: {args.ticks / elapsed:,.0f} ticks/sec "
+          f"({args.ticks * engine.TANK_GAME_LOOP_INTERVAL / elapsed:,.0f}x real time), "
+          f"{levels} level-ups, final level {eng.state['current_level']}, {restarts} restarts")
+    print(f"  {'phase':<9} {'total ms':>10} {'us/tick':>9} {'share':>7}")
+    total_ms = sum(eng.phase_ms.values())
+    for phase in engine.TANK_ENGINE_PHASES:
+        ms = eng.phase_ms[phase]
+        print(f"  {phase:<9} {ms:10.1f} {ms * 1000 / args.ticks:9.2f} {ms / total_ms if total_ms else 0:7.1%}")
+    print(f"  mean tick {elapsed * 1000 / args.ticks:.3f} ms ({elapsed * 1000 / args.ticks / budget_ms:.2%} of the {budget_ms:.0f} ms budget)")
+
+    if args.alloc_ticks:
+        probe = AllocationProbe()
+        tracemalloc.start()
+        try: run(args.alloc_ticks, args.seed, args.level_ticks, profile=False, on_tick=probe)
+        finally: tracemalloc.stop()
+        peaks = sorted(probe.peak_bytes)
+        print(f"allocations over {args.alloc_ticks} ticks (tracemalloc): "
+              f"mean {sum(peaks) / len(peaks) / 1024:.1f} KiB/tick allocated, p99 {peaks[int(len(peaks) * 0.99)] / 1024:.1f} KiB, "
+              f"max {peaks[-1] / 1024:.1f} KiB; live blocks {sum(probe.net_blocks) / len(probe.net_blocks):+.2f}/tick")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,54 @@
+"""Level-transition benchmark: generating a level inline vs. swapping in a layout prepared by TankLevelCache.
+
+For each level number, times the rejection-sampling generator (what a level-up used to cost inside the tick) against
+tank_advance_level with the layout already cached (what it costs once the worker has prefetched it).
+
+    python games/tank_game/benchmarks/bench_levels.py --levels 1 5 10 20 40 --repeat 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+
+
+def time_level_up(level, layout_seed, levels, repeat):
+    """Mean ms of tank_advance_level into `level`, on a battle state sitting at the level before it."""
+    samples = []
+    for _ in range(repeat):
+        state = engine.tank_new_game_state(random.Random(0)); state['layout_seed'] = layout_seed
+        state['current_level'] = level - 1
+        start = time.perf_counter()
+        engine.tank_advance_level(state, levels)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sum(samples) / len(samples), max(samples)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, nargs='+', default=[2, 5, 10, 20, 40])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'level':>5} {'inline mean':>12} {'inline max':>11} {'cached mean':>12} {'cached max':>11}")
+    for level in args.levels:
+        inline_mean, inline_max = time_level_up(level, args.seed, None, args.repeat)
+        cache = engine.TankLevelCache(background=False); cache.get(args.seed, level)  # Warm, as the worker would leave it
+        cached_mean, cached_max = time_level_up(level, args.seed, cache, args.repeat)
+        print(f"{level:5d} {inline_mean:9.3f} ms {inline_max:8.3f} ms {cached_mean:9.3f} ms {cached_max:8.3f} ms")
+
+    cache = engine.TankLevelCache()
+    eng = engine.TankEngine(seed=args.seed, levels=cache)
+    worst = 0.0
+    for _ in range(max(args.levels)):
+        time.sleep(0.01)  # Ticks are 50 ms apart on the server; give the worker a slice of that
+        eng.state['ai_tanks'] = []
+        start = time.perf_counter(); eng.step(); worst = max(worst, (time.perf_counter() - start) * 1000)
+    print(f"engine with background prefetch, {max(args.levels)} level-ups: worst level-up tick {worst:.3f} ms, cache {cache.get_stats()}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,154 @@
+"""Memory and allocation benchmark: pooled bullets vs. uuid4 bullet dicts, and slotted AI brains vs. countdown fields.
+
+Bullets are compared as per-bullet dicts with uuid4 ids against the pooled TankBulletStore, AI tanks with their
+countdowns on the entity dict against the same countdowns in a slotted TankAIBrain.
+
+Part 1 drives both bullet representations through the same `--ticks`-long firefight. Each tick spawns about
+`--spawn` bullets at random, moves every bullet, and drops the ones that leave the arena or, with chance `--hit`, hit
+something. The dict side is what bullets used to be: a fresh dict with a str(uuid.uuid4()) id per shot, moved one by
+one and filtered into a new list. tracemalloc records the bytes allocated within each tick (peak above the pre-tick
+level), and the resident bytes per live bullet at the end.
+
+Part 2 measures the resident bytes per AI tank both ways. It then runs the engine for `--ticks` ticks and sums the
+JSON bytes the ai_tanks part of the deltas would carry with the countdowns on the dicts and without them.
+
+    python games/tank_game/benchmarks/bench_memory.py --ticks 10000 --spawn 8
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+import tank_engine as engine  # noqa: E402
+from bench_engine import AllocationProbe, bot_inputs  # noqa: E402
+from tank_bullets import TankBulletStore  # noqa: E402
+
+W, H = engine.TANK_GAME_CANVAS_WIDTH, engine.TANK_GAME_CANVAS_HEIGHT
+
+
+class DictBullets:
+    """Bullets as a list of dicts with uuid4 ids, moved and filtered one by one (the pre-store representation)."""
+    def __init__(self): self.bullets = []
+    def __len__(self): return len(self.bullets)
+
+    def spawn(self, x, y, angle, speed, owner, color):
+        self.bullets.append({'id': str(uuid.uuid4()), 'x': x, 'y': y, 'angle': angle, 'speed': speed, 'owner': owner, 'color': color})
+
+    def step(self, hits):
+        kept = []
+        for i, b in enumerate(self.bullets):
+            b['x'] += b['speed'] * math.cos(b['angle']); b['y'] += b['speed'] * math.sin(b['angle'])
+            if 0 < b['x'] < W and 0 < b['y'] < H and i not in hits: kept.append(b)
+        self.bullets = kept
+
+
+class PooledBullets:
+    """The engine's TankBulletStore, stepped the way tank_tick does it (whole-array move, keep mask, compact)."""
+    def __init__(self): self.store = TankBulletStore()
+    def __len__(self): return len(self.store)
+    def spawn(self, *args): self.store.spawn(*args)
+
+    def step(self, hits):
+        keep, _ = self.store.advance(W, H, engine.TANK_BULLET_RADIUS, [])
+        if hits: keep[list(hits)] = False
+        self.store.compact(keep)
+
+
+def firefight(bullets, ticks, spawn, hit, seed, probe=None):
+    rng = random.Random(seed); speed = engine.TANK_BULLET_SPEED * engine.TANK_TICK_SCALE; elapsed = 0.0
+    for _ in range(ticks):
+        shots = [(rng.uniform(20, W - 20), rng.uniform(20, H - 20), rng.uniform(0, 2 * math.pi)) for _ in range(rng.randint(0, spawn * 2))]
+        hits = {i for i in range(len(bullets)) if rng.random() < hit}
+        if probe: probe(True)
+        start = time.perf_counter()
+        for x, y, angle in shots: bullets.spawn(x, y, angle, speed, 0, '#00FFFF')
+        bullets.step(hits)
+        elapsed += time.perf_counter() - start
+        if probe: probe(False)
+    return elapsed
+
+
+def resident_bytes(build, count):
+    """Traced bytes still held after build(count) and the object it returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]; kept = build(count)
+        return (tracemalloc.get_traced_memory()[0] - before) / count, kept
+    finally: tracemalloc.stop()
+
+
+def fill(representation):
+    def build(count):
+        bullets = representation(); rng = random.Random(0)
+        for _ in range(count): bullets.spawn(rng.uniform(0, W), rng.uniform(0, H), rng.uniform(0, 6.28), 14.0, 0, '#00FFFF')
+        return bullets
+    return build
+
+
+def ai_tank_dicts(count, with_brains):
+    layout = engine.tank_generate_level_layout(1, 5)['ai_tanks']; tanks = []; brains = []
+    for i in range(count):
+        entity = layout[i % len(layout)]
+        if with_brains: tanks.append(engine.TankAIBrain.strip(entity, id=i + 1)); brains.append(engine.TankAIBrain.from_layout(entity))
+        else: tanks.append(dict(entity, id=i + 1))
+    return tanks, brains
+
+
+def delta_bytes(ticks, seed):
+    """ai_tanks delta bytes over `ticks` engine ticks: (countdowns on the dicts, dicts as streamed now)."""
+    eng = engine.TankEngine(seed=seed); merged_prev = {}; plain_prev = {}; merged_bytes = plain_bytes = 0
+    for tick in range(ticks):
+        if eng.state['is_over']: eng.reset()
+        eng.step(bot_inputs(eng.state, tick * 3))
+        brains = eng.state['ai_brains']; merged = {}; plain = {}
+        for tank in eng.state['ai_tanks']:
+            brain = brains[tank['id']]
+            merged[tank['id']] = dict(tank, **{name: getattr(brain, name) for name in engine.TankAIBrain.__slots__})
+            plain[tank['id']] = dict(tank)
+        for prev, now, key in ((merged_prev, merged, 'm'), (plain_prev, plain, 'p')):
+            changed = [main.tank_diff_fields(prev[i], e) for i, e in now.items() if i in prev]
+            size = len(json.dumps([c for c in changed if c], separators=(',', ':')))
+            if key == 'm': merged_bytes += size
+            else: plain_bytes += size
+        merged_prev, plain_prev = merged, plain
+    return merged_bytes, plain_bytes
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--spawn', type=int, default=8, help="mean bullets fired per tick")
+    parser.add_argument('--hit', type=float, default=0.01, help="chance per tick that a live bullet hits something")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"bullets: {args.ticks} ticks, ~{args.spawn} shots/tick")
+    print(f"  {'representation':<16} {'time ms':>8} {'mean KiB/tick':>14} {'p99 KiB/tick':>13} {'max KiB/tick':>13} {'B/live bullet':>14}")
+    for label, representation in (('dict + uuid4', DictBullets), ('pooled store', PooledBullets)):
+        probe = AllocationProbe(); tracemalloc.start()
+        try: elapsed = firefight(representation(), args.ticks, args.spawn, args.hit, args.seed, probe)
+        finally: tracemalloc.stop()
+        untraced = firefight(representation(), args.ticks, args.spawn, args.hit, args.seed)
+        per_bullet, _ = resident_bytes(fill(representation), 2000)
+        peaks = sorted(probe.peak_bytes)
+        print(f"  {label:<16} {untraced * 1000:8.1f} {sum(peaks) / len(peaks) / 1024:14.2f} {peaks[int(len(peaks) * 0.99)] / 1024:13.2f} "
+              f"{peaks[-1] / 1024:13.2f} {per_bullet:14.1f}   (traced run {elapsed * 1000:.0f} ms)")
+
+    dict_bytes, _ = resident_bytes(lambda n: ai_tank_dicts(n, False), 2000)
+    brain_bytes, _ = resident_bytes(lambda n: ai_tank_dicts(n, True), 2000)
+    merged, plain = delta_bytes(args.ticks, args.seed)
+    print(f"AI tanks: {dict_bytes:.0f} B each with countdowns on the dict, {brain_bytes:.0f} B as dict + TankAIBrain")
+    print(f"  ai_tanks delta bytes over {args.ticks} engine ticks: {merged} with countdowns on the dicts, {plain} without "
+          f"({merged / args.ticks:.1f} -> {plain / args.ticks:.1f} B/tick)")
+
+
+if __name__ == '__main__':
+    main_cli()
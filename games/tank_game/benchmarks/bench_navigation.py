@@ -0,0 +1,51 @@
+"""AI navigation benchmark: flow-field hunting with line-of-sight fire vs. the old wandering, blind-firing AI.
+
+Runs the bench_engine scripted player against both AIs on the same seeds and reports, per 1000 ticks, the shots AI
+tanks fire, how many of them destroy the player, AI moves rolled back against obstacles, and the mean cost of the
+movement and AI phases. For the navigating AI it also reports how often the shared flow field was regrown and the
+line-of-sight cache hit rate.
+
+    python games/tank_game/benchmarks/bench_navigation.py --ticks 20000 --seeds 1 2 3
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_engine import run  # noqa: E402
+
+
+def measure(ticks, seeds, level_ticks, navigation):
+    totals = {'ai_shots': 0, 'ai_rollbacks': 0, 'player_hits': 0, 'movement': 0.0, 'ai': 0.0}; nav = {}
+    for seed in seeds:
+        eng, _, _, _ = run(ticks, seed, level_ticks, navigation=navigation)
+        for key in ('ai_shots', 'ai_rollbacks', 'player_hits'): totals[key] += eng.counters[key]
+        for key in ('movement', 'ai'): totals[key] += eng.phase_ms[key]
+        if eng.nav is not None:
+            for key, value in eng.nav.stats.items(): nav[key] = nav.get(key, 0) + value
+    return totals, nav
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--level-ticks', type=int, default=600, help="ticks before an uncleared level is forced to end")
+    args = parser.parse_args()
+    total_ticks = args.ticks * len(args.seeds); per_k = 1000 / total_ticks
+    print(f"{'AI':<10} {'shots/1k':>9} {'hits/1k':>8} {'hits/shot':>10} {'rollbacks/1k':>13} {'movement us':>12} {'ai us':>7}")
+    for label, navigation in (('wander', False), ('flowfield', True)):
+        totals, nav = measure(args.ticks, args.seeds, args.level_ticks, navigation)
+        shots = totals['ai_shots']
+        print(f"{label:<10} {shots * per_k:9.1f} {totals['player_hits'] * per_k:8.2f} "
+              f"{totals['player_hits'] / shots if shots else 0:10.2%} {totals['ai_rollbacks'] * per_k:13.1f} "
+              f"{totals['movement'] * 1000 / total_ticks:12.2f} {totals['ai'] * 1000 / total_ticks:7.2f}")
+        if nav:
+            print(f"  flow fields regrown {nav['flow_builds']} times ({nav['flow_builds'] / total_ticks:.2f}/tick) over "
+                  f"{nav['level_builds']} level grids; line-of-sight cache hits "
+                  f"{nav['los_cache_hits'] / nav['los_queries'] if nav['los_queries'] else 0:.1%} of {nav['los_queries']} queries")
+
+
+if __name__ == '__main__':
+    main_cli()
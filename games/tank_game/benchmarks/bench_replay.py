@@ -0,0 +1,80 @@
+"""Replay benchmark: log size and recording cost, whole-game replay time and seek time for tank_replay.py.
+
+Records `--ticks` engine steps driven by the scripted player from bench_engine.py (a destroyed player restarts the
+battle, so the log holds resets as well as inputs), then replays the log from its first keyframe and seeks to
+`--seeks` random ticks. Fingerprints of the live engine taken while recording are compared with the replayed ones.
+
+    python games/tank_game/benchmarks/bench_replay.py --ticks 36000 --seed 3
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+import tank_replay  # noqa: E402
+from bench_engine import bot_inputs  # noqa: E402
+
+
+def fingerprint(eng):
+    """Copy of everything the next tick depends on, comparable with == (bullets via their payload, brains as tuples)."""
+    state = {key: value for key, value in eng.state.items() if key not in ('bullets', 'ai_brains')}
+    brains = {key: tuple(getattr(brain, name) for name in brain.__slots__) for key, brain in eng.state['ai_brains'].items()}
+    return eng.ticks, eng.rng.getstate(), pickle.loads(pickle.dumps((state, brains, eng.state['bullets'].to_payload())))
+
+
+def record(path, ticks, seed, keyframe_interval, samples):
+    """Plays and records one battle; returns (recorder, recording seconds, restarts, {tick: fingerprint})."""
+    eng = engine.TankEngine(seed=seed)
+    recorder = eng.recorder = tank_replay.TankReplayRecorder(open(path, 'wb'), eng, keyframe_interval)
+    seq = 0; restarts = 0; prints = {}; elapsed = 0.0
+    for tick in range(ticks):
+        if eng.state['is_over']: eng.reset(); restarts += 1
+        if tick in samples: prints[tick] = fingerprint(eng)
+        inputs = bot_inputs(eng.state, seq); seq += 3
+        start = time.perf_counter(); eng.step(inputs); elapsed += time.perf_counter() - start
+    prints[ticks] = fingerprint(eng)
+    recorder.close(eng)
+    return recorder, elapsed, restarts, prints
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=18000, help="ticks to record (18000 is 30 minutes at 10 Hz)")
+    parser.add_argument('--keyframe-interval', type=int, default=tank_replay.TANK_REPLAY_KEYFRAME_INTERVAL)
+    parser.add_argument('--seeks', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    samples = sorted(random.Random(args.seed).sample(range(args.ticks), min(args.seeks, args.ticks)))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'battle.tkr')
+        recorder, recorded_s, restarts, prints = record(path, args.ticks, args.seed, args.keyframe_interval, set(samples))
+        size = os.path.getsize(path)
+        start = time.perf_counter(); replay = tank_replay.TankReplay.load(path); parse_ms = (time.perf_counter() - start) * 1000
+    stats = recorder.stats
+    print(f"recorded {args.ticks} ticks ({args.ticks * engine.TANK_GAME_LOOP_INTERVAL / 60:.1f} min of play, {restarts} restarts) "
+          f"in {recorded_s:.2f} s")
+    print(f"  log {size / 1024:.1f} KiB: {stats['input_records']} input records, {stats['keyframes']} keyframes "
+          f"({stats['keyframe_bytes'] / 1024:.1f} KiB, mean {stats['keyframe_bytes'] / stats['keyframes'] / 1024:.1f} KiB); "
+          f"{(size - stats['keyframe_bytes']) / args.ticks:.1f} B/tick without keyframes; parsed in {parse_ms:.1f} ms")
+
+    start = time.perf_counter(); final = replay.play(); replay_s = time.perf_counter() - start
+    print(f"whole-game replay: {replay_s:.2f} s ({args.ticks * engine.TANK_GAME_LOOP_INTERVAL / replay_s:,.0f}x real time), "
+          f"final state matches: {fingerprint(final) == prints[args.ticks]}")
+
+    seek_ms = []; matches = 0
+    for tick in samples:
+        start = time.perf_counter(); eng = replay.seek(tick); seek_ms.append((time.perf_counter() - start) * 1000)
+        matches += fingerprint(eng) == prints[tick]
+    seek_ms.sort()
+    print(f"{len(samples)} seeks: mean {sum(seek_ms) / len(seek_ms):.1f} ms, max {seek_ms[-1]:.1f} ms; "
+          f"{matches}/{len(samples)} match the live engine")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,81 @@
+"""Snake stream benchmark: bytes per tick of the keyframe/delta snake stream against a full snapshot every tick.
+
+For every snake length a body is laid along a row-by-row serpentine and driven further along it for `--ticks` ticks,
+with food put on the next cell every `--eat-every` ticks so deltas cover growing as well as moving. Each tick goes
+through main.snake_stream_next_frame; the frames are applied to a client-side copy the way static/js/snake_script.js
+does it and the copy is checked against the engine's body every tick.
+
+    python games/tank_game/benchmarks/bench_snake_stream.py --lengths 3 100 1000 10000 --ticks 500
+"""
+import argparse
+import collections
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+from snake_engine import SnakeEngine  # noqa: E402
+
+
+def serpentine(width, height):
+    for y in range(height):
+        for x in (range(width) if y % 2 == 0 else range(width - 1, -1, -1)): yield x, y
+
+
+def direction_between(a, b):
+    return {(0, -1): 'UP', (0, 1): 'DOWN', (-1, 0): 'LEFT', (1, 0): 'RIGHT'}[(b[0] - a[0], b[1] - a[1])]
+
+
+def apply_frame(client, event, payload):
+    """The client decoder: a keyframe replaces the copy, a delta must follow the previous seq. Returns False on a gap."""
+    if event == 'snake_update_state':
+        client.clear(); client.update(payload, snake_body=collections.deque(payload['snake_body'])); return True
+    if payload['seq'] != client['seq'] + 1: return False
+    if 'head' in payload:
+        client['snake_body'].appendleft(payload['head'])
+        if payload['tail_popped']: client['snake_body'].pop()
+    for key in ('food_pos', 'score', 'is_game_over', 'game_active'):
+        if key in payload: client[key] = payload[key]
+    client['seq'] = payload['seq']
+    return True
+
+
+def run(length, ticks, eat_every, seed):
+    """Returns (full snapshot bytes/tick, delta bytes list, stream bytes/tick, keyframes, ticks where the copy matched)."""
+    side = 2
+    while side * side < length + ticks * 2: side += 1
+    path = list(serpentine(side, side)); body = path[length - 1::-1]
+    engine = SnakeEngine(side, side, seed=seed, body=body, direction=direction_between(body[1], body[0]) if length > 1 else 'RIGHT')
+    stream = {'seq': 0, 'ticks_since_keyframe': 0, 'force_keyframe': True, 'food': None, 'score': None}
+    client = {}; full = 0; deltas = []; streamed = 0; keyframes = 0; matches = 0; cell = length
+    for tick in range(ticks):
+        if eat_every and tick % eat_every == 0: engine.food = path[cell]
+        engine.turn(direction_between(engine.head, path[cell])); cell += 1
+        step_event = engine.step()
+        event, payload = main.snake_stream_next_frame(stream, engine, step_event, not engine.is_over)
+        size = main.game_frame_bytes(event, payload); streamed += size
+        full += main.game_frame_bytes('snake_update_state', main.snake_snapshot(engine, not engine.is_over))
+        if event == 'snake_update_state': keyframes += 1
+        else: deltas.append(size)
+        matches += apply_frame(client, event, payload) and list(client['snake_body']) == list(engine.body) and client['score'] == engine.score
+        if engine.is_over: break
+    return full / ticks, deltas, streamed / ticks, keyframes, matches
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[3, 100, 1000, 10000])
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--eat-every', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"keyframe every {main.SNAKE_KEYFRAME_INTERVAL_TICKS} ticks")
+    print(f"{'length':>7} | {'full B/tick':>11} | {'delta mean':>10} {'delta max':>9} | {'stream B/tick':>13} {'saved':>6} | {'keyframes':>9} {'client match':>12}")
+    for length in args.lengths:
+        full, deltas, streamed, keyframes, matches = run(length, args.ticks, args.eat_every, args.seed)
+        print(f"{length:7d} | {full:11.0f} | {sum(deltas) / len(deltas):10.1f} {max(deltas):9d} | {streamed:13.1f} {1 - streamed / full:6.1%} | "
+              f"{keyframes:9d} {matches:>5d}/{args.ticks}")
+
+
+if __name__ == '__main__':
+    main_cli()
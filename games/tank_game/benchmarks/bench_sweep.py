@@ -0,0 +1,85 @@
+"""Swept vs. end-point bullet collision, and what halving the tick rate saves.
+
+Part 1 fires `--bullets` random shots through the obstacles and targets of real level layouts and records what each
+one hits first: a target, an obstacle or the arena edge. It steps the shots at the 20 Hz and at the 10 Hz per-tick
+speed, once testing only the end position of every tick and once sweeping the segment covered in the tick.
+Agreement is measured against the swept 20 Hz result. A swept path is the same line at any tick length, so both swept
+columns should agree fully, while end-point tests miss more the longer the step.
+
+Part 2 runs the bench_engine scripted battle for `--seconds` of game time at both tick rates and reports the
+simulation CPU spent per second of game time.
+
+    python games/tank_game/benchmarks/bench_sweep.py --bullets 20000 --levels 1 10 30 --seconds 300
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tank_engine as engine  # noqa: E402
+from bench_engine import run  # noqa: E402
+from tank_bullets import TankBulletStore, tank_boxes_array  # noqa: E402
+
+EDGE = -1
+
+
+def first_hits(layout, shots, speed, swept):
+    """For each (x, y, angle) shot, ('target', index), ('obstacle', index) or ('edge', -1), stepping at `speed` px/tick."""
+    bullets = TankBulletStore(len(shots)); r = engine.TANK_BULLET_RADIUS
+    for x, y, angle in shots: bullets.spawn(x, y, angle, speed, 0, '#fff')
+    targets = tank_boxes_array(layout['targets']); obstacles = layout['obstacles']; obstacle_boxes = tank_boxes_array(obstacles)
+    results = {}
+    while len(bullets):
+        keep, blocked_at = bullets.advance(engine.TANK_GAME_CANVAS_WIDTH, engine.TANK_GAME_CANVAS_HEIGHT, r, obstacles)
+        n = len(bullets); ids = bullets.ids[:n].tolist()
+        if swept:
+            target_t = bullets.sweep(targets, r); obstacle_t = bullets.sweep(obstacle_boxes, r) if len(obstacle_boxes) else np.full((n, 1), np.inf)
+            target_hit = target_t.min(axis=1) < blocked_at
+        else:  # End position only, the way bullets were tested before sweeping
+            target_t = np.where(bullets.overlaps(targets, r), 0.0, np.inf); obstacle_t = np.where(bullets.overlaps(obstacle_boxes, r), 0.0, np.inf)
+            x = bullets.x[:n]; y = bullets.y[:n]
+            inside = (x > 0) & (x < engine.TANK_GAME_CANVAS_WIDTH) & (y > 0) & (y < engine.TANK_GAME_CANVAS_HEIGHT)
+            blocked_at = np.where(~inside | np.isfinite(obstacle_t.min(axis=1)), 1.0, np.inf); keep = np.isinf(blocked_at)
+            target_hit = np.isfinite(target_t.min(axis=1))  # Targets were checked first on the same position
+        for i in np.nonzero(target_hit | ~keep)[0].tolist():
+            if target_hit[i]: results[ids[i]] = ('target', int(np.argmin(target_t[i])))
+            elif np.isfinite(obstacle_t[i].min()) and obstacle_t[i].min() <= blocked_at[i]: results[ids[i]] = ('obstacle', int(np.argmin(obstacle_t[i])))
+            else: results[ids[i]] = ('edge', EDGE)
+        keep &= ~target_hit
+        bullets.compact(keep)
+    return [results[i + 1] for i in range(len(shots))]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bullets', type=int, default=5000)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 10, 30])
+    parser.add_argument('--seconds', type=int, default=120, help="game time per tick rate in part 2")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    print(f"{'level':>5} {'px/tick 20Hz':>13} {'point 20Hz':>11} {'point 10Hz':>11} {'swept 20Hz':>11} {'swept 10Hz':>11}   (agreement with swept 20 Hz)")
+    for level in args.levels:
+        layout = engine.tank_generate_level_layout(args.seed, level)
+        shots = [(rng.uniform(5, engine.TANK_GAME_CANVAS_WIDTH - 5), rng.uniform(5, engine.TANK_GAME_CANVAS_HEIGHT - 5), rng.uniform(0, 2 * math.pi))
+                 for _ in range(args.bullets)]
+        speed = engine.TANK_BULLET_SPEED + level * 0.15
+        truth = first_hits(layout, shots, speed, True)
+        row = [first_hits(layout, shots, speed * scale, swept) for swept in (False, True) for scale in (1, 2)]
+        agree = [sum(a == b for a, b in zip(truth, result)) / len(truth) for result in row]
+        print(f"{level:5d} {speed:13.2f} {agree[0]:11.2%} {agree[1]:11.2%} {agree[2]:11.2%} {agree[3]:11.2%}")
+
+    for hz in (20, 10):
+        ticks = args.seconds * hz
+        eng, elapsed, levels, restarts = run(ticks, args.seed, int(20 * hz), profile=False, tick_interval=1 / hz)
+        print(f"{hz:3d} Hz: {ticks} ticks for {args.seconds} s of game time, {elapsed:.2f} s CPU -> "
+              f"{elapsed * 1000 / args.seconds:.2f} ms CPU per game second ({elapsed * 1000 / ticks:.3f} ms/tick, {levels} level-ups)")
+
+
+if __name__ == '__main__':
+    main_cli()
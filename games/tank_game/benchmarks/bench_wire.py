@@ -0,0 +1,97 @@
+"""Encode-time and payload-size benchmark: binary wire format (game_wire.py) vs. the JSON state dicts.
+
+Builds tank keyframes with `--bullets` live bullets and snake frames with `--snake-lengths` body segments, then times
+json.dumps (as Socket.IO sends it) against the binary encoder and compares frame sizes. The "json+uuid" column is the
+keyframe with 36-character uuid4 ids in place of the integer ids, i.e. what a keyframe cost before entity ids became
+per-room integers. Each binary frame is decoded again and checked against the source within the quantization step.
+
+    python games/tank_game/benchmarks/bench_wire.py --bullets 0 100 1000 --snake-lengths 10 400
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+import game_wire  # noqa: E402
+import tank_engine as engine  # noqa: E402
+from bench_collision import top_up_bullets  # noqa: E402
+
+
+def time_ms(func, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat): frame = func(payload)
+    return (time.perf_counter() - start) / repeat * 1000, frame
+
+
+def with_uuid_ids(payload):
+    ids = {}
+    def swap(entity): return dict(entity, id=ids.setdefault(entity['id'], str(uuid.uuid4())))
+    return dict(payload, ai_tanks=[swap(t) for t in payload['ai_tanks']], targets=[swap(t) for t in payload['targets']],
+                bullets=[dict(b, id=str(uuid.uuid4())) for b in payload['bullets']],
+                map={'obstacles': [swap(o) for o in payload['map']['obstacles']]})
+
+
+def json_frame(payload): return main.game_frame_bytes('tank_update_state', payload)
+
+
+def tank_payload(bullets, seed):
+    rng = random.Random(seed); tick_rng = random.Random(seed + 1)
+    state = engine.tank_new_game_state(tick_rng); grid = engine.tank_new_spatial_grid()
+    for _ in range(5):
+        top_up_bullets(state, bullets, rng); engine.tank_tick(state, grid, tick_rng)
+    top_up_bullets(state, bullets, rng)
+    return main.tank_keyframe_payload(state, 1)
+
+
+def snake_payload(length):
+    width = max(20, int(length ** 0.5) * 2 + 2)
+    body = [(x if y % 2 == 0 else width - 1 - x, y) for y in range(width) for x in range(width)][:length]
+    return {'snake_body': body, 'food_pos': (1, 1), 'score': length - 1, 'direction': 'RIGHT', 'is_game_over': False,
+            'game_active': True, 'grid_width': width, 'grid_height': width, 'grid_size': 20, 'seq': length}
+
+
+def check_tank(payload, decoded):
+    step = 1 / game_wire.WIRE_COORD_SCALE
+    pairs = [(payload['player_tank'], decoded['player_tank'])] + list(zip(payload['bullets'], decoded['bullets'])) + \
+        list(zip(payload['ai_tanks'], decoded['ai_tanks'])) + list(zip(payload['targets'], decoded['targets']))
+    return (len(decoded['bullets']) == len(payload['bullets']) and decoded['seq'] == payload['seq']
+            and all(abs(a['x'] - b['x']) <= step and abs(a['y'] - b['y']) <= step for a, b in pairs)
+            and all(a['id'] == b['id'] for a, b in pairs[1:]))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bullets', type=int, nargs='+', default=[0, 50, 200, 1000])
+    parser.add_argument('--snake-lengths', type=int, nargs='+', default=[3, 50, 400, 2000])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    print(f"tank_update_state keyframes ({args.repeat} encodes each)")
+    for count in args.bullets:
+        payload = tank_payload(count, args.seed)
+        json_ms, _ = time_ms(json_frame, payload, args.repeat)
+        uuid_bytes = json_frame(with_uuid_ids(payload))
+        bin_ms, frame = time_ms(game_wire.wire_encode_tank_keyframe, payload, args.repeat)
+        ok = check_tank(payload, game_wire.wire_decode_tank_keyframe(frame))
+        print(f"  {len(payload['bullets']):5d} bullets: json {json_frame(payload):7d} B {json_ms:6.3f} ms | json+uuid {uuid_bytes:7d} B | "
+              f"binary {len(frame):6d} B {bin_ms:6.3f} ms ({len(frame) / uuid_bytes:5.1%} of json+uuid) round-trip ok: {ok}")
+    print(f"snake_update_state frames ({args.repeat} encodes each)")
+    for length in args.snake_lengths:
+        payload = snake_payload(length)
+        json_ms, _ = time_ms(lambda p: main.game_frame_bytes('snake_update_state', p), payload, args.repeat)
+        bin_ms, frame = time_ms(game_wire.wire_encode_snake_state, payload, args.repeat)
+        decoded = game_wire.wire_decode_snake_state(frame)
+        ok = (decoded['snake_body'] == [tuple(p) for p in payload['snake_body']] and decoded['score'] == payload['score']
+              and decoded['seq'] == payload['seq'])
+        json_bytes = main.game_frame_bytes('snake_update_state', payload)
+        print(f"  {length:5d} segments: json {json_bytes:7d} B {json_ms:6.3f} ms | binary {len(frame):6d} B {bin_ms:6.3f} ms "
+              f"({len(frame) / json_bytes:5.1%} of json) round-trip ok: {ok}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,201 @@
+"""Compact binary encoding of the high-frequency state events.
+
+Clients that ask for it at connect time receive `tank_update_state` keyframes and `snake_update_state` frames as a
+single little-endian byte string instead of JSON. Every entity becomes a fixed-layout record: integer ids, coordinates
+quantized to 1/WIRE_COORD_SCALE px in an int16, angles mapped onto a uint16 turn, and repeated strings (colors,
+statuses) replaced by an index into a per-frame string table. Fields the client never reads (AI timers, speeds) are
+left out. static/js/wire_format.js is the browser-side decoder; the decoders here mirror it for tests and benchmarks.
+
+Frame layout: u8 kind, u8 version, then the kind's body.
+  tank keyframe: u32 seq, u32 score, u32 high_score, u16 level, u8 flags, strings, player, ai tanks, bullets, targets,
+                 obstacles, events (u16 count of u16-length text), input acks (u16 count of u8-length sid + u32 seq)
+  snake state:   u32 seq, u16 grid width, u16 grid height, u16 cell size, u32 score, u8 flags, u8 direction, u16 food x/y,
+                 u32 body length, body as u16 x/y pairs
+"""
+import math
+import struct
+
+import numpy as np
+
+WIRE_VERSION = 4
+WIRE_KIND_TANK_KEYFRAME = 1
+WIRE_KIND_SNAKE_STATE = 2
+WIRE_COORD_SCALE = 8  # int16 coordinates in 1/8 px cover -4096..4095 px
+WIRE_ANGLE_SCALE = 65536 / (2 * math.pi)
+WIRE_FLAG_OVER = 1
+WIRE_FLAG_ACTIVE = 2
+WIRE_SNAKE_DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+WIRE_BULLET_OWNERS = ('player', 'ai')
+
+_HEADER = struct.Struct('<BB')
+_TANK_HEAD = struct.Struct('<IIIHB')
+_PLAYER = struct.Struct('<hhHBB')
+_SNAKE_HEAD = struct.Struct('<IHHHIBBHHI')
+_U8 = struct.Struct('<B'); _U16 = struct.Struct('<H'); _U32 = struct.Struct('<I')
+
+WIRE_AI_TANK_DTYPE = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2'), ('angle', '<u2'), ('color', 'u1'), ('status', 'u1')])
+WIRE_BULLET_DTYPE = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2'), ('angle', '<u2'), ('owner', 'u1'), ('color', 'u1')])
+WIRE_TARGET_DTYPE = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2'), ('width', '<u2'), ('height', '<u2'), ('status', 'u1')])
+WIRE_OBSTACLE_DTYPE = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2'), ('width', '<u2'), ('height', '<u2')])
+
+
+def wire_quantize_coords(values):
+    return np.clip(np.rint(np.asarray(values, dtype=np.float64) * WIRE_COORD_SCALE), -32768, 32767).astype('<i2')
+
+
+def wire_quantize_angles(values):
+    return (np.rint(np.asarray(values, dtype=np.float64) % (2 * math.pi) * WIRE_ANGLE_SCALE).astype(np.int64) & 0xFFFF).astype('<u2')
+
+
+class WireStringTable:
+    """Per-frame table of repeated strings; records store the u8 index instead of the string."""
+
+    def __init__(self):
+        self.strings = []; self.index = {}
+
+    def ref(self, value):
+        value = '' if value is None else str(value)
+        found = self.index.get(value)
+        if found is None:
+            if len(self.strings) == 255: raise ValueError("wire string table is full")
+            found = self.index[value] = len(self.strings); self.strings.append(value)
+        return found
+
+    def refs(self, values): return [self.ref(v) for v in values]
+
+    def encode(self):
+        parts = [_U8.pack(len(self.strings))]
+        for value in self.strings:
+            raw = value.encode('utf-8')[:255]; parts.append(_U8.pack(len(raw))); parts.append(raw)
+        return b''.join(parts)
+
+
+def _records(dtype, entities, count_format, fill):
+    rows = np.zeros(len(entities), dtype=dtype)
+    if len(entities): fill(rows)
+    return count_format.pack(len(entities)) + rows.tobytes()
+
+
+def wire_encode_tank_keyframe(payload):
+    """Binary form of a tank keyframe payload (see tank_keyframe_payload). Entity ids must be integers."""
+    strings = WireStringTable()
+    player = payload['player_tank']; ai_tanks = payload['ai_tanks']; bullets = payload['bullets']; targets = payload['targets']
+    obstacles = payload['map']['obstacles']
+    flags = (WIRE_FLAG_OVER if payload.get('is_over') else 0) | (WIRE_FLAG_ACTIVE if payload.get('game_active') else 0)
+    head = _HEADER.pack(WIRE_KIND_TANK_KEYFRAME, WIRE_VERSION) + _TANK_HEAD.pack(
+        payload.get('seq', 0), payload['score'], payload['high_score'], payload['current_level'], flags)
+    player_raw = _PLAYER.pack(int(wire_quantize_coords(player['x'])), int(wire_quantize_coords(player['y'])),
+                              int(wire_quantize_angles(player['angle'])), strings.ref(player.get('color')), strings.ref(player.get('status')))
+
+    def fill_tanks(rows):
+        rows['id'] = [t['id'] for t in ai_tanks]
+        rows['x'] = wire_quantize_coords([t['x'] for t in ai_tanks]); rows['y'] = wire_quantize_coords([t['y'] for t in ai_tanks])
+        rows['angle'] = wire_quantize_angles([t['angle'] for t in ai_tanks])
+        rows['color'] = strings.refs(t.get('color') for t in ai_tanks); rows['status'] = strings.refs(t.get('status') for t in ai_tanks)
+
+    def fill_bullets(rows):
+        rows['id'] = [b['id'] for b in bullets]
+        rows['x'] = wire_quantize_coords([b['x'] for b in bullets]); rows['y'] = wire_quantize_coords([b['y'] for b in bullets])
+        rows['angle'] = wire_quantize_angles([b['angle'] for b in bullets])
+        rows['owner'] = [WIRE_BULLET_OWNERS.index(b['owner']) for b in bullets]; rows['color'] = strings.refs(b.get('color') for b in bullets)
+
+    def fill_targets(rows):
+        rows['id'] = [t['id'] for t in targets]
+        rows['x'] = wire_quantize_coords([t['x'] for t in targets]); rows['y'] = wire_quantize_coords([t['y'] for t in targets])
+        rows['width'] = [t['width'] for t in targets]; rows['height'] = [t['height'] for t in targets]
+        rows['status'] = strings.refs(t.get('status') for t in targets)
+
+    def fill_obstacles(rows):
+        rows['id'] = [o['id'] for o in obstacles]
+        rows['x'] = wire_quantize_coords([o['x'] for o in obstacles]); rows['y'] = wire_quantize_coords([o['y'] for o in obstacles])
+        rows['width'] = [o['width'] for o in obstacles]; rows['height'] = [o['height'] for o in obstacles]
+
+    body = [player_raw, _records(WIRE_AI_TANK_DTYPE, ai_tanks, _U16, fill_tanks), _records(WIRE_BULLET_DTYPE, bullets, _U32, fill_bullets),
+            _records(WIRE_TARGET_DTYPE, targets, _U16, fill_targets), _records(WIRE_OBSTACLE_DTYPE, obstacles, _U16, fill_obstacles)]
+    events = payload.get('game_events') or []
+    body.append(_U16.pack(len(events)))
+    for event in events:
+        raw = str(event).encode('utf-8')[:65535]; body.append(_U16.pack(len(raw))); body.append(raw)
+    acks = payload.get('input_acks') or {}
+    body.append(_U16.pack(len(acks)))
+    for sid, seq in acks.items():
+        raw = str(sid).encode('utf-8')[:255]; body.append(_U8.pack(len(raw))); body.append(raw); body.append(_U32.pack(seq & 0xFFFFFFFF))
+    return head + strings.encode() + b''.join(body)
+
+
+def wire_encode_snake_state(payload):
+    """Binary form of a `snake_update_state` payload."""
+    body = payload.get('snake_body') or []
+    food_x, food_y = payload.get('food_pos') or (0, 0)
+    flags = (WIRE_FLAG_OVER if payload.get('is_game_over') else 0) | (WIRE_FLAG_ACTIVE if payload.get('game_active') else 0)
+    direction = payload.get('direction')
+    head = _HEADER.pack(WIRE_KIND_SNAKE_STATE, WIRE_VERSION) + _SNAKE_HEAD.pack(
+        payload.get('seq', 0) & 0xFFFFFFFF, payload['grid_width'], payload['grid_height'], payload['grid_size'], payload.get('score', 0), flags,
+        WIRE_SNAKE_DIRECTIONS.index(direction) if direction in WIRE_SNAKE_DIRECTIONS else 255, food_x, food_y, len(body))
+    return head + np.array(body, dtype='<u2').reshape(-1, 2).tobytes()
+
+
+# --- Decoders (mirror static/js/wire_format.js) ---
+def _read_strings(data, offset):
+    count = data[offset]; offset += 1; strings = []
+    for _ in range(count):
+        length = data[offset]; offset += 1
+        strings.append(bytes(data[offset:offset + length]).decode('utf-8')); offset += length
+    return strings, offset
+
+
+def _read_records(dtype, data, offset, count_format):
+    count = count_format.unpack_from(data, offset)[0]; offset += count_format.size
+    rows = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+    return rows, offset + count * dtype.itemsize
+
+
+def _coord(value): return float(value) / WIRE_COORD_SCALE
+
+
+def _angle(value): return float(value) / WIRE_ANGLE_SCALE
+
+
+def wire_decode_tank_keyframe(data):
+    kind, version = _HEADER.unpack_from(data, 0); offset = _HEADER.size
+    if kind != WIRE_KIND_TANK_KEYFRAME or version != WIRE_VERSION: raise ValueError(f"not a v{WIRE_VERSION} tank keyframe")
+    seq, score, high_score, level, flags = _TANK_HEAD.unpack_from(data, offset); offset += _TANK_HEAD.size
+    strings, offset = _read_strings(data, offset)
+    px, py, pa, pc, ps = _PLAYER.unpack_from(data, offset); offset += _PLAYER.size
+    tanks, offset = _read_records(WIRE_AI_TANK_DTYPE, data, offset, _U16)
+    bullets, offset = _read_records(WIRE_BULLET_DTYPE, data, offset, _U32)
+    targets, offset = _read_records(WIRE_TARGET_DTYPE, data, offset, _U16)
+    obstacles, offset = _read_records(WIRE_OBSTACLE_DTYPE, data, offset, _U16)
+    events = []; event_count = _U16.unpack_from(data, offset)[0]; offset += 2
+    for _ in range(event_count):
+        length = _U16.unpack_from(data, offset)[0]; offset += 2
+        events.append(bytes(data[offset:offset + length]).decode('utf-8')); offset += length
+    acks = {}; ack_count = _U16.unpack_from(data, offset)[0]; offset += 2
+    for _ in range(ack_count):
+        length = data[offset]; offset += 1
+        sid = bytes(data[offset:offset + length]).decode('utf-8'); offset += length
+        acks[sid] = _U32.unpack_from(data, offset)[0]; offset += 4
+    return {'seq': seq, 'score': score, 'high_score': high_score, 'current_level': level,
+            'is_over': bool(flags & WIRE_FLAG_OVER), 'game_active': bool(flags & WIRE_FLAG_ACTIVE),
+            'player_tank': {'x': _coord(px), 'y': _coord(py), 'angle': _angle(pa), 'color': strings[pc], 'status': strings[ps]},
+            'ai_tanks': [{'id': int(r['id']), 'x': _coord(r['x']), 'y': _coord(r['y']), 'angle': _angle(r['angle']),
+                          'color': strings[r['color']], 'status': strings[r['status']]} for r in tanks],
+            'bullets': [{'id': int(r['id']), 'x': _coord(r['x']), 'y': _coord(r['y']), 'angle': _angle(r['angle']),
+                         'owner': WIRE_BULLET_OWNERS[r['owner']], 'color': strings[r['color']]} for r in bullets],
+            'targets': [{'id': int(r['id']), 'x': _coord(r['x']), 'y': _coord(r['y']), 'width': int(r['width']),
+                         'height': int(r['height']), 'status': strings[r['status']]} for r in targets],
+            'map': {'obstacles': [{'id': int(r['id']), 'x': _coord(r['x']), 'y': _coord(r['y']), 'width': int(r['width']),
+                                   'height': int(r['height'])} for r in obstacles]},
+            'game_events': events, 'input_acks': acks}
+
+
+def wire_decode_snake_state(data):
+    kind, version = _HEADER.unpack_from(data, 0); offset = _HEADER.size
+    if kind != WIRE_KIND_SNAKE_STATE or version != WIRE_VERSION: raise ValueError(f"not a v{WIRE_VERSION} snake frame")
+    seq, width, height, size, score, flags, direction, food_x, food_y, length = _SNAKE_HEAD.unpack_from(data, offset)
+    offset += _SNAKE_HEAD.size
+    body = np.frombuffer(data, dtype='<u2', count=length * 2, offset=offset).reshape(-1, 2).tolist()
+    return {'seq': seq, 'grid_width': width, 'grid_height': height, 'grid_size': size, 'score': score,
+            'is_game_over': bool(flags & WIRE_FLAG_OVER), 'game_active': bool(flags & WIRE_FLAG_ACTIVE),
+            'direction': WIRE_SNAKE_DIRECTIONS[direction] if direction < len(WIRE_SNAKE_DIRECTIONS) else None,
+            'food_pos': [food_x, food_y], 'snake_body': [tuple(p) for p in body]}
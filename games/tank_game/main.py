@@ -1,223 +1,724 @@
-from flask import Flask, render_template
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify
+from flask_socketio import SocketIO, join_room, leave_room
+import os
+import re
+import struct
+import sys
 import time
 import threading
-import uuid
-import math
 import random
+import json
+import collections
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir,'snake')) # games/snake holds the snake engine shared with the tkinter game
+from snake_engine import SNAKE_DIED, SNAKE_MOVED, SnakeArena, SnakeEngine
+from snake_autopilot import SnakeAutopilot
+from game_wire import wire_encode_tank_keyframe, wire_encode_snake_state
+from tank_replay import TankReplayRecorder
+from tank_engine import TankEngine, TankLevelCache, tank_client_config, TANK_GAME_LOOP_INTERVAL, TANK_INPUT_ACTIONS, TANK_PRIVATE_STATE_KEYS
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 app.config['SECRET_KEY'] = 'a_very_secret_key_for_all_games!'
-socketio = SocketIO(app)
+socketio = SocketIO(app, async_mode='threading')  # The game loops, schedulers and client send queues are OS threads on threading locks and conditions
+
+# --- Lock Hold-Time Histograms ---
+# Every game lock is a GameTimedLock, so time spent holding it (and therefore blocking other handlers) shows up per game.
+LOCK_HOLD_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50)  # Upper bounds in ms; a final bucket catches everything slower
+lock_hold_stats_lock = threading.Lock()
+lock_hold_stats = {}  # game -> {'buckets': [...], 'count': n, 'total_ms': t, 'max_ms': m}
+
+def game_record_lock_hold(game, held_ms):
+    bucket = 0
+    while bucket < len(LOCK_HOLD_BUCKETS_MS) and held_ms > LOCK_HOLD_BUCKETS_MS[bucket]: bucket += 1
+    with lock_hold_stats_lock:
+        stats = lock_hold_stats.get(game)
+        if stats is None: stats = lock_hold_stats[game] = {'buckets': [0] * (len(LOCK_HOLD_BUCKETS_MS) + 1), 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        stats['buckets'][bucket] += 1; stats['count'] += 1; stats['total_ms'] += held_ms
+        if held_ms > stats['max_ms']: stats['max_ms'] = held_ms
+
+def game_get_lock_hold_stats():
+    labels = [f"<={bound}ms" for bound in LOCK_HOLD_BUCKETS_MS] + [f">{LOCK_HOLD_BUCKETS_MS[-1]}ms"]
+    with lock_hold_stats_lock:
+        return {game: {'histogram': [[label, count] for label, count in zip(labels, stats['buckets'])], 'count': stats['count'],
+                       'avg_ms': round(stats['total_ms'] / stats['count'], 4) if stats['count'] else 0.0, 'max_ms': round(stats['max_ms'], 4)}
+                for game, stats in lock_hold_stats.items()}
+
+class GameTimedLock:
+    """threading.Lock that records how long each acquisition was held into its game's hold-time histogram."""
+    def __init__(self, game):
+        self.game = game
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired: self._acquired_at = time.perf_counter()
+        return acquired
+
+    def release(self):
+        held_ms = (time.perf_counter() - self._acquired_at) * 1000
+        self._lock.release()
+        game_record_lock_hold(self.game, held_ms)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
 
 # --- Tank Game Constants & State ---
-TANK_GAME_CANVAS_WIDTH = 800; TANK_GAME_CANVAS_HEIGHT = 600; TANK_SPEED = 3; TANK_ROTATION_SPEED = 0.1; TANK_BULLET_SPEED = 7; TANK_GAME_LOOP_INTERVAL = 0.05; TANK_TARGET_HIT_SCORE = 10; TANK_AI_DESTROYED_SCORE_BASE = 50; TANK_MAX_GAME_EVENTS = 4; TANK_COLLISION_RADIUS = 15; TANK_BODY_WIDTH = 20; TANK_BODY_HEIGHT = 30; TANK_TURRET_LENGTH = 20; TANK_BULLET_RADIUS = 3; TANK_BASE_NUM_AI = 1; TANK_MAX_AI_TANKS = 5; TANK_BASE_AI_SPEED = 1.0; TANK_MAX_AI_SPEED = 2.5; TANK_BASE_AI_MAX_SHOOT_COOLDOWN = 200; TANK_MIN_AI_MAX_SHOOT_COOLDOWN = 70; TANK_BASE_AI_MOVE_TIMER = 120; TANK_MIN_AI_MOVE_TIMER = 50; TANK_NUM_DUMMY_TARGETS = 3;
+TANK_ROOM_PREFIX = 'tank:'  # Socket.IO room names for tank battles are prefixed so they never clash with other games
+TANK_TICK_STATS_SMOOTHING = 0.1  # Weight of the newest sample in each room's moving-average tick metrics
+TANK_BROADCAST_INTERVAL = TANK_GAME_LOOP_INTERVAL  # Seconds between frames sent to a room, set apart from the simulation tick; never faster than it
+TANK_MAX_CATCHUP_STEPS = 4  # Simulation steps the scheduler may run back-to-back when late; beyond that the backlog is dropped
+TANK_TICK_METRICS = ('sim_ms', 'snapshot_ms', 'serialize_ms', 'emit_ms', 'lock_wait_ms')  # Per-room timings kept as last/avg/max
+TANK_KEYFRAME_INTERVAL_TICKS = 50  # A full tank_update_state keyframe is forced at least this often (5 s at 10 Hz); deltas go out in between
+TANK_DELTA_ENTITY_KEYS = ('ai_tanks', 'targets')  # Id-keyed entity lists diffed into created/changed/removed; bullets diff from their arrays
+TANK_DELTA_SCALAR_KEYS = ('score', 'current_level', 'is_over', 'high_score', 'game_events', 'input_acks')  # Sent only when they change
+TANK_STREAM_STATS_WINDOW = 1.0  # Seconds per bytes-per-second measurement window
+TANK_DELTA_FLOAT_DIGITS = 2  # Changed float fields are rounded in deltas; each delta carries absolute values, so nothing accumulates
+TANK_REPLAY_DIR = os.environ.get('TANK_REPLAY_DIR') or None  # Opt-in: set the environment variable to a directory to record replay logs (tank_replay.py)
+TANK_REPLAY_MAX_BYTES = 8 * 1024 * 1024  # A room's replay log rotates to a new file (starting with a keyframe) past this size
+TANK_REPLAY_MAX_FILES = 50  # Logs kept in TANK_REPLAY_DIR; the oldest are deleted when a new one starts
+TANK_INPUT_QUEUE_LIMIT = 32  # Pending inputs kept per client between ticks; older ones fall off the queue
 SERVER_HIGH_SCORE = 0
-tank_game_state_lock = threading.Lock()
-tank_game_state = {}
-tank_game_loop_thread = None
+tank_rooms_lock = threading.Lock()  # Guards tank_rooms / tank_client_rooms; each room has its own state lock
+tank_rooms = {}  # Socket.IO room name -> room dict (see tank_create_room)
+tank_client_rooms = {}  # Client sid -> Socket.IO room name it plays in
+tank_scheduler_thread = None
+tank_level_cache = TankLevelCache()  # Shared by every room; a worker thread prepares each battle's next level ahead of time
+tank_scheduler_stats = {'passes': 0, 'steps': 0, 'skipped_emits': 0, 'overruns': 0, 'dropped_steps': 0, 'last_pass_ms': 0.0, 'max_pass_ms': 0.0}
 
 # --- Snake Game Constants & State ---
 SNAKE_CANVAS_WIDTH = 400; SNAKE_CANVAS_HEIGHT = 400; SNAKE_GRID_SIZE = 20; SNAKE_GAME_SPEED = 0.15; SNAKE_GRID_WIDTH = SNAKE_CANVAS_WIDTH // SNAKE_GRID_SIZE; SNAKE_GRID_HEIGHT = SNAKE_CANVAS_HEIGHT // SNAKE_GRID_SIZE;
-snake_game_state_lock = threading.Lock()
+snake_game_state_lock = GameTimedLock('snake')
 snake_game_state = {}
 snake_game_loop_thread = None
+SNAKE_KEYFRAME_INTERVAL_TICKS = 100  # A full snake_update_state keyframe is forced at least this often (15 s at 0.15 s/tick); deltas go out in between
+snake_stream = {'seq': 0, 'ticks_since_keyframe': 0, 'force_keyframe': True, 'food': None, 'score': None}  # Guarded by snake_game_state_lock; seq runs on across games
+SNAKE_ARENA_GRID_WIDTH = 60; SNAKE_ARENA_GRID_HEIGHT = 40; SNAKE_ARENA_GRID_SIZE = 10; SNAKE_ARENA_FOOD = 15  # Arena mode: one shared grid, one snake per client
+snake_arena_lock = GameTimedLock('snake_arena')
+snake_arena = None  # SnakeArena while any client is in arena mode
+snake_arena_clients = {}  # sid -> snake id
+snake_arena_thread = None
+SNAKE_ARENA_MAX_BOTS = 100  # Autopilot snakes an arena client may add (demo opponents, load generation)
+snake_arena_bots = {}  # snake id -> SnakeAutopilot steering it; guarded by snake_arena_lock
+snake_arena_bot_timing = {'ticks': 0, 'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0}  # Time to steer every bot, per arena tick
 
 # --- Memory Game Constants & State ---
 MEMORY_GAME_SYMBOLS = ['🐱', '🐶', '🐭', '🐹', '🐰', '🦊', '🐻', '🐼', '🦁', '🐯', '🐨', '🐷']
 MEMORY_BOARD_PAIRS = 8
 MEMORY_BOARD_SIZE = MEMORY_BOARD_PAIRS * 2
-memory_game_lock = threading.Lock()
+memory_game_lock = GameTimedLock('memory')
 memory_game_state = {'board':[],'flipped_indices':[],'moves':0,'matches_found':0,'is_over':False,'lock_board':False}
 
 # --- Hangman Game Constants & State ---
 HANGMAN_WORD_LIST = ["PYTHON", "FLASK", "JAVASCRIPT", "HTML", "SOCKETIO", "DEVELOPER", "ENGINEER", "JULES", "TERMINAL", "KEYBOARD", "MONITOR", "SOFTWARE"]
 HANGMAN_MAX_WRONG_GUESSES = 6
-hangman_game_state_lock = threading.Lock()
+hangman_game_state_lock = GameTimedLock('hangman')
 hangman_game_state = {'secret_word': "", 'guessed_letters': set(), 'display_word': [], 'wrong_guesses_count': 0, 'game_status': 'playing'}
 
 # --- Gobang Game Constants & State ---
 GOBANG_BOARD_SIZE = 15
-gobang_game_state_lock = threading.Lock()
+gobang_game_state_lock = GameTimedLock('gobang')
 gobang_game_state = {
     'board': [], 'current_player': 1, 'game_status_message': "Initializing...",
     'is_game_over': False, 'is_player_turn': True
 }
 
-# --- Tank Game Logic (condensed for brevity) ---
-def tank_get_initial_player_state(): return {'x': TANK_GAME_CANVAS_WIDTH/2, 'y': TANK_GAME_CANVAS_HEIGHT - TANK_BODY_HEIGHT*2, 'angle': -math.pi/2, 'color':'green', 'status':'active'}
-def tank_add_game_event(message):
-    if 'game_events' not in tank_game_state: tank_game_state['game_events'] = []
-    tank_game_state['game_events'].insert(0, message)
-    if len(tank_game_state['game_events']) > TANK_MAX_GAME_EVENTS: tank_game_state['game_events'] = tank_game_state['game_events'][:TANK_MAX_GAME_EVENTS]
-def tank_generate_map(num_obstacles_base=5):
-    if 'map' not in tank_game_state: tank_game_state['map'] = {}
-    tank_game_state['map']['obstacles'] = []
-    player_data=tank_game_state.get('player_tank',tank_get_initial_player_state()); player_spawn={'x':player_data['x']-50,'y':player_data['y']-50,'width':100,'height':100}
-    num_obs=min(num_obstacles_base+tank_game_state['current_level']//2,10)
-    for _ in range(num_obs):
-        for _ in range(10):
-            w=min(random.randint(30+tank_game_state['current_level']*2,70+tank_game_state['current_level']*5),120);h=min(random.randint(30+tank_game_state['current_level']*2,70+tank_game_state['current_level']*5),120)
-            x,y=random.uniform(0,TANK_GAME_CANVAS_WIDTH-w),random.uniform(0,TANK_GAME_CANVAS_HEIGHT-h)
-            new_obs={'id':str(uuid.uuid4()),'x':x,'y':y,'width':w,'height':h}
-            if tank_check_aabb_collision(new_obs,player_spawn):continue
-            if any(tank_check_aabb_collision(new_obs,obs) for obs in tank_game_state['map']['obstacles']):continue
-            tank_game_state['map']['obstacles'].append(new_obs);break
-def tank_initialize_targets():
-    tank_game_state['targets']=[]
-    for _ in range(TANK_NUM_DUMMY_TARGETS):
-        for _ in range(20):
-            w,h=30,30;x,y=random.uniform(0,TANK_GAME_CANVAS_WIDTH-w),random.uniform(0,TANK_GAME_CANVAS_HEIGHT-h)
-            new_target={'id':str(uuid.uuid4()),'x':x,'y':y,'width':w,'height':h,'status':'active'}
-            player_data=tank_game_state.get('player_tank',tank_get_initial_player_state());player_spawn={'x':player_data['x']-50,'y':player_data['y']-50,'width':100,'height':100}
-            if any(tank_check_aabb_collision(new_target,obs) for obs in tank_game_state['map']['obstacles']):continue
-            if tank_check_aabb_collision(new_target,player_spawn):continue
-            tank_game_state['targets'].append(new_target);break
-def tank_initialize_ai(level):
-    num=min(TANK_MAX_AI_TANKS,TANK_BASE_NUM_AI+(level-1));speed=min(TANK_MAX_AI_SPEED,TANK_BASE_AI_SPEED+(level-1)*0.2);cooldown=int(max(TANK_MIN_AI_MAX_SHOOT_COOLDOWN,TANK_BASE_AI_MAX_SHOOT_COOLDOWN-(level-1)*10));move_timer=int(max(TANK_MIN_AI_MOVE_TIMER,TANK_BASE_AI_MOVE_TIMER-(level-1)*7));ai_tanks=[]
-    for _ in range(num):
-        for _ in range(20):
-            x,y=random.uniform(TANK_BODY_WIDTH,TANK_GAME_CANVAS_WIDTH-TANK_BODY_WIDTH),random.uniform(TANK_BODY_HEIGHT,TANK_GAME_CANVAS_HEIGHT*0.6)
-            ai_bbox={'x':x-TANK_COLLISION_RADIUS,'y':y-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}
-            player_data=tank_game_state.get('player_tank',tank_get_initial_player_state());player_bbox={'x':player_data['x']-TANK_COLLISION_RADIUS*2,'y':player_data['y']-TANK_COLLISION_RADIUS*2,'width':TANK_COLLISION_RADIUS*4,'height':TANK_COLLISION_RADIUS*4}
-            if tank_check_aabb_collision(ai_bbox,player_bbox):continue
-            if any(tank_check_aabb_collision(ai_bbox,obs) for obs in tank_game_state['map'].get('obstacles',[])):continue
-            if any(tank_check_aabb_collision(ai_bbox,{'x':o['x']-TANK_COLLISION_RADIUS,'y':o['y']-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}) for o in ai_tanks):continue
-            ai_tank={'id':str(uuid.uuid4()),'x':x,'y':y,'angle':random.uniform(0,2*math.pi),'color':random.choice(['#B22222','#8B4513','#A0522D']),'speed':speed,'rotation_speed':0.05+(level-1)*0.005,'shoot_cooldown':random.randint(cooldown//2,cooldown),'max_shoot_cooldown':cooldown,'move_timer':random.randint(move_timer//2,move_timer),'max_move_timer':move_timer,'status':'active'}
-            ai_tanks.append(ai_tank);break
-    tank_game_state['ai_tanks']=ai_tanks
-def tank_reset_game_state():
-    global tank_game_state,SERVER_HIGH_SCORE,tank_game_loop_thread
-    with tank_game_state_lock:
-        if tank_game_loop_thread and tank_game_loop_thread.is_alive():
-            if 'game_active' in tank_game_state:tank_game_state['game_active']=False
-        tank_game_state={'player_tank':tank_get_initial_player_state(),'ai_tanks':[],'bullets':[],'targets':[],'map':{'obstacles':[]},'game_events':[],'score':0,'current_level':1,'is_over':False,'high_score':SERVER_HIGH_SCORE,'game_active':True}
-        tank_generate_map();tank_initialize_targets();tank_initialize_ai(tank_game_state['current_level'])
-        tank_add_game_event(f"Tank Game Started! Level {tank_game_state['current_level']}")
-def tank_check_aabb_collision(r1,r2): return r1['x']<r2['x']+r2['width'] and r1['x']+r1['width']>r2['x'] and r1['y']<r2['y']+r2['height'] and r1['y']+r1['height']>r2['y']
-def tank_game_loop():
-    global tank_game_state,SERVER_HIGH_SCORE
+# --- Per-Game Socket.IO Rooms & Outbound Byte Counters ---
+# Each game only emits to the clients that joined its room; tank battles use their own per-battle rooms (see tank_join_room).
+GAME_ROOMS = {'tank': None, 'snake': 'game:snake', 'snake_arena': 'game:snake_arena', 'memory': 'game:memory', 'hangman': 'game:hangman', 'gobang': 'game:gobang'}
+game_bytes_lock = threading.Lock()
+game_bytes_sent = {game: {'messages': 0, 'payload_bytes': 0, 'bytes_out': 0} for game in GAME_ROOMS}
+
+def game_join_room(game):
+    """Subscribes the calling client to `game`'s state updates."""
+    join_room(GAME_ROOMS[game])
+
+def game_frame_bytes(event, payload):
+    """Size of `event` + `payload` as Socket.IO encodes it on the wire."""
+    return len(json.dumps([event, payload], separators=(',', ':')))
+
+def game_emit(game, event, payload, to=None, frame_bytes=None, resync=None):
+    """Queues `event` for every client in `game`'s room (or the given room/sid) and counts the outbound bytes.
+
+    `payload_bytes` is the size of one JSON frame; `bytes_out` grows as each client's sender actually delivers a frame
+    (JSON or binary), so frames replaced in a slow client's queue are never counted. Events with a binary encoding are
+    encoded once, and only when some recipient negotiated it. Pass `frame_bytes` when the caller already measured the
+    frame. For a delta, `resync` may be the (event, payload) keyframe at the same seq: clients waiting for one (see
+    client_room_needs_resync) get it instead of the delta. Returns the JSON frame size in bytes.
+    """
+    target = to or GAME_ROOMS[game]
+    if frame_bytes is None: frame_bytes = game_frame_bytes(event, payload)
+    with game_bytes_lock:
+        counter = game_bytes_sent[game]
+        counter['messages'] += 1; counter['payload_bytes'] += frame_bytes
+    recipients = game_room_recipients(target); resyncing = []
+    stream = CLIENT_STREAM_EVENTS.get(event)
+    if resync is not None and stream is not None:
+        waiting = [queue is not None and queue.needs_resync(stream) for _, queue in recipients]
+        resyncing = [r for r, wait in zip(recipients, waiting) if wait]; recipients = [r for r, wait in zip(recipients, waiting) if not wait]
+    binary = game_encode_binary(event, payload, recipients)
+    for sid, queue in recipients:
+        if queue is not None: queue.put(game, event, payload, frame_bytes, binary)
+        else:  # Not registered yet (connect handler still running): send directly rather than lose the frame
+            socketio.emit(event, payload, to=sid); game_record_bytes_out(game, frame_bytes)
+    if resyncing:
+        resync_event, resync_payload = resync
+        resync_bytes = game_frame_bytes(resync_event, resync_payload); resync_binary = game_encode_binary(resync_event, resync_payload, resyncing)
+        for _, queue in resyncing: queue.put(game, resync_event, resync_payload, resync_bytes, resync_binary)
+    return frame_bytes
+
+def game_room_recipients(target):
+    """(sid, ClientSendQueue or None) for every client in the room (or the single sid) `target`."""
+    recipients = []
+    for sid in list(socketio.server.manager.get_participants('/', target)):
+        if isinstance(sid, tuple): sid = sid[0]  # Newer python-socketio yields (sid, eio_sid) pairs
+        recipients.append((sid, client_get_queue(sid)))
+    return recipients
+
+def game_encode_binary(event, payload, recipients):
+    """The binary frame for `event`, or None if it has no binary encoding or no recipient negotiated one."""
+    encoder = GAME_WIRE_ENCODERS.get(event)
+    if encoder is None or not any(queue is not None and queue.wire == 'binary' for _, queue in recipients): return None
+    try: return encoder(payload)
+    except (KeyError, TypeError, ValueError, OverflowError, struct.error) as e: print(f"Binary encoding of {event} failed, sending JSON: {e}")
+    return None
+
+def game_record_bytes_out(game, frame_bytes):
+    with game_bytes_lock: game_bytes_sent[game]['bytes_out'] += frame_bytes
+
+def game_get_bytes_stats():
+    with game_bytes_lock:
+        return {game: dict(counter) for game, counter in game_bytes_sent.items()}
+
+# --- Per-Client Send Queues ---
+# Game loops never write to a socket themselves: game_emit() drops frames into one queue per client and a sender task
+# per client drains it. A slow or stalled websocket makes its own client skip frames instead of backing up the
+# simulation: a keyframe supersedes every unsent frame of its stream, but a delta only applies on top of the frame
+# before it, so deltas queue behind each other (and behind a pending keyframe) up to CLIENT_DELTA_CHAIN_LIMIT. Past
+# that the client's pending frames of the stream are dropped and only that client is sent a keyframe on the next frame
+# (game_emit's `resync`); its deltas are dropped meanwhile. A client that asks for a keyframe (it saw a seq gap) is
+# resynced the same way, so one slow client never turns its whole room over to keyframes. All other events are
+# delivered in order and never dropped.
+# Clients pick their wire format when connecting (Socket.IO auth {'wire': 'binary'}); JSON is the default and fallback.
+GAME_WIRE_FORMATS = ('json', 'binary')
+GAME_WIRE_ENCODERS = {'tank_update_state': wire_encode_tank_keyframe, 'snake_update_state': wire_encode_snake_state}  # See game_wire.py
+CLIENT_STREAM_EVENTS = {'tank_update_state': 'tank', 'tank_state_delta': 'tank', 'snake_update_state': 'snake', 'snake_state_delta': 'snake', 'snake_arena_state': 'snake_arena'}  # event -> stream
+CLIENT_DELTA_EVENTS = {'tank_state_delta', 'snake_state_delta'}  # Stream events that depend on the frame before them; the rest are keyframes
+CLIENT_DELTA_CHAIN_LIMIT = 4  # Unsent frames of one delta stream a client may hold before they are dropped for a resync keyframe
+CLIENT_TRANSPORT_HIGH_WATER = 2  # Packets already waiting in the Engine.IO socket before the sender holds back
+CLIENT_BACKPRESSURE_POLL = 0.005  # Seconds between transport checks while held back
+client_queues_lock = threading.Lock()
+client_queues = {}  # sid -> ClientSendQueue
+
+def client_transport_backlog(sid):
+    """Packets queued in the client's Engine.IO socket but not yet written, or 0 if the transport is not inspectable."""
+    try:
+        eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+        return socketio.server.eio.sockets[eio_sid].queue.qsize()
+    except (AttributeError, KeyError, TypeError, NotImplementedError):
+        return 0
+
+class ClientSendQueue:
+    def __init__(self, sid, wire='json'):
+        self.sid = sid
+        self.wire = wire
+        self.items = collections.deque()  # [stream or None, game, event, payload, frame_bytes, binary or None]
+        self.cond = threading.Condition()
+        self.closed = False
+        self.resync = set()  # Delta streams this client lost frames of; it gets none of their deltas until a keyframe
+        self.stats = {'queued': 0, 'sent': 0, 'dropped': 0, 'resyncs': 0, 'depth': 0, 'max_depth': 0, 'dropped_by_stream': {}}
+
+    def put(self, game, event, payload, frame_bytes, binary=None):
+        stream = CLIENT_STREAM_EVENTS.get(event)
+        with self.cond:
+            if self.closed: return
+            if stream is not None:
+                if event not in CLIENT_DELTA_EVENTS:  # A keyframe supersedes every unsent frame of its stream
+                    self._drop_stream(stream); self.resync.discard(stream)
+                elif stream in self.resync:  # Useless without the frames dropped before it
+                    self._count_dropped(stream); return
+                elif sum(1 for item in self.items if item[0] == stream) >= CLIENT_DELTA_CHAIN_LIMIT:
+                    self._drop_stream(stream); self._count_dropped(stream); self._mark_resync(stream); return
+            self.items.append([stream, game, event, payload, frame_bytes, binary])
+            self.stats['queued'] += 1; self.stats['depth'] = len(self.items)
+            if len(self.items) > self.stats['max_depth']: self.stats['max_depth'] = len(self.items)
+            self.cond.notify()
+
+    def request_resync(self, stream):
+        """The client lost track of `stream`: drop what is queued of it and wait for a keyframe."""
+        with self.cond:
+            if self.closed: return
+            self._drop_stream(stream); self._mark_resync(stream)
+
+    def needs_resync(self, stream):
+        with self.cond: return stream in self.resync
+
+    def _mark_resync(self, stream):
+        if stream not in self.resync: self.resync.add(stream); self.stats['resyncs'] += 1
+
+    def _drop_stream(self, stream):
+        kept = collections.deque(item for item in self.items if item[0] != stream)
+        for _ in range(len(self.items) - len(kept)): self._count_dropped(stream)
+        self.items = kept; self.stats['depth'] = len(kept)
+
+    def _count_dropped(self, stream):
+        self.stats['dropped'] += 1
+        self.stats['dropped_by_stream'][stream] = self.stats['dropped_by_stream'].get(stream, 0) + 1
+
+    def close(self):
+        with self.cond:
+            self.closed = True; self.items.clear(); self.stats['depth'] = 0
+            self.cond.notify()
+
+    def run(self):
+        """Sender task: waits for frames, holds back while the transport is backed up, then emits the oldest one."""
+        while True:
+            with self.cond:
+                while not self.items and not self.closed: self.cond.wait()
+                if self.closed: return
+            while client_transport_backlog(self.sid) >= CLIENT_TRANSPORT_HIGH_WATER and not self.closed:
+                socketio.sleep(CLIENT_BACKPRESSURE_POLL)  # Meanwhile newer stream frames replace the queued ones
+            with self.cond:
+                if self.closed: return
+                _, game, event, payload, frame_bytes, binary = self.items.popleft()
+                self.stats['depth'] = len(self.items)
+            if binary is not None and self.wire == 'binary': payload = binary; frame_bytes = len(binary)
+            try: socketio.emit(event, payload, to=self.sid)
+            except Exception as e: print(f"Send to {self.sid} failed: {e}"); continue
+            with self.cond: self.stats['sent'] += 1
+            game_record_bytes_out(game, frame_bytes)
+
+    def get_stats(self):
+        with self.cond:
+            return dict(self.stats, dropped_by_stream=dict(self.stats['dropped_by_stream']))
+
+def client_open_queue(sid, wire='json'):
+    queue = ClientSendQueue(sid, wire if wire in GAME_WIRE_FORMATS else 'json')
+    with client_queues_lock: client_queues[sid] = queue
+    socketio.start_background_task(queue.run)
+    return queue
+
+def client_close_queue(sid):
+    with client_queues_lock: queue = client_queues.pop(sid, None)
+    if queue is not None: queue.close()
+
+def client_get_queue(sid):
+    with client_queues_lock: return client_queues.get(sid)
+
+def client_request_resync(sid, stream):
+    """Marks one client for a keyframe of `stream` on the next frame. Returns False if the client has no send queue."""
+    queue = client_get_queue(sid)
+    if queue is None: return False
+    queue.request_resync(stream)
+    return True
+
+def client_room_needs_resync(target, stream):
+    """True if any client in the room `target` is waiting for a keyframe of `stream`; the caller then builds one."""
+    return any(queue is not None and queue.needs_resync(stream) for _, queue in game_room_recipients(target))
+
+def client_get_queue_stats():
+    with client_queues_lock: queues = list(client_queues.values())
+    return {queue.sid: dict(queue.get_stats(), wire=queue.wire) for queue in queues}
+
+# --- Tank Delta Stream ---
+# Keyframes are the full state on 'tank_update_state'; in between, 'tank_state_delta' carries only what changed since the
+# previous frame. Obstacles only change with the level, so they only ever travel in keyframes. Every frame has a `seq`;
+# a client that sees a gap asks for a keyframe with 'tank_request_keyframe'.
+def tank_new_stream():
+    return {'seq':0,'ticks_since_keyframe':0,'force_keyframe':True,'level':None,'baseline':None,
+            'window_start':time.monotonic(),'window_bytes':0,'window_frames':0,
+            'keyframes':0,'deltas':0,'bytes_per_sec':0.0,'full_state_bytes_per_sec':0.0}
+def tank_keyframe_payload(state, seq):
+    """Full state detached from the live room: entities are copied, obstacle lists are replaced (never mutated) per level.
+    Engine-only keys (TANK_PRIVATE_STATE_KEYS) are left out."""
+    return dict({k:v for k,v in state.items() if k not in TANK_PRIVATE_STATE_KEYS},player_tank=dict(state['player_tank']),ai_tanks=[dict(t) for t in state['ai_tanks']],
+                targets=[dict(t) for t in state['targets']],bullets=state['bullets'].to_payload(),
+                map=dict(state['map']),game_events=list(state['game_events']),input_acks=dict(state['input_acks']),seq=seq)
+def tank_make_baseline(state):
+    """Copies what the next delta is diffed against. Entities are copied shallowly; their values are immutable."""
+    baseline={key:{e['id']:dict(e) for e in state[key]} for key in TANK_DELTA_ENTITY_KEYS}
+    baseline['bullets']=state['bullets'].snapshot()
+    baseline['player_tank']=dict(state['player_tank'])
+    for key in TANK_DELTA_SCALAR_KEYS:baseline[key]=tank_copy_value(state.get(key))
+    return baseline
+def tank_copy_value(value): return list(value) if isinstance(value,list) else dict(value) if isinstance(value,dict) else value
+def tank_diff_fields(old, new): return {k:(round(v,TANK_DELTA_FLOAT_DIGITS) if isinstance(v,float) else v) for k,v in new.items() if old.get(k)!=v}
+def tank_encode_delta(baseline, state, seq):
+    delta={'seq':seq}
+    for key in TANK_DELTA_ENTITY_KEYS:
+        previous=baseline[key];created=[];changed=[];seen=set()
+        for entity in state[key]:
+            seen.add(entity['id']);old=previous.get(entity['id'])
+            if old is None:created.append(dict(entity));continue
+            diff=tank_diff_fields(old,entity)
+            if diff:diff['id']=entity['id'];changed.append(diff)
+        removed=[entity_id for entity_id in previous if entity_id not in seen]
+        entry={name:items for name,items in (('created',created),('changed',changed),('removed',removed)) if items}
+        if entry:delta[key]=entry
+    bullet_entry=state['bullets'].encode_delta(baseline['bullets'],TANK_DELTA_FLOAT_DIGITS)
+    if bullet_entry:delta['bullets']=bullet_entry
+    player_diff=tank_diff_fields(baseline['player_tank'],state['player_tank'])
+    if player_diff:delta['player_tank']=player_diff
+    for key in TANK_DELTA_SCALAR_KEYS:
+        if state.get(key)!=baseline[key]:delta[key]=tank_copy_value(state.get(key))
+    return delta
+def tank_stream_next_frame(stream, state):
+    """Returns (event, payload) for this tick: a keyframe on join, level change, resync or every N ticks, else a delta."""
+    stream['seq']+=1;stream['ticks_since_keyframe']+=1
+    is_keyframe=(stream['force_keyframe'] or stream['baseline'] is None or stream['level']!=state.get('current_level')
+                 or stream['ticks_since_keyframe']>=TANK_KEYFRAME_INTERVAL_TICKS)
+    if is_keyframe:
+        payload=tank_keyframe_payload(state,stream['seq']);event='tank_update_state'
+        stream['force_keyframe']=False;stream['ticks_since_keyframe']=0;stream['level']=state.get('current_level');stream['keyframes']+=1
+    else:
+        payload=tank_encode_delta(stream['baseline'],state,stream['seq']);event='tank_state_delta';stream['deltas']+=1
+    stream['baseline']=tank_make_baseline(state)
+    return event,payload
+def tank_stream_window_due(stream): return time.monotonic()-stream['window_start']>=TANK_STREAM_STATS_WINDOW
+def tank_stream_record_bytes(stream, frame_bytes, full_frame_bytes):
+    """Tracks sent bytes/sec next to an estimate of what the full-state-every-tick stream would have cost.
+
+    The full-state frame is only encoded once per window (`full_frame_bytes` is None otherwise), so the comparison costs
+    a fraction of what the old stream did.
+    """
+    stream['window_bytes']+=frame_bytes;stream['window_frames']+=1
+    if full_frame_bytes is not None:
+        elapsed=time.monotonic()-stream['window_start']
+        stream['bytes_per_sec']=stream['window_bytes']/elapsed
+        stream['full_state_bytes_per_sec']=full_frame_bytes*stream['window_frames']/elapsed
+        stream['window_start']=time.monotonic();stream['window_bytes']=0;stream['window_frames']=0
+
+# --- Tank Rooms & Shared Tick Scheduler ---
+# Each room wraps one TankEngine (tank_engine.py holds the rules); this section adds locking, input queues and pacing.
+def tank_create_room(room_name):
+    engine=TankEngine(high_score=SERVER_HIGH_SCORE,levels=tank_level_cache);tank_start_replay(room_name,engine)
+    return {'name':room_name,'lock':GameTimedLock('tank'),'engine':engine,'members':{},'player':None,'stream':tank_new_stream(),
+            'inputs':{},'input_stats':{'applied':0,'discarded':0},
+            'ticks':0,'metrics':{name:{'last':0.0,'avg':0.0,'max':0.0,'count':0} for name in TANK_TICK_METRICS}}
+def tank_start_replay(room_name, engine):
+    """Attaches a TankReplayRecorder writing to TANK_REPLAY_DIR/<room>-<time>-<seed>-<tick>.tkr; load it with TankReplay.load.
+
+    Only when TANK_REPLAY_DIR is set. Makes room for the new log by deleting the oldest beyond TANK_REPLAY_MAX_FILES.
+    """
+    if TANK_REPLAY_DIR is None:return
+    os.makedirs(TANK_REPLAY_DIR,exist_ok=True);tank_prune_replays(TANK_REPLAY_MAX_FILES-1)
+    name=f"{re.sub(r'[^A-Za-z0-9_-]','_',room_name)}-{time.strftime('%Y%m%d-%H%M%S')}-{engine.seed}-{engine.ticks}.tkr"
+    engine.recorder=TankReplayRecorder(open(os.path.join(TANK_REPLAY_DIR,name),'wb'),engine)
+def tank_prune_replays(keep):
+    """Deletes all but the `keep` newest replay logs in TANK_REPLAY_DIR (logs still being written included)."""
+    try:paths=sorted((os.path.join(TANK_REPLAY_DIR,n) for n in os.listdir(TANK_REPLAY_DIR) if n.endswith('.tkr')),key=os.path.getmtime)
+    except OSError:return
+    for path in paths[:max(0,len(paths)-keep)]:
+        try:os.remove(path)
+        except OSError:pass
+def tank_rotate_replay(room_name, engine):
+    """Closes a log that reached TANK_REPLAY_MAX_BYTES and continues in a new one. Caller holds the room lock."""
+    if engine.recorder is None or engine.recorder.stats['bytes']<TANK_REPLAY_MAX_BYTES:return
+    engine.recorder.close(engine);engine.recorder=None;tank_start_replay(room_name,engine)
+def tank_close_replay(room):
+    """Finishes the room's replay log; takes the room lock because the scheduler may still be stepping the room."""
+    with room['lock']:
+        engine=room['engine']
+        if engine.recorder is not None:engine.recorder.close(engine);engine.recorder=None
+def tank_record_metric(room, name, ms):
+    metric=room['metrics'][name];metric['count']+=1;metric['last']=ms
+    metric['avg']=ms if metric['count']==1 else metric['avg']+(ms-metric['avg'])*TANK_TICK_STATS_SMOOTHING
+    if ms>metric['max']:metric['max']=ms
+def tank_acquire_room(room):
+    """Takes the room lock and records how long the scheduler waited for it (e.g. behind input handlers)."""
+    wait_start=time.perf_counter();room['lock'].acquire()
+    tank_record_metric(room,'lock_wait_ms',(time.perf_counter()-wait_start)*1000)
+def tank_reset_game_state(room):
+    with room['lock']:room['engine'].reset(SERVER_HIGH_SCORE);room['stream']['force_keyframe']=True
+def tank_drain_inputs(room):
+    """Takes everything queued by the room's clients so far; handlers keep appending to the same deques meanwhile."""
+    return {sid:[queue.popleft() for _ in range(len(queue))] for sid,queue in room['inputs'].items()}
+def tank_simulate_room(room):
+    """Advances one room by exactly one fixed simulation step."""
+    global SERVER_HIGH_SCORE
+    tank_acquire_room(room)
+    try:
+        engine=room['engine'];state=engine.state
+        if not state.get('game_active',False):return
+        tick_start=time.perf_counter()
+        departed=[sid for sid in state['input_acks'] if sid not in room['inputs']] # Left the room (or handed over the tank); dropped inside the step so replays see it
+        applied,discarded=engine.step(tank_drain_inputs(room),departed)
+        room['input_stats']['applied']+=applied;room['input_stats']['discarded']+=discarded;tank_rotate_replay(room['name'],engine)
+        if state['high_score']>SERVER_HIGH_SCORE:SERVER_HIGH_SCORE=state['high_score']
+        room['ticks']+=1;tank_record_metric(room,'sim_ms',(time.perf_counter()-tick_start)*1000)
+    finally:room['lock'].release()
+def tank_emit_room(room):
+    """Builds the room's next frame under the lock, then serializes and sends it without holding the lock.
+
+    The frame (keyframe or delta) only holds copies of the live entities, so handlers can keep mutating the room while
+    it is encoded and written to the sockets.
+    """
+    tank_acquire_room(room)
+    try:
+        state=room['engine'].state
+        if not state.get('game_active',False):return
+        snapshot_start=time.perf_counter()
+        event,payload=tank_stream_next_frame(room['stream'],state);window_due=tank_stream_window_due(room['stream'])
+        resync=('tank_update_state',tank_keyframe_payload(state,room['stream']['seq'])) if event!='tank_update_state' and client_room_needs_resync(room['name'],'tank') else None
+        full_sample=(resync[1] if resync else tank_keyframe_payload(state,room['stream']['seq'])) if window_due and event!='tank_update_state' else None
+        tank_record_metric(room,'snapshot_ms',(time.perf_counter()-snapshot_start)*1000)
+    finally:room['lock'].release()
+    encode_start=time.perf_counter()
+    frame_bytes=game_frame_bytes(event,payload)
+    full_frame_bytes=None if not window_due else frame_bytes if full_sample is None else game_frame_bytes('tank_update_state',full_sample)
+    emit_start=time.perf_counter();tank_record_metric(room,'serialize_ms',(emit_start-encode_start)*1000)
+    game_emit('tank',event,payload,to=room['name'],frame_bytes=frame_bytes,resync=resync)
+    tank_record_metric(room,'emit_ms',(time.perf_counter()-emit_start)*1000)
+    tank_stream_record_bytes(room['stream'],frame_bytes,full_frame_bytes)
+def tank_scheduler_loop():
+    """Single thread that advances every active tank room on a fixed timestep of TANK_GAME_LOOP_INTERVAL.
+
+    Tick deadlines come from a monotonic clock, so the work done in a pass does not stretch the period. When a pass
+    runs late the scheduler catches up with up to TANK_MAX_CATCHUP_STEPS simulation steps and sends only one frame per
+    room for them; any backlog beyond that is dropped and counted as an overrun, so game speed holds under load and
+    only the emit rate degrades. Frames go out on their own TANK_BROADCAST_INTERVAL deadlines, and only after at least
+    one step since the last frame.
+    """
+    global tank_scheduler_thread
+    next_tick=next_emit=time.monotonic();unsent_steps=0
     while True:
-        with tank_game_state_lock:
-            if not tank_game_state.get('game_active',False):break
-            if not tank_game_state.get('is_over',False):
-                all_tanks=[tank_game_state['player_tank']]+tank_game_state['ai_tanks']
-                for tank in all_tanks:
-                    if tank.get('status','active')!='active':continue
-                    px,py=tank['x'],tank['y']
-                    if 'move_timer' in tank:
-                        tank['move_timer']-=1
-                        if tank['move_timer']<=0:tank['angle']=(tank['angle']+random.uniform(-math.pi/1.5,math.pi/1.5))%(2*math.pi);tank['move_timer']=tank['max_move_timer']
-                        tank['x']+=tank['speed']*math.cos(tank['angle']);tank['y']+=tank['speed']*math.sin(tank['angle'])
-                    if not(TANK_COLLISION_RADIUS<=tank['x']<=TANK_GAME_CANVAS_WIDTH-TANK_COLLISION_RADIUS):tank['x']=px;
-                    if'move_timer'in tank:tank['angle']=(tank['angle']+math.pi+random.uniform(-0.1,0.1))%(2*math.pi)
-                    if not(TANK_COLLISION_RADIUS<=tank['y']<=TANK_GAME_CANVAS_HEIGHT-TANK_COLLISION_RADIUS):tank['y']=py;
-                    if'move_timer'in tank:tank['angle']=(tank['angle']+math.pi+random.uniform(-0.1,0.1))%(2*math.pi)
-                    tank_bbox={'x':tank['x']-TANK_COLLISION_RADIUS,'y':tank['y']-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}
-                    for obs in tank_game_state['map']['obstacles']:
-                        if tank_check_aabb_collision(tank_bbox,obs):
-                            tank['x'],tank['y']=px,py
-                            if'move_timer'in tank:tank['angle']=(tank['angle']+math.pi/2+random.uniform(-0.3,0.3))%(2*math.pi);tank['move_timer']=tank['max_move_timer']//2
-                            break
-                    if'move_timer'in tank and tank.get('status')=='active':
-                        tank['shoot_cooldown']-=1
-                        if tank['shoot_cooldown']<=0:
-                            b_x,b_y=tank['x']+TANK_TURRET_LENGTH*math.cos(tank['angle']),tank['y']+TANK_TURRET_LENGTH*math.sin(tank['angle'])
-                            tank_game_state['bullets'].append({'id':str(uuid.uuid4()),'x':b_x,'y':b_y,'angle':tank['angle'],'speed':TANK_BULLET_SPEED+tank_game_state['current_level']*0.15,'owner':'ai','color':tank['color']})
-                            tank['shoot_cooldown']=tank['max_shoot_cooldown']
-                active_bullets=[]
-                for b in tank_game_state['bullets']:
-                    b['x']+=b['speed']*math.cos(b['angle']);b['y']+=b['speed']*math.sin(b['angle']);collided=False
-                    if not(0<b['x']<TANK_GAME_CANVAS_WIDTH and 0<b['y']<TANK_GAME_CANVAS_HEIGHT):collided=True
-                    b_bbox={'x':b['x']-TANK_BULLET_RADIUS,'y':b['y']-TANK_BULLET_RADIUS,'width':TANK_BULLET_RADIUS*2,'height':TANK_BULLET_RADIUS*2}
-                    if not collided:
-                        for obs in tank_game_state['map']['obstacles']:
-                            if tank_check_aabb_collision(b_bbox,obs):b['hit_obstacle']=True;collided=True;break
-                    if not collided:
-                        for t in tank_game_state['targets']:
-                            if t.get('status','inactive')=='active' and tank_check_aabb_collision(b_bbox,t):
-                                t['status']='hit';
-                                if b.get('owner')=='player':tank_game_state['score']+=TANK_TARGET_HIT_SCORE;tank_add_game_event(f"Target Hit! +{TANK_TARGET_HIT_SCORE}")
-                                collided=True;break
-                    if not collided and b.get('owner')=='player':
-                        for ai in tank_game_state['ai_tanks']:
-                            if ai.get('status')=='active':
-                                ai_bbox={'x':ai['x']-TANK_COLLISION_RADIUS,'y':ai['y']-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}
-                                if tank_check_aabb_collision(b_bbox,ai_bbox):
-                                    ai['status']='destroyed';points=TANK_AI_DESTROYED_SCORE_BASE+(tank_game_state['current_level']-1)*10
-                                    tank_game_state['score']+=points;tank_add_game_event(f"Enemy Down! +{points}")
-                                    collided=True;break
-                    if not collided and b.get('owner')=='ai' and tank_game_state['player_tank']['status']=='active':
-                        pt=tank_game_state['player_tank'];p_bbox={'x':pt['x']-TANK_COLLISION_RADIUS,'y':pt['y']-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}
-                        if tank_check_aabb_collision(b_bbox,p_bbox):
-                            pt['status']='destroyed';tank_game_state['is_over']=True;tank_add_game_event("Tank Destroyed!")
-                            if tank_game_state['score']>SERVER_HIGH_SCORE:SERVER_HIGH_SCORE=tank_game_state['score'];tank_game_state['high_score']=SERVER_HIGH_SCORE;tank_add_game_event(f"New Tank High Score: {SERVER_HIGH_SCORE}!")
-                            collided=True
-                    if not collided:active_bullets.append(b)
-                tank_game_state['bullets']=active_bullets
-                tank_game_state['ai_tanks']=[t for t in tank_game_state['ai_tanks'] if t.get('status')=='active']
-                if not tank_game_state['is_over'] and not tank_game_state['ai_tanks']:
-                    tank_game_state['current_level']+=1;tank_add_game_event(f"Reached Level {tank_game_state['current_level']}!")
-                    tank_generate_map();tank_initialize_ai(tank_game_state['current_level']);tank_initialize_targets()
-            if tank_game_state.get('score',0)>tank_game_state.get('high_score',0):
-                tank_game_state['high_score']=tank_game_state['score']
-                if tank_game_state['high_score']>SERVER_HIGH_SCORE:SERVER_HIGH_SCORE=tank_game_state['high_score']
-            socketio.emit('tank_update_state',tank_game_state)
-        time.sleep(TANK_GAME_LOOP_INTERVAL)
-    print("Exited Tank game loop")
+        with tank_rooms_lock:
+            rooms=list(tank_rooms.values())
+            if not rooms:tank_scheduler_thread=None;break
+        now=time.monotonic()
+        if now<next_tick and (now<next_emit or not unsent_steps):time.sleep((next_tick if not unsent_steps else min(next_tick,next_emit))-now);continue
+        pass_start=time.perf_counter();steps=0
+        while now>=next_tick and steps<TANK_MAX_CATCHUP_STEPS:
+            for room in rooms:tank_simulate_room(room)
+            next_tick+=TANK_GAME_LOOP_INTERVAL;steps+=1
+        if now>=next_tick: # Still behind after the bounded catch-up: drop the backlog instead of spiralling
+            dropped=int((now-next_tick)//TANK_GAME_LOOP_INTERVAL)+1
+            tank_scheduler_stats['overruns']+=1;tank_scheduler_stats['dropped_steps']+=dropped;next_tick+=dropped*TANK_GAME_LOOP_INTERVAL
+        unsent_steps+=steps
+        if now>=next_emit and unsent_steps:
+            for room in rooms:tank_emit_room(room)
+            tank_scheduler_stats['skipped_emits']+=(unsent_steps-1)*len(rooms);unsent_steps=0
+            next_emit=max(next_emit+TANK_BROADCAST_INTERVAL,now) # A late frame does not bunch up the following ones
+        pass_ms=(time.perf_counter()-pass_start)*1000
+        tank_scheduler_stats['passes']+=1;tank_scheduler_stats['steps']+=steps
+        tank_scheduler_stats['last_pass_ms']=pass_ms
+        if pass_ms>tank_scheduler_stats['max_pass_ms']:tank_scheduler_stats['max_pass_ms']=pass_ms
+    print("Exited Tank scheduler loop (no active rooms)")
+def tank_ensure_scheduler_running():
+    """Starts the shared scheduler thread if it is not already running. Caller must hold tank_rooms_lock."""
+    global tank_scheduler_thread
+    if tank_scheduler_thread is None or not tank_scheduler_thread.is_alive():
+        tank_scheduler_thread=threading.Thread(target=tank_scheduler_loop,daemon=True);tank_scheduler_thread.start()
+# A room's battle has one player tank. The first client in a room drives it; everyone who joins after watches as a
+# spectator (frames only, no input queue) and the longest-waiting spectator takes over when the player leaves.
+def tank_join_room(sid, requested_room=None):
+    """Puts a client into a tank room, creating it on first join. Clients that name no room get a private one.
+
+    Returns (room, promoted sid or None): leaving a previous room may hand its tank to a spectator there.
+    """
+    room_name=TANK_ROOM_PREFIX+(str(requested_room) if requested_room else sid)
+    promoted=None
+    with tank_rooms_lock:
+        previous=tank_client_rooms.get(sid)
+        if previous and previous!=room_name:promoted=tank_leave_room_unsafe(sid)
+        room=tank_rooms.get(room_name)
+        if room is None:room=tank_rooms[room_name]=tank_create_room(room_name)
+        room['members'][sid]=True;tank_client_rooms[sid]=room_name
+        if room['player'] is None:tank_set_player_unsafe(room,sid)
+        tank_ensure_scheduler_running()
+    join_room(room_name)
+    return room,promoted
+def tank_set_player_unsafe(room, sid):
+    """Hands the room's tank to `sid`, the only member with an input queue. Caller must hold tank_rooms_lock."""
+    room['player']=sid
+    room['inputs']={sid:collections.deque(maxlen=TANK_INPUT_QUEUE_LIMIT)} # Replaced, not mutated: the tick iterates it without tank_rooms_lock
+def tank_leave_room_unsafe(sid):
+    """Removes a client from its tank room and drops the room once empty. Caller must hold tank_rooms_lock.
+
+    Returns the spectator promoted to player, if the leaving client was the player and someone is still watching.
+    """
+    room_name=tank_client_rooms.pop(sid,None)
+    if room_name:leave_room(room_name,sid=sid) # Stops its broadcasts even if the client stays connected (e.g. switching rooms)
+    room=tank_rooms.get(room_name) if room_name else None
+    if room is None:return None
+    room['members'].pop(sid,None)
+    if not room['members']:del tank_rooms[room_name];tank_close_replay(room);print(f"Tank room {room_name} closed.");return None
+    if room['player']!=sid:return None
+    promoted=next(iter(room['members']));tank_set_player_unsafe(room,promoted)
+    return promoted
+def tank_client_role(room, sid): return 'player' if room['player']==sid else 'spectator'
+def tank_send_config(room, sid):
+    """Rules for client-side prediction, plus whether `sid` drives the room's tank or watches."""
+    game_emit('tank','tank_config',dict(tank_client_config(room['engine'].tick_interval),broadcast_ms=TANK_BROADCAST_INTERVAL*1000,role=tank_client_role(room,sid)),to=sid)
+def tank_notify_promoted(sid):
+    """Tells a spectator who was just handed the tank that its inputs now count."""
+    room=tank_get_client_room(sid)
+    if room is not None:tank_send_config(room,sid);print(f"Spectator took over the tank in room {room['name']}.")
+def tank_get_client_room(sid):
+    with tank_rooms_lock:
+        room_name=tank_client_rooms.get(sid)
+        return tank_rooms.get(room_name) if room_name else None
+def tank_get_rooms_stats():
+    interval_ms=TANK_GAME_LOOP_INTERVAL*1000
+    with tank_rooms_lock:rooms=list(tank_rooms.values())
+    room_stats=[{'room':r['name'],'players':1 if r['player'] else 0,'spectators':len(r['members'])-(1 if r['player'] else 0),'level':r['engine'].state.get('current_level',0),'ticks':r['ticks'],
+                 'metrics':{name:{k:round(v,3) if isinstance(v,float) else v for k,v in metric.items()} for name,metric in r['metrics'].items()},
+                 'inputs':dict(r['input_stats']),
+                 'ai':dict(r['engine'].counters,**r['engine'].nav.stats),
+                 'replay':dict(r['engine'].recorder.stats) if r['engine'].recorder else None,
+                 'stream':{'seq':r['stream']['seq'],'keyframes':r['stream']['keyframes'],'deltas':r['stream']['deltas'],
+                           'bytes_per_sec':round(r['stream']['bytes_per_sec'],1),
+                           'full_state_bytes_per_sec':round(r['stream']['full_state_bytes_per_sec'],1)}} for r in rooms]
+    total_avg_ms=sum(r['metrics'][name]['avg'] for r in rooms for name in ('sim_ms','snapshot_ms','serialize_ms','emit_ms'))
+    per_room_ms=total_avg_ms/len(rooms) if rooms else 0.0
+    return {'tick_interval_ms':interval_ms,'broadcast_interval_ms':TANK_BROADCAST_INTERVAL*1000,'active_rooms':len(rooms),'rooms':room_stats,
+            'scheduler':{k:round(v,3) if isinstance(v,float) else v for k,v in tank_scheduler_stats.items()},
+            'level_cache':tank_level_cache.get_stats(),
+            'total_avg_tick_ms':round(total_avg_ms,3),
+            'estimated_room_capacity':int(interval_ms/per_room_ms) if per_room_ms>0 else None}
 
 # --- Snake Game Logic (condensed) ---
-def snake_initialize_game():
+# The rules live in games/snake/snake_engine.py (deque body, occupancy bitmap, free-cell food placement); this wraps one SnakeEngine.
+def snake_initialize_game(autopilot=False):
+    """New game; with `autopilot` a SnakeAutopilot (games/snake/snake_autopilot.py) plays it until a player presses a key."""
     global snake_game_state
-    with snake_game_lock:
-        snake_game_state={'snake_body':[(SNAKE_GRID_WIDTH//2,SNAKE_GRID_HEIGHT//2)],'food_pos':(0,0),'score':0,'direction':'RIGHT','is_game_over':False,'game_active':True,'grid_width':SNAKE_GRID_WIDTH,'grid_height':SNAKE_GRID_HEIGHT,'grid_size':SNAKE_GRID_SIZE}
-        snake_place_food_unsafe();print("Snake game initialized/restarted")
-def snake_place_food_unsafe():
-    while True:
-        food_x,food_y=random.randint(0,SNAKE_GRID_WIDTH-1),random.randint(0,SNAKE_GRID_HEIGHT-1)
-        if(food_x,food_y)not in snake_game_state['snake_body']:snake_game_state['food_pos']=(food_x,food_y);break
+    with snake_game_state_lock:
+        engine=SnakeEngine(SNAKE_GRID_WIDTH,SNAKE_GRID_HEIGHT)
+        snake_game_state={'engine':engine,'game_active':True,'autopilot':SnakeAutopilot(engine.board) if autopilot else None};snake_stream['force_keyframe']=True;print("Snake game initialized/restarted")
+def snake_snapshot(engine, game_active): return dict(engine.snapshot(),game_active=game_active,grid_size=SNAKE_GRID_SIZE)
+def snake_get_snapshot_unsafe(): return snake_snapshot(snake_game_state['engine'],snake_game_state['game_active']) # Caller holds the lock; the copy is safe to serialize after release
+# 'snake_update_state' is the full snapshot (a keyframe, the only frame carrying the body and the fixed grid fields). In
+# between, 'snake_state_delta' carries what one step changed: the new head and whether the tail was popped, plus food,
+# score and game-over only when they changed, so its size does not grow with the snake. Every frame has a `seq`; a
+# client that sees a gap asks for a keyframe with 'snake_request_keyframe'.
+def snake_stream_next_frame(stream, engine, event, game_active):
+    """Returns (event, payload) for the step whose SnakeEngine.step() returned `event`: a keyframe on start, resync or every N ticks, else a delta."""
+    stream['seq']+=1;stream['ticks_since_keyframe']+=1
+    if stream['force_keyframe'] or stream['ticks_since_keyframe']>=SNAKE_KEYFRAME_INTERVAL_TICKS:
+        stream['force_keyframe']=False;stream['ticks_since_keyframe']=0;stream['food']=engine.food;stream['score']=engine.score
+        return 'snake_update_state',dict(snake_snapshot(engine,game_active),seq=stream['seq'])
+    delta={'seq':stream['seq']}
+    if event!=SNAKE_DIED:delta['head']=engine.head;delta['tail_popped']=event==SNAKE_MOVED # A death leaves the body as it was
+    if engine.food!=stream['food']:delta['food_pos']=stream['food']=engine.food
+    if engine.score!=stream['score']:delta['score']=stream['score']=engine.score
+    if engine.is_over:delta['is_game_over']=True;delta['game_active']=game_active
+    return 'snake_state_delta',delta
 def snake_game_loop_function():
-    global snake_game_state
     while True:
-        with snake_game_lock:
+        with snake_game_state_lock:
             if not snake_game_state.get('game_active',False):break
-            if snake_game_state.get('is_game_over',False):socketio.emit('snake_update_state',dict(snake_game_state));time.sleep(SNAKE_GAME_SPEED);continue
-            head_x,head_y=snake_game_state['snake_body'][0]
-            if snake_game_state['direction']=='UP':new_head=(head_x,head_y-1)
-            elif snake_game_state['direction']=='DOWN':new_head=(head_x,head_y+1)
-            elif snake_game_state['direction']=='LEFT':new_head=(head_x-1,head_y)
-            else:new_head=(head_x+1,head_y)
-            if not(0<=new_head[0]<SNAKE_GRID_WIDTH and 0<=new_head[1]<SNAKE_GRID_HEIGHT)or new_head in snake_game_state['snake_body']:
-                snake_game_state['is_game_over']=True;snake_game_state['game_active']=False;print(f"Snake Game Over! Score: {snake_game_state['score']}")
-            if not snake_game_state['is_game_over']:
-                snake_game_state['snake_body'].insert(0,new_head)
-                if new_head==snake_game_state['food_pos']:snake_game_state['score']+=1;snake_place_food_unsafe()
-                else:snake_game_state['snake_body'].pop()
-            current_snapshot=dict(snake_game_state)
-        socketio.emit('snake_update_state',current_snapshot);time.sleep(SNAKE_GAME_SPEED)
+            engine=snake_game_state['engine'];pilot=snake_game_state['autopilot']
+            if pilot is not None:pilot.steer(engine)
+            step_event=engine.step()
+            if engine.is_over:snake_game_state['game_active']=False;print(f"Snake Game Over! Score: {engine.score}")
+            event,payload=snake_stream_next_frame(snake_stream,engine,step_event,snake_game_state['game_active'])
+            resync=('snake_update_state',dict(snake_get_snapshot_unsafe(),seq=snake_stream['seq'])) if event=='snake_state_delta' and client_room_needs_resync(GAME_ROOMS['snake'],'snake') else None
+        game_emit('snake',event,payload,resync=resync);time.sleep(SNAKE_GAME_SPEED)
     print("Exited Snake game loop")
-def snake_start_new_game_instance():
+def snake_start_new_game_instance(autopilot=False):
     global snake_game_loop_thread
-    with snake_game_lock:
-        if snake_game_loop_thread and snake_game_loop_thread.is_alive():
-            if'game_active'in snake_game_state:snake_game_state['game_active']=False
-            snake_game_loop_thread.join(timeout=SNAKE_GAME_SPEED*2)
-        snake_initialize_game()
-        snake_game_loop_thread=threading.Thread(target=snake_game_loop_function,daemon=True);snake_game_loop_thread.start()
-        print("New Snake game instance started.")
+    with snake_game_state_lock:
+        old_thread=snake_game_loop_thread
+        if old_thread and old_thread.is_alive() and'game_active'in snake_game_state:snake_game_state['game_active']=False
+    if old_thread and old_thread.is_alive():old_thread.join(timeout=SNAKE_GAME_SPEED*2) # Join outside the lock so the old loop can observe game_active and exit
+    snake_initialize_game(autopilot)
+    snake_game_loop_thread=threading.Thread(target=snake_game_loop_function,daemon=True);snake_game_loop_thread.start()
+    print("New Snake game instance started.")
+
+# --- Snake Arena (condensed) ---
+# Many clients, one SnakeArena: every snake advances in the same tick against one shared occupancy grid.
+def snake_arena_snapshot_unsafe(): return dict(snake_arena.snapshot(),grid_size=SNAKE_ARENA_GRID_SIZE) # Caller holds snake_arena_lock
+def snake_arena_loop():
+    """Ticks the arena every SNAKE_GAME_SPEED (measured from tick start) until the last client leaves."""
+    global snake_arena,snake_arena_thread
+    while True:
+        tick_start=time.monotonic()
+        with snake_arena_lock:
+            if not snake_arena_clients:snake_arena=None;snake_arena_thread=None;snake_arena_bots.clear();break
+            snake_arena_steer_bots_unsafe()
+            for snake_id in snake_arena.tick():
+                if snake_id in snake_arena_bots:snake_arena.respawn(snake_id) # Bots rejoin at once; players restart themselves
+            snapshot=snake_arena_snapshot_unsafe()
+        game_emit('snake_arena','snake_arena_state',snapshot)
+        time.sleep(max(0.0,SNAKE_GAME_SPEED-(time.monotonic()-tick_start)))
+    print("Exited Snake arena loop (no clients)")
+def snake_arena_steer_bots_unsafe():
+    """Lets every bot's autopilot turn its snake for the coming tick and times the lot. Caller holds snake_arena_lock."""
+    if not snake_arena_bots:return
+    start=time.perf_counter()
+    for snake_id,pilot in snake_arena_bots.items():
+        snake=snake_arena.snakes.get(snake_id)
+        if snake is None or not snake.alive:continue
+        direction=pilot.decide(snake.body,snake.moved_direction,snake_arena.food)
+        if direction is not None:snake_arena.turn(snake_id,direction)
+    ms=(time.perf_counter()-start)*1000;timing=snake_arena_bot_timing;timing['ticks']+=1;timing['last_ms']=ms
+    timing['avg_ms']=ms if timing['ticks']==1 else timing['avg_ms']+(ms-timing['avg_ms'])*0.1;timing['max_ms']=max(timing['max_ms'],ms)
+def snake_arena_set_bots(count):
+    """Adds or removes autopilot snakes until the running arena has `count` (capped at SNAKE_ARENA_MAX_BOTS). Returns the number running."""
+    with snake_arena_lock:
+        if snake_arena is None:return 0
+        count=max(0,min(int(count),SNAKE_ARENA_MAX_BOTS))
+        while len(snake_arena_bots)>count:snake_arena.remove(snake_arena_bots.popitem()[0])
+        while len(snake_arena_bots)<count:
+            snake_id=snake_arena.join()
+            if snake_id is None:break # Arena is full
+            snake_arena_bots[snake_id]=SnakeAutopilot(snake_arena.board,use_cycle=False) # The Hamiltonian cycle only keeps a snake safe from itself
+        return len(snake_arena_bots)
+def snake_arena_join(sid):
+    """Gives the client a snake (a fresh one after dying), creating the arena and its loop on first join. Returns the snake id."""
+    global snake_arena,snake_arena_thread
+    with snake_arena_lock:
+        if snake_arena is None:
+            snake_arena=SnakeArena(SNAKE_ARENA_GRID_WIDTH,SNAKE_ARENA_GRID_HEIGHT,SNAKE_ARENA_FOOD);snake_arena_bot_timing.update(ticks=0,last_ms=0.0,avg_ms=0.0,max_ms=0.0)
+        snake_id=snake_arena_clients.get(sid)
+        if snake_id is None or not snake_arena.respawn(snake_id):
+            if snake_id is not None:snake_arena.remove(snake_id)
+            snake_id=snake_arena.join()
+            if snake_id is None:snake_arena_clients.pop(sid,None)
+            else:snake_arena_clients[sid]=snake_id
+        if snake_arena_thread is None:snake_arena_thread=threading.Thread(target=snake_arena_loop,daemon=True);snake_arena_thread.start()
+    return snake_id
+def snake_arena_leave(sid):
+    with snake_arena_lock:
+        snake_id=snake_arena_clients.pop(sid,None)
+        if snake_id is not None and snake_arena is not None:snake_arena.remove(snake_id)
+def snake_arena_get_stats():
+    """Arena size and tick timings; `estimated_tick_headroom` is how many ticks of this cost fit in one tick interval."""
+    with snake_arena_lock:
+        if snake_arena is None:return {'active':False}
+        stats=dict(snake_arena.stats);snakes=snake_arena.snakes.values()
+        alive=sum(1 for s in snakes if s.alive);cells=sum(len(s.body) for s in snakes if s.alive)
+    return {'active':True,'clients':len(snake_arena_clients),'snakes_alive':alive,'body_cells':cells,'tick_interval_ms':SNAKE_GAME_SPEED*1000,
+            'tick':{k:round(v,4) if isinstance(v,float) else v for k,v in stats.items()},
+            'estimated_tick_headroom':int(SNAKE_GAME_SPEED*1000/stats['avg_ms']) if stats['avg_ms']>0 else None}
+def snake_autopilot_get_stats():
+    """Decision costs of the classic game's autopilot and the arena bots; `estimated_bots_per_tick` is how many bots at the
+    measured per-bot cost one SNAKE_GAME_SPEED tick could drive."""
+    def rounded(stats): return {k:round(v,4) if isinstance(v,float) else v for k,v in stats.items()}
+    with snake_game_state_lock:
+        pilot=snake_game_state.get('autopilot');classic=dict(pilot.stats) if pilot is not None else None
+    with snake_arena_lock:
+        bots=len(snake_arena_bots);timing=dict(snake_arena_bot_timing)
+        decisions=sum(p.stats['decisions'] for p in snake_arena_bots.values());hits=sum(p.stats['cache_hits'] for p in snake_arena_bots.values())
+    per_bot_ms=timing['avg_ms']/bots if bots and timing['ticks'] else classic['avg_ms'] if classic else 0.0
+    return {'classic':rounded(classic) if classic else None,
+            'arena':{'bots':bots,'steer_all':rounded(timing),'cache_hit_rate':round(hits/decisions,4) if decisions else None},
+            'tick_interval_ms':SNAKE_GAME_SPEED*1000,'per_bot_ms':round(per_bot_ms,4),
+            'estimated_bots_per_tick':int(SNAKE_GAME_SPEED*1000/per_bot_ms) if per_bot_ms>0 else None}
 
 # --- Memory Game Logic (condensed) ---
 def memory_initialize_game():
-    global memory_game_state
     with memory_game_lock:
         symbols_for_board=(MEMORY_GAME_SYMBOLS[:MEMORY_BOARD_PAIRS]*2);random.shuffle(symbols_for_board)
         memory_game_state['board']=[{'id':i,'symbol':symbols_for_board[i],'is_flipped':False,'is_matched':False} for i in range(MEMORY_BOARD_SIZE)]
         memory_game_state['flipped_indices']=[];memory_game_state['moves']=0;memory_game_state['matches_found']=0;memory_game_state['is_over']=False;memory_game_state['lock_board']=False;print("Memory game initialized.")
-def memory_get_client_state(): return {'board':memory_game_state['board'],'moves':memory_game_state['moves'],'is_over':memory_game_state['is_over'],'lock_board':memory_game_state['lock_board']}
+def memory_get_client_state(): return {'board':[dict(card) for card in memory_game_state['board']],'moves':memory_game_state['moves'],'is_over':memory_game_state['is_over'],'lock_board':memory_game_state['lock_board']} # Caller holds memory_game_lock; cards are copied so the snapshot can be emitted after release
 
 # --- Hangman Game Logic ---
 def hangman_initialize_game():
-    global hangman_game_state
     with hangman_game_state_lock:
         hangman_game_state['secret_word'] = random.choice(HANGMAN_WORD_LIST)
         hangman_game_state['guessed_letters'] = set()
@@ -229,7 +730,7 @@ def hangman_initialize_game():
 def get_hangman_public_state():
     with hangman_game_state_lock:
         return {
-            'display_word': hangman_game_state['display_word'],
+            'display_word': list(hangman_game_state['display_word']),
             'guessed_letters': list(hangman_game_state['guessed_letters']),
             'wrong_guesses_count': hangman_game_state['wrong_guesses_count'],
             'max_wrong_guesses': HANGMAN_MAX_WRONG_GUESSES,
@@ -239,7 +740,6 @@ def get_hangman_public_state():
 
 # --- Gobang Game Logic ---
 def gobang_initialize_game():
-    global gobang_game_state
     with gobang_game_state_lock:
         gobang_game_state['board'] = [[0 for _ in range(GOBANG_BOARD_SIZE)] for _ in range(GOBANG_BOARD_SIZE)]
         gobang_game_state['current_player'] = 1 # Player (black) starts
@@ -273,21 +773,25 @@ def gobang_ai_find_best_move(board):
         return random.choice(empty_cells)
     return None
 
+def get_gobang_public_state_unsafe():
+    """Snapshot for clients; caller holds gobang_game_state_lock. Rows are copied so it can be emitted after release."""
+    return {
+        'board': [list(row) for row in gobang_game_state['board']],
+        'status_message': gobang_game_state['game_status_message'],
+        'is_game_over': gobang_game_state['is_game_over'],
+        'is_player_turn': gobang_game_state['is_player_turn']
+    }
+
 def get_gobang_public_state():
     with gobang_game_state_lock:
-        return {
-            'board': gobang_game_state['board'],
-            'status_message': gobang_game_state['game_status_message'],
-            'is_game_over': gobang_game_state['is_game_over'],
-            'is_player_turn': gobang_game_state['is_player_turn']
-        }
+        return get_gobang_public_state_unsafe()
 
 
 # --- Flask Routes ---
 @app.route('/')
 def lobby(): return render_template('lobby.html')
 @app.route('/tank_game_page')
-def tank_game_page_route(): return render_template('index.html')
+def tank_game_page_route(): return render_template('index.html',tank_frame_ms=int(TANK_BROADCAST_INTERVAL*1000))
 @app.route('/snake_game_page')
 def snake_game_page_route(): return render_template('snake_game.html')
 @app.route('/memory_game_page')
@@ -296,50 +800,93 @@ def memory_game_page_route(): return render_template('memory_game.html')
 def hangman_game_page_route(): return render_template('hangman_game.html')
 @app.route('/gobang_game_page')
 def gobang_game_page_route(): return render_template('gobang_game.html')
+@app.route('/lock_hold_stats')
+def lock_hold_stats_route(): return jsonify(game_get_lock_hold_stats())
+@app.route('/tank_rooms_stats')
+def tank_rooms_stats_route(): return jsonify(tank_get_rooms_stats())
+@app.route('/socket_bytes_stats')
+def socket_bytes_stats_route(): return jsonify(game_get_bytes_stats())
+@app.route('/snake_arena_stats')
+def snake_arena_stats_route(): return jsonify(snake_arena_get_stats())
+@app.route('/snake_autopilot_stats')
+def snake_autopilot_stats_route(): return jsonify(snake_autopilot_get_stats())
+@app.route('/client_queue_stats')
+def client_queue_stats_route(): return jsonify(client_get_queue_stats())
 
 # --- SocketIO Event Handlers ---
 @socketio.on('tank_connect') # Tank Game
-def handle_tank_connect():
-    global tank_game_loop_thread;print('Client connected to Tank game.')
-    with tank_game_state_lock:
-        is_first_or_stale=not tank_game_state or tank_game_state.get('current_level',0)==0 or not tank_game_loop_thread or not tank_game_loop_thread.is_alive()
-        if is_first_or_stale:
-            tank_reset_game_state()
-            if not tank_game_loop_thread or not tank_game_loop_thread.is_alive():
-                tank_game_loop_thread=threading.Thread(target=tank_game_loop,daemon=True);tank_game_loop_thread.start()
-        socketio.emit('tank_update_state',tank_game_state)
+def handle_tank_connect(data=None):
+    requested_room=(data or {}).get('room')
+    room,promoted=tank_join_room(request.sid,requested_room);print(f"Client connected to Tank room {room['name']} as {tank_client_role(room,request.sid)}.")
+    with room['lock']:
+        if not room['engine'].state.get('game_active',False):room['engine'].reset(SERVER_HIGH_SCORE);room['stream']['force_keyframe']=True
+    if not client_request_resync(request.sid,'tank'): # The joining client alone gets a keyframe on the next tick
+        with room['lock']:room['stream']['force_keyframe']=True
+    tank_send_config(room,request.sid)
+    if promoted:tank_notify_promoted(promoted)
+@socketio.on('tank_request_keyframe') # Tank Game
+def handle_tank_request_keyframe():
+    room=tank_get_client_room(request.sid)
+    if room is None or client_request_resync(request.sid,'tank'):return # Only this client gets the keyframe, with the room's next frame
+    with room['lock']:room['stream']['force_keyframe']=True
 @socketio.on('tank_player_input') # Tank Game
 def handle_tank_player_input(data):
-    with tank_game_state_lock:
-        if tank_game_state.get('is_over',False)or tank_game_state.get('player_tank',{}).get('status')=='destroyed':return
-        player_tank=tank_game_state['player_tank'];action=data.get('action')
-        if action=='move':direction=data.get('direction');speed=TANK_SPEED if direction=='forward'else -TANK_SPEED;player_tank['x']+=speed*math.cos(player_tank['angle']);player_tank['y']+=speed*math.sin(player_tank['angle'])
-        elif action=='rotate':direction=data.get('direction');player_tank['angle']-=(TANK_ROTATION_SPEED if direction=='left'else -TANK_ROTATION_SPEED);player_tank['angle']%= (2*math.pi)
-        elif action=='shoot':bx,by=player_tank['x']+TANK_TURRET_LENGTH*math.cos(player_tank['angle']),player_tank['y']+TANK_TURRET_LENGTH*math.sin(player_tank['angle']);tank_game_state['bullets'].append({'id':str(uuid.uuid4()),'x':bx,'y':by,'angle':player_tank['angle'],'speed':TANK_BULLET_SPEED,'owner':'player','color':'#00FFFF'})
+    """Queues one input for the next tick without touching the room lock; the scheduler drains it into TankEngine.step."""
+    room=tank_get_client_room(request.sid)
+    if room is None or not isinstance(data,dict)or data.get('action')not in TANK_INPUT_ACTIONS:return
+    queue=room['inputs'].get(request.sid)
+    if queue is None:return
+    seq=data.get('seq');queue.append((seq if isinstance(seq,int) else None,data['action'],data.get('direction')))
 @socketio.on('tank_restart_game') # Tank Game
 def handle_tank_restart_game():
-    global tank_game_loop_thread;print("Tank game restart request received.");tank_reset_game_state()
-    if not tank_game_loop_thread or not tank_game_loop_thread.is_alive():print("Tank game loop was not running. Starting it now.");tank_game_loop_thread=threading.Thread(target=tank_game_loop,daemon=True);tank_game_loop_thread.start()
-    socketio.emit('tank_update_state',tank_game_state)
+    room=tank_get_client_room(request.sid)
+    if room is None:room,_=tank_join_room(request.sid)
+    if room['player']!=request.sid:return # Spectators watch the battle; only its player restarts it
+    print(f"Tank game restart request received for room {room['name']}.");tank_reset_game_state(room)
 
 @socketio.on('snake_start_game') # Snake Game
-def handle_snake_start_game():
-    print("Snake game started/restarted by client");snake_start_new_game_instance()
-    with snake_game_lock:socketio.emit('snake_update_state',dict(snake_game_state))
+def handle_snake_start_game(data=None):
+    if isinstance(data,dict) and data.get('arena'): # Arena mode: this client's own snake on the shared grid
+        game_join_room('snake_arena');snake_id=snake_arena_join(request.sid)
+        game_emit('snake_arena','snake_arena_joined',{'id':snake_id},to=request.sid);return
+    autopilot=isinstance(data,dict) and bool(data.get('autopilot')) # Attract mode: the autopilot plays until a key is pressed
+    print("Snake game started/restarted by client");game_join_room('snake');snake_start_new_game_instance(autopilot) # The new loop's first frame is a keyframe
+@socketio.on('snake_arena_bots') # Snake Game
+def handle_snake_arena_bots(data):
+    """An arena client sets how many autopilot snakes share the arena; the count actually running is sent back."""
+    if request.sid not in snake_arena_clients or not isinstance(data,dict):return
+    try:count=int(data.get('count',0))
+    except (TypeError,ValueError):return
+    game_emit('snake_arena','snake_arena_bots',{'count':snake_arena_set_bots(count)},to=request.sid)
+@socketio.on('snake_request_keyframe') # Snake Game
+def handle_snake_request_keyframe():
+    with snake_game_state_lock:
+        if snake_game_state.get('game_active',False): # The loop sends this client a keyframe on its next tick
+            if not client_request_resync(request.sid,'snake'):snake_stream['force_keyframe']=True
+            return
+        if 'engine' not in snake_game_state:return
+        current_snapshot=dict(snake_get_snapshot_unsafe(),seq=snake_stream['seq']) # Loop has stopped: the final state, as of the last seq sent
+    game_emit('snake','snake_update_state',current_snapshot,to=request.sid)
 @socketio.on('snake_change_direction') # Snake Game
 def handle_snake_change_direction(data):
     new_dir=data.get('direction')
     if not new_dir:return
-    with snake_game_lock:
-        if snake_game_state.get('is_game_over',True)or not snake_game_state.get('game_active',False):return
-        current_dir=snake_game_state['direction']
-        if(new_dir=='UP'and current_dir!='DOWN')or(new_dir=='DOWN'and current_dir!='UP')or(new_dir=='LEFT'and current_dir!='RIGHT')or(new_dir=='RIGHT'and current_dir!='LEFT'):snake_game_state['direction']=new_dir
+    with snake_arena_lock:
+        snake_id=snake_arena_clients.get(request.sid)
+        if snake_id is not None:snake_arena.turn(snake_id,new_dir);return
+    with snake_game_state_lock:
+        if not snake_game_state.get('game_active',False):return
+        snake_game_state['autopilot']=None # The player takes over from the autopilot, if it was playing
+        snake_game_state['engine'].turn(new_dir) # Ignores reversals onto the snake's own neck
 
 @socketio.on('memory_start_game') # Memory Game
 def handle_memory_start_game():
-    with memory_game_lock:memory_initialize_game();socketio.emit('memory_update_state',memory_get_client_state())
+    game_join_room('memory');memory_initialize_game()
+    with memory_game_lock:snapshot=memory_get_client_state()
+    game_emit('memory','memory_update_state',snapshot)
 @socketio.on('memory_flip_card') # Memory Game
 def handle_memory_flip_card(data):
+    snapshots=[] # Taken under the lock, emitted after it is released
     with memory_game_lock:
         if memory_game_state['lock_board']or memory_game_state['is_over']:return
         card_id=data.get('card_id')
@@ -347,7 +894,7 @@ def handle_memory_flip_card(data):
         card=memory_game_state['board'][card_id]
         if card['is_flipped']or card['is_matched']:return
         card['is_flipped']=True;memory_game_state['flipped_indices'].append(card_id)
-        socketio.emit('memory_update_state',memory_get_client_state())
+        snapshots.append(memory_get_client_state())
         if len(memory_game_state['flipped_indices'])==2:
             memory_game_state['moves']+=1;memory_game_state['lock_board']=True
             idx1,idx2=memory_game_state['flipped_indices']
@@ -356,7 +903,7 @@ def handle_memory_flip_card(data):
                 card1['is_matched'],card2['is_matched']=True,True
                 memory_game_state['matches_found']+=1;memory_game_state['flipped_indices']=[];memory_game_state['lock_board']=False
                 if memory_game_state['matches_found']*2==MEMORY_BOARD_SIZE:memory_game_state['is_over']=True
-                socketio.emit('memory_update_state',memory_get_client_state())
+                snapshots.append(memory_get_client_state())
             else:
                 def unflip_task():
                     socketio.sleep(1.0)
@@ -364,13 +911,15 @@ def handle_memory_flip_card(data):
                         if memory_game_state['board'] and idx1<len(memory_game_state['board']) and memory_game_state['board'][idx1]['is_flipped']and not memory_game_state['board'][idx1]['is_matched'] and idx2<len(memory_game_state['board']) and memory_game_state['board'][idx2]['is_flipped']and not memory_game_state['board'][idx2]['is_matched']:
                             memory_game_state['board'][idx1]['is_flipped']=False;memory_game_state['board'][idx2]['is_flipped']=False
                         memory_game_state['flipped_indices']=[];memory_game_state['lock_board']=False
-                        socketio.emit('memory_update_state',memory_get_client_state())
+                        snapshot=memory_get_client_state()
+                    game_emit('memory','memory_update_state',snapshot)
                 socketio.start_background_task(target=unflip_task)
+    for snapshot in snapshots:game_emit('memory','memory_update_state',snapshot)
 
 @socketio.on('hangman_start_game') # Hangman Game
 def handle_hangman_start_game():
-    with hangman_game_state_lock: hangman_initialize_game()
-    socketio.emit('hangman_update_state', get_hangman_public_state())
+    game_join_room('hangman'); hangman_initialize_game()
+    game_emit('hangman', 'hangman_update_state', get_hangman_public_state())
 @socketio.on('hangman_guess_letter') # Hangman Game
 def handle_hangman_guess_letter(data):
     with hangman_game_state_lock:
@@ -385,14 +934,14 @@ def handle_hangman_guess_letter(data):
         else:
             hangman_game_state['wrong_guesses_count']+=1
             if hangman_game_state['wrong_guesses_count']>=HANGMAN_MAX_WRONG_GUESSES:hangman_game_state['game_status']='lost'
-    socketio.emit('hangman_update_state',get_hangman_public_state())
+    game_emit('hangman','hangman_update_state',get_hangman_public_state())
 
 # Gobang Game SocketIO Handlers
 @socketio.on('gobang_start_game')
 def handle_gobang_start_game():
-    with gobang_game_state_lock:
-        gobang_initialize_game()
-    socketio.emit('gobang_update_state', get_gobang_public_state())
+    game_join_room('gobang')
+    gobang_initialize_game()
+    game_emit('gobang', 'gobang_update_state', get_gobang_public_state())
 
 @socketio.on('gobang_player_move')
 def handle_gobang_player_move(data):
@@ -409,19 +958,21 @@ def handle_gobang_player_move(data):
             gobang_game_state['is_game_over'] = True
             gobang_game_state['game_status_message'] = "恭喜! 玩家获胜!"
             gobang_game_state['is_player_turn'] = False
-            socketio.emit('gobang_update_state', get_gobang_public_state())
-            return
-
-        if not any(0 in r for r in gobang_game_state['board']): # Check for draw
+            ai_should_move = False
+        elif not any(0 in r for r in gobang_game_state['board']): # Check for draw
             gobang_game_state['is_game_over'] = True
             gobang_game_state['game_status_message'] = "平局!"
             gobang_game_state['is_player_turn'] = False
-            socketio.emit('gobang_update_state', get_gobang_public_state())
-            return
+            ai_should_move = False
+        else:
+            gobang_game_state['is_player_turn'] = False
+            gobang_game_state['game_status_message'] = "AI思考中..."
+            ai_should_move = True
+        snapshot = get_gobang_public_state_unsafe()
 
-        gobang_game_state['is_player_turn'] = False
-        gobang_game_state['game_status_message'] = "AI思考中..."
-        socketio.emit('gobang_update_state', get_gobang_public_state())
+    game_emit('gobang', 'gobang_update_state', snapshot) # Emitted after releasing the lock
+    if not ai_should_move:
+        return
 
     # AI's turn - run as background task to allow emit before AI "thinks"
     def ai_turn_task():
@@ -446,25 +997,30 @@ def handle_gobang_player_move(data):
                  if not gobang_game_state['is_game_over']:
                     gobang_game_state['is_game_over'] = True
                     gobang_game_state['game_status_message'] = "平局! (AI无法移动)"
-            socketio.emit('gobang_update_state', get_gobang_public_state())
+            snapshot = get_gobang_public_state_unsafe()
+        game_emit('gobang', 'gobang_update_state', snapshot)
 
     socketio.start_background_task(target=ai_turn_task)
 
 
 @socketio.on('connect')
-def general_connect():print("A client connected (general connection). Game-specific start event expected from client.")
+def general_connect(auth=None):
+    client_open_queue(request.sid,auth.get('wire','json') if isinstance(auth,dict) else 'json')
+    print("A client connected (general connection). Game-specific start event expected from client.")
 @socketio.on('disconnect')
-def general_disconnect():print("A client disconnected.")
+def general_disconnect():
+    print("A client disconnected.")
+    with tank_rooms_lock:promoted=tank_leave_room_unsafe(request.sid)
+    if promoted:tank_notify_promoted(promoted)
+    snake_arena_leave(request.sid)
+    client_close_queue(request.sid)
 
 if __name__ == '__main__':
     print("Initializing server and preparing game states...")
-    with tank_game_state_lock: tank_game_state = {'game_active': False, 'current_level':0}
-    with snake_game_lock: snake_game_state = {'game_active': False}
-    with memory_game_lock: memory_initialize_game()
-    with hangman_game_state_lock: hangman_initialize_game()
-    with gobang_game_state_lock: gobang_initialize_game() # Initialize Gobang state at start
+    with snake_game_state_lock: snake_game_state = {'game_active': False}
+    memory_initialize_game()
+    hangman_initialize_game()
+    gobang_initialize_game() # Initialize Gobang state at start
 
     print("Starting Flask-SocketIO server on http://localhost:5000 ...")
     socketio.run(app, debug=True, use_reloader=False, host='0.0.0.0', port=5000)
-
-[end of games/tank_game/main.py]
@@ -1,6 +1,6 @@
 document.addEventListener('DOMContentLoaded', () => {
     // Connects to the server that served this HTML file (main app on port 5000)
-    const socket = io();
+    const socket = io({ auth: GameWire.auth() }); // Binary state frames unless the page was opened with ?wire=json
 
     const canvas = document.getElementById('gameCanvas');
     const ctx = canvas.getContext('2d');
@@ -15,25 +15,62 @@ document.addEventListener('DOMContentLoaded', () => {
     let CANVAS_HEIGHT = 400;
     // Canvas dimensions will be set based on first state update from server
 
+    // ?arena=1 joins the shared multiplayer arena: every client steers its own snake on one grid; add &bots=N for N
+    // autopilot opponents. ?autopilot=1 lets the server's autopilot play the classic game until a key is pressed.
+    const pageParams = new URLSearchParams(window.location.search);
+    const arenaMode = pageParams.has('arena');
+    const arenaBots = parseInt(pageParams.get('bots'), 10) || 0;
+    const autopilotMode = pageParams.has('autopilot');
+    let arenaSnakeId = null;
+
+    function startGame() {
+        if (arenaMode) socket.emit('snake_start_game', { arena: true });
+        else if (autopilotMode) socket.emit('snake_start_game', { autopilot: true });
+        else socket.emit('snake_start_game');
+    }
+
     function drawPixel(x, y, color) {
         ctx.fillStyle = color;
         ctx.fillRect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE -1 , GRID_SIZE -1);
     }
 
+    function resizeCanvas(gameState) {
+        GRID_SIZE = gameState.grid_size;
+        const expectedCanvasWidth = gameState.grid_width * GRID_SIZE;
+        const expectedCanvasHeight = gameState.grid_height * GRID_SIZE;
+        if (canvas.width !== expectedCanvasWidth) canvas.width = expectedCanvasWidth;
+        if (canvas.height !== expectedCanvasHeight) canvas.height = expectedCanvasHeight;
+    }
+
+    function drawArena(arenaState) {
+        resizeCanvas(arenaState);
+        ctx.fillStyle = '#ecf0f1';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        arenaState.food.forEach(cell => drawPixel(cell[0], cell[1], '#e74c3c'));
+        let own = null;
+        arenaState.snakes.forEach(snake => {
+            if (snake.id === arenaSnakeId) { own = snake; return; } // Drawn last, on top
+            if (!snake.alive) return;
+            const hue = (snake.id * 137) % 360; // Spread other players' colours around the wheel
+            snake.body.forEach((segment, index) => drawPixel(segment[0], segment[1], `hsl(${hue}, 45%, ${index === 0 ? 35 : 60}%)`));
+        });
+        if (own && own.alive) {
+            own.body.forEach((segment, index) => drawPixel(segment[0], segment[1], index === 0 ? '#2c3e50' : '#3498db'));
+        }
+        const alive = arenaState.snakes.filter(snake => snake.alive).length;
+        scoreDisplay.textContent = `分数: ${own ? own.score : 0} | 存活: ${alive}/${arenaState.snakes.length}`;
+        const over = !own || !own.alive;
+        if (over) finalScoreDisplay.textContent = own ? own.score : 0;
+        gameOverScreen.style.display = over ? 'block' : 'none';
+    }
+
     function drawGame(gameState) {
         if (!gameState || !gameState.grid_size) { // Wait for server to send game constants
             console.log("Waiting for game state with grid info...");
             return;
         }
 
-        // Update local constants if they differ (e.g. on first load)
-        if (GRID_SIZE !== gameState.grid_size) GRID_SIZE = gameState.grid_size;
-        const expectedCanvasWidth = gameState.grid_width * GRID_SIZE;
-        const expectedCanvasHeight = gameState.grid_height * GRID_SIZE;
-
-        if (canvas.width !== expectedCanvasWidth) canvas.width = expectedCanvasWidth;
-        if (canvas.height !== expectedCanvasHeight) canvas.height = expectedCanvasHeight;
-
+        resizeCanvas(gameState); // Update local constants if they differ (e.g. on first load)
 
         ctx.fillStyle = '#ecf0f1';
         ctx.fillRect(0, 0, canvas.width, canvas.height);
@@ -58,14 +95,65 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    socket.on('snake_update_state', (gameState) => {
+    // --- Delta Stream ---
+    // 'snake_update_state' is a full keyframe; 'snake_state_delta' carries the new head, whether the tail was popped,
+    // and food/score/game-over only when they changed since the previous seq.
+    let snakeState = null;
+    let snakeSeq = -1;
+    let snakeKeyframeRequestedAt = 0;
+    const SNAKE_KEYFRAME_RETRY_MS = 1000;
+
+    function requestSnakeKeyframe() {
+        // The server sends only this client a keyframe with its next frame; ask again if none arrives (e.g. the game ended)
+        const now = Date.now();
+        if (now - snakeKeyframeRequestedAt < SNAKE_KEYFRAME_RETRY_MS) return;
+        snakeKeyframeRequestedAt = now;
+        socket.emit('snake_request_keyframe');
+    }
+
+    function applySnakeDelta(state, delta) {
+        if (delta.head) {
+            state.snake_body.unshift(delta.head);
+            if (delta.tail_popped) state.snake_body.pop();
+        }
+        ['food_pos', 'score', 'is_game_over', 'game_active'].forEach(key => {
+            if (key in delta) state[key] = delta[key];
+        });
+        state.seq = delta.seq;
+    }
+
+    socket.on('snake_update_state', (gameState) => { // Full keyframe: replaces everything we had
+        if (gameState instanceof ArrayBuffer) gameState = GameWire.decodeSnakeState(gameState);
         if(gameState){
-             drawGame(gameState);
+             snakeState = gameState;
+             snakeSeq = gameState.seq;
+             snakeKeyframeRequestedAt = 0;
+             drawGame(snakeState);
         } else {
             console.error("Received null or undefined gameState for snake");
         }
     });
 
+    socket.on('snake_state_delta', (delta) => {
+        if (!snakeState) { requestSnakeKeyframe(); return; } // Still waiting for a keyframe
+        if (delta.seq !== snakeSeq + 1) { // Missed a frame: drop local state and ask for a keyframe
+            snakeState = null;
+            requestSnakeKeyframe();
+            return;
+        }
+        applySnakeDelta(snakeState, delta);
+        snakeSeq = delta.seq;
+        drawGame(snakeState);
+    });
+
+    socket.on('snake_arena_joined', (joined) => {
+        arenaSnakeId = joined.id;
+        if (arenaSnakeId === null) console.warn("Snake arena is full; try again shortly.");
+        else if (arenaBots > 0) socket.emit('snake_arena_bots', { count: arenaBots });
+    });
+    socket.on('snake_arena_bots', (bots) => console.log(`Snake arena bots running: ${bots.count}`));
+    socket.on('snake_arena_state', drawArena);
+
     document.addEventListener('keydown', (event) => {
         let direction = null;
         switch (event.key.toLowerCase()) {
@@ -80,14 +168,12 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
-    restartButton.addEventListener('click', () => {
-        socket.emit('snake_start_game');
-    });
+    restartButton.addEventListener('click', startGame);
 
     socket.on('connect', () => {
         console.log("Connected to main server for Snake game.");
-        // Request the server to start/initialize the snake game for this client/session
-        socket.emit('snake_start_game');
+        // Request the server to start/initialize the snake game (or an arena snake) for this client/session
+        startGame();
     });
 
     socket.on('disconnect', () => {
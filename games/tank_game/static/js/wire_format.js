@@ -0,0 +1,75 @@
+// Decoder for the binary state frames produced by game_wire.py (see its module docstring for the layout).
+// Pages opt in by connecting with io({ auth: GameWire.auth() }); add ?wire=json to the page URL to stay on JSON.
+const GameWire = (() => {
+    const VERSION = 4;
+    const KIND_TANK_KEYFRAME = 1;
+    const KIND_SNAKE_STATE = 2;
+    const COORD_SCALE = 8;
+    const ANGLE_SCALE = 65536 / (2 * Math.PI);
+    const FLAG_OVER = 1;
+    const FLAG_ACTIVE = 2;
+    const SNAKE_DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT'];
+    const BULLET_OWNERS = ['player', 'ai'];
+    const utf8 = new TextDecoder('utf-8');
+
+    function auth() {
+        const requested = new URLSearchParams(window.location.search).get('wire');
+        return { wire: requested === 'json' || typeof DataView === 'undefined' ? 'json' : 'binary' };
+    }
+
+    function reader(buffer) {
+        const view = new DataView(buffer);
+        let offset = 0;
+        const r = {
+            u8() { const v = view.getUint8(offset); offset += 1; return v; },
+            u16() { const v = view.getUint16(offset, true); offset += 2; return v; },
+            u32() { const v = view.getUint32(offset, true); offset += 4; return v; },
+            i16() { const v = view.getInt16(offset, true); offset += 2; return v; },
+            coord() { return r.i16() / COORD_SCALE; },
+            angle() { return r.u16() / ANGLE_SCALE; },
+            text(length) { const v = utf8.decode(new Uint8Array(buffer, offset, length)); offset += length; return v; },
+            list(count, readOne) { const items = new Array(count); for (let i = 0; i < count; i++) items[i] = readOne(); return items; },
+        };
+        return r;
+    }
+
+    function header(r, kind) {
+        const gotKind = r.u8(), version = r.u8();
+        if (gotKind !== kind || version !== VERSION) throw new Error(`Unexpected wire frame kind ${gotKind} v${version}`);
+    }
+
+    function decodeTankKeyframe(buffer) {
+        const r = reader(buffer);
+        header(r, KIND_TANK_KEYFRAME);
+        const seq = r.u32(), score = r.u32(), highScore = r.u32(), level = r.u16(), flags = r.u8();
+        const strings = r.list(r.u8(), () => r.text(r.u8()));
+        const player = { x: r.coord(), y: r.coord(), angle: r.angle(), color: strings[r.u8()], status: strings[r.u8()] };
+        const aiTanks = r.list(r.u16(), () => ({ id: r.u32(), x: r.coord(), y: r.coord(), angle: r.angle(), color: strings[r.u8()], status: strings[r.u8()] }));
+        const bullets = r.list(r.u32(), () => ({ id: r.u32(), x: r.coord(), y: r.coord(), angle: r.angle(), owner: BULLET_OWNERS[r.u8()], color: strings[r.u8()] }));
+        const targets = r.list(r.u16(), () => ({ id: r.u32(), x: r.coord(), y: r.coord(), width: r.u16(), height: r.u16(), status: strings[r.u8()] }));
+        const obstacles = r.list(r.u16(), () => ({ id: r.u32(), x: r.coord(), y: r.coord(), width: r.u16(), height: r.u16() }));
+        const events = r.list(r.u16(), () => r.text(r.u16()));
+        const inputAcks = {};
+        r.list(r.u16(), () => { const sid = r.text(r.u8()); inputAcks[sid] = r.u32(); });
+        return {
+            seq, score, high_score: highScore, current_level: level,
+            is_over: (flags & FLAG_OVER) !== 0, game_active: (flags & FLAG_ACTIVE) !== 0,
+            player_tank: player, ai_tanks: aiTanks, bullets, targets, map: { obstacles }, game_events: events, input_acks: inputAcks,
+        };
+    }
+
+    function decodeSnakeState(buffer) {
+        const r = reader(buffer);
+        header(r, KIND_SNAKE_STATE);
+        const seq = r.u32(), gridWidth = r.u16(), gridHeight = r.u16(), gridSize = r.u16(), score = r.u32(), flags = r.u8(), direction = r.u8();
+        const food = [r.u16(), r.u16()];
+        const body = r.list(r.u32(), () => [r.u16(), r.u16()]);
+        return {
+            seq, grid_width: gridWidth, grid_height: gridHeight, grid_size: gridSize, score,
+            is_game_over: (flags & FLAG_OVER) !== 0, game_active: (flags & FLAG_ACTIVE) !== 0,
+            direction: SNAKE_DIRECTIONS[direction] || null, food_pos: food, snake_body: body,
+        };
+    }
+
+    return { auth, decodeTankKeyframe, decodeSnakeState };
+})();
@@ -0,0 +1,160 @@
+"""Struct-of-arrays bullet storage for the tank game.
+
+Live bullets are packed into the first `count` slots of parallel NumPy arrays, so movement, bounds culling and the
+collision tests against the level's obstacles run as a handful of array operations per tick regardless of how many
+bullets are in flight. Bullets never change heading, so the per-tick velocity is computed once at spawn.
+
+The store is also the bullet pool: the slots past `count` are free and are reused by the next spawns, and compaction
+writes into a second, equally sized set of arrays that is then swapped in, so a tick in which bullets spawn and die
+allocates no per-bullet objects and, below the high-water capacity, no new arrays either.
+
+Collisions are swept: each tick a bullet covers the segment from its previous position to its new one, and that
+segment is tested against every box grown by the bullet radius, so fast bullets (or long ticks) cannot step over a
+thin obstacle or target between two sampled positions.
+"""
+import math
+
+import numpy as np
+
+TANK_BULLET_OWNER_PLAYER = 0
+TANK_BULLET_OWNER_AI = 1
+TANK_BULLET_OWNER_NAMES = ('player', 'ai')
+
+
+def tank_boxes_array(entities, bbox_of=None):
+    """(N, 4) float array of x, y, width, height for a list of entities."""
+    if bbox_of is None: rows = [(e['x'], e['y'], e['width'], e['height']) for e in entities]
+    else: rows = [bbox_of(e) for e in entities]
+    return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+
+class TankBulletStore:
+    FIELDS = ('ids', 'x', 'y', 'angle', 'speed', 'dx', 'dy', 'owner', 'colors')
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.next_id = 1  # Bullet ids only ever grow, so anything above the last frame's max id is new
+        self._allocate(capacity)
+        self._obstacle_source = None; self._obstacle_boxes = tank_boxes_array([])
+
+    @staticmethod
+    def _arrays(capacity):
+        return {'ids': np.zeros(capacity, dtype=np.int64), 'x': np.zeros(capacity), 'y': np.zeros(capacity),
+                'angle': np.zeros(capacity), 'speed': np.zeros(capacity), 'dx': np.zeros(capacity), 'dy': np.zeros(capacity),
+                'owner': np.zeros(capacity, dtype=np.int8), 'colors': np.empty(capacity, dtype=object)}
+
+    def _allocate(self, capacity):
+        old = {name: getattr(self, name) for name in self.FIELDS} if self.count else None
+        for name, values in self._arrays(capacity).items(): setattr(self, name, values)
+        self._spare = self._arrays(capacity)  # Compaction target, swapped with the live arrays
+        if old:
+            for name, values in old.items(): getattr(self, name)[:self.count] = values[:self.count]
+
+    def __len__(self): return self.count
+
+    def spawn(self, x, y, angle, speed, owner, color):
+        """Appends one bullet and returns its id. Capacity doubles when full, so spawning is amortised O(1)."""
+        if self.count == len(self.x): self._allocate(len(self.x) * 2)
+        i = self.count; bullet_id = self.next_id; self.next_id += 1
+        self.ids[i] = bullet_id; self.x[i] = x; self.y[i] = y; self.angle[i] = angle; self.speed[i] = speed
+        self.dx[i] = speed * math.cos(angle); self.dy[i] = speed * math.sin(angle)
+        self.owner[i] = owner; self.colors[i] = color
+        self.count += 1
+        return bullet_id
+
+    def clear(self): self.count = 0
+
+    def obstacle_boxes(self, obstacles):
+        """Obstacle boxes as an array, rebuilt only when the level replaced the obstacle list."""
+        if obstacles is not self._obstacle_source:
+            self._obstacle_source = obstacles; self._obstacle_boxes = tank_boxes_array(obstacles)
+        return self._obstacle_boxes
+
+    def advance(self, width, height, radius, obstacles):
+        """Moves every bullet one tick. Returns (keep, blocked_at).
+
+        `blocked_at` is the fraction of this tick's move (0..1) at which the bullet met an obstacle, 1 for bullets that
+        left the arena and inf otherwise; anything it hits earlier along the way is hit first. `keep` is blocked_at == inf.
+        """
+        n = self.count
+        x = self.x[:n]; y = self.y[:n]
+        x += self.dx[:n]; y += self.dy[:n]
+        boxes = self.obstacle_boxes(obstacles)
+        blocked_at = self.sweep(boxes, radius).min(axis=1) if len(boxes) and n else np.full(n, np.inf)
+        outside = ~((x > 0) & (x < width) & (y > 0) & (y < height))
+        blocked_at[outside] = np.minimum(blocked_at[outside], 1.0)
+        return np.isinf(blocked_at), blocked_at
+
+    def sweep(self, boxes, radius, indices=None):
+        """(bullets, boxes) matrix of the fraction (0..1) of the last move at which each bullet entered each box, inf if
+        it did not. Boxes are grown by `radius`, with strict bounds like `overlaps`, so a bullet that ends the move
+        overlapping a box always counts as entering it. Only pairs whose bounding boxes meet get the exact slab test."""
+        n = self.count
+        x1 = self.x[:n] if indices is None else self.x[indices]; y1 = self.y[:n] if indices is None else self.y[indices]
+        dx = self.dx[:n] if indices is None else self.dx[indices]; dy = self.dy[:n] if indices is None else self.dy[indices]
+        x0 = x1 - dx; y0 = y1 - dy
+        ox, oy, ow, oh = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        near = ((np.minimum(x0, x1) - radius)[:, None] < ox + ow) & ((np.maximum(x0, x1) + radius)[:, None] > ox) & \
+               ((np.minimum(y0, y1) - radius)[:, None] < oy + oh) & ((np.maximum(y0, y1) + radius)[:, None] > oy)
+        times = np.full(near.shape, np.inf)
+        bi, oi = np.nonzero(near)
+        if not len(bi): return times
+        entry = np.zeros(len(bi)); leave = np.ones(len(bi))
+        for start, delta, low, high in ((x0[bi], dx[bi], ox[oi] - radius, ox[oi] + ow[oi] + radius),
+                                        (y0[bi], dy[bi], oy[oi] - radius, oy[oi] + oh[oi] + radius)):
+            still = delta == 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_low = (low - start) / delta; t_high = (high - start) / delta
+            inside = (start > low) & (start < high)  # Slab test for bullets not moving along this axis
+            entry = np.maximum(entry, np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t_low, t_high)))
+            leave = np.minimum(leave, np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t_low, t_high)))
+        times[bi, oi] = np.where(entry < leave, entry, np.inf)
+        return times
+
+    def overlaps(self, boxes, radius, indices=None):
+        """(bullets, boxes) bool matrix of bullet bbox vs box overlap, using the same arithmetic as the scalar AABB test."""
+        n = self.count
+        x = self.x[:n] if indices is None else self.x[indices]; y = self.y[:n] if indices is None else self.y[indices]
+        bx = (x - radius)[:, None]; by = (y - radius)[:, None]; size = radius * 2
+        ox, oy, ow, oh = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        return (bx < ox + ow) & (bx + size > ox) & (by < oy + oh) & (by + size > oy)
+
+    def compact(self, keep):
+        """Drops bullets whose keep flag is False, preserving the order of the rest. Their slots go back to the pool."""
+        n = self.count
+        kept = int(np.count_nonzero(keep))
+        if kept == n: return
+        spare = self._spare
+        for name in self.FIELDS:
+            values = getattr(self, name); target = spare[name]
+            np.compress(keep, values[:n], out=target[:kept])
+            setattr(self, name, target); spare[name] = values
+        self.count = kept
+
+    def to_payload(self, indices=None):
+        """Bullets as the list of dicts the Socket.IO payload and the client expect."""
+        n = self.count
+        idx = np.arange(n) if indices is None else indices
+        return [{'id': i, 'x': x, 'y': y, 'angle': a, 'speed': s, 'owner': TANK_BULLET_OWNER_NAMES[o], 'color': c}
+                for i, x, y, a, s, o, c in zip(self.ids[idx].tolist(), self.x[idx].tolist(), self.y[idx].tolist(),
+                                               self.angle[idx].tolist(), self.speed[idx].tolist(), self.owner[idx].tolist(),
+                                               self.colors[idx].tolist())]
+
+    def snapshot(self):
+        """Ids and max id at the current frame, for diffing the next one."""
+        return {'ids': self.ids[:self.count].copy(), 'max_id': self.next_id - 1}
+
+    def encode_delta(self, snapshot, digits):
+        """created/changed/removed entry in the same shape as the dict entities' delta; moved bullets only carry x/y."""
+        n = self.count
+        ids = self.ids[:n]
+        created = np.nonzero(ids > snapshot['max_id'])[0]
+        survivors = np.nonzero(ids <= snapshot['max_id'])[0]
+        removed = np.setdiff1d(snapshot['ids'], ids[survivors], assume_unique=True)
+        entry = {}
+        if len(created): entry['created'] = self.to_payload(created)
+        if len(survivors):
+            entry['changed'] = [{'id': i, 'x': x, 'y': y} for i, x, y in zip(
+                ids[survivors].tolist(), np.round(self.x[survivors], digits).tolist(), np.round(self.y[survivors], digits).tolist())]
+        if len(removed): entry['removed'] = removed.tolist()
+        return entry
@@ -0,0 +1,462 @@
+"""Headless tank battle simulation.
+
+Everything that decides what happens in a battle lives here: the rules, level generation, player input and the
+per-tick update. The module has no Flask or Socket.IO dependency, and all randomness flows through an explicit
+`random.Random`, so a TankEngine can be stepped as fast as the CPU allows and a given seed plus input sequence always
+plays out the same way. main.py wraps one engine per room and owns the networking, locking and timing around it.
+"""
+import collections
+import heapq
+import math
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from tank_bullets import TankBulletStore, tank_boxes_array, TANK_BULLET_OWNER_PLAYER, TANK_BULLET_OWNER_AI
+from tank_navigation import TankNavigator
+from tank_spatial import TankSpatialGrid
+
+TANK_GAME_CANVAS_WIDTH = 800; TANK_GAME_CANVAS_HEIGHT = 600; TANK_SPEED = 3; TANK_ROTATION_SPEED = 0.1; TANK_BULLET_SPEED = 7; TANK_GAME_LOOP_INTERVAL = 0.1; TANK_TARGET_HIT_SCORE = 10; TANK_AI_DESTROYED_SCORE_BASE = 50; TANK_MAX_GAME_EVENTS = 4; TANK_COLLISION_RADIUS = 15; TANK_BODY_WIDTH = 20; TANK_BODY_HEIGHT = 30; TANK_TURRET_LENGTH = 20; TANK_BULLET_RADIUS = 3; TANK_BASE_NUM_AI = 1; TANK_MAX_AI_TANKS = 5; TANK_BASE_AI_SPEED = 1.0; TANK_MAX_AI_SPEED = 2.5; TANK_BASE_AI_MAX_SHOOT_COOLDOWN = 200; TANK_MIN_AI_MAX_SHOOT_COOLDOWN = 70; TANK_BASE_AI_MOVE_TIMER = 120; TANK_MIN_AI_MOVE_TIMER = 50; TANK_NUM_DUMMY_TARGETS = 3;
+TANK_BASE_TICK_INTERVAL = 0.05  # Tick the per-tick rules (speeds, cooldowns, timers) were tuned for
+TANK_TICK_SCALE = TANK_GAME_LOOP_INTERVAL / TANK_BASE_TICK_INTERVAL  # Default scale: per-tick distances are multiplied, tick counts divided by it
+TANK_GRID_CELL_SIZE = 50  # Spatial grid cell edge in pixels (16x12 cells over the 800x600 arena)
+TANK_INPUT_ACTIONS = ('move', 'rotate', 'shoot')
+TANK_MAX_INPUTS_PER_TICK = {'move': 2, 'rotate': 2, 'shoot': 1}  # Per room and base tick (scaled); the browser sends input every 30 ms
+TANK_ENGINE_PHASES = ('inputs', 'movement', 'ai', 'bullets', 'level_up')
+TANK_LEVEL_CACHE_SIZE = 64  # Prepared layouts kept per TankLevelCache, least recently used evicted first
+TANK_NAV_CELL_SIZE = 25  # Navigation / line-of-sight cell edge in pixels (32x24 cells)
+TANK_AI_ENGAGE_RANGE = 180  # AI tanks with line of sight stop closing in at this distance and hold position to shoot
+TANK_AI_AIM_TOLERANCE = 0.12  # Radians; an AI tank only fires when the player is within this of its heading
+TANK_AI_STEER_MOVE_ANGLE = math.pi / 4  # AI tanks turn in place until their heading is within this of the path
+TANK_AI_THINK_BUDGET = 16  # Default cap on AI think updates per tick; overdue tanks go first next tick
+TANK_AI_THINK_INTERVALS = ((250, 1), (500, 3), (math.inf, 6))  # (distance to player up to, ticks between think updates)
+TANK_PRIVATE_STATE_KEYS = ('ai_brains',)  # Engine-only state that never goes into keyframes or deltas
+TANK_ENGINE_COUNTERS = ('ai_shots', 'ai_rollbacks', 'player_hits', 'ai_thinks', 'ai_thinks_deferred')
+
+# The tick interval belongs to each TankEngine, which passes its `tick_scale` (interval / TANK_BASE_TICK_INTERVAL) down
+# to every rule that depends on it; nothing here changes with the interval of any one battle.
+def tank_tick_scale(tick_interval): return tick_interval / TANK_BASE_TICK_INTERVAL
+def tank_scale_ticks(ticks, tick_scale=TANK_TICK_SCALE): return max(1, int(round(ticks / tick_scale)))
+def tank_input_limits(tick_scale=TANK_TICK_SCALE): return {action:int(round(cap*tick_scale)) for action,cap in TANK_MAX_INPUTS_PER_TICK.items()}
+def tank_client_config(tick_interval=TANK_GAME_LOOP_INTERVAL):
+    """The rules a client needs to predict its own tank's moves and turns between states, as sent in `tank_config`."""
+    return {'tick_ms':tick_interval*1000,'speed':TANK_SPEED,'rotation_speed':TANK_ROTATION_SPEED,'collision_radius':TANK_COLLISION_RADIUS,
+            'width':TANK_GAME_CANVAS_WIDTH,'height':TANK_GAME_CANVAS_HEIGHT,'max_inputs_per_tick':tank_input_limits(tank_tick_scale(tick_interval))}
+def tank_get_initial_player_state(): return {'x': TANK_GAME_CANVAS_WIDTH/2, 'y': TANK_GAME_CANVAS_HEIGHT - TANK_BODY_HEIGHT*2, 'angle': -math.pi/2, 'color':'green', 'status':'active'}
+def tank_add_game_event(state, message):
+    if 'game_events' not in state: state['game_events'] = []
+    state['game_events'].insert(0, message)
+    if len(state['game_events']) > TANK_MAX_GAME_EVENTS: state['game_events'] = state['game_events'][:TANK_MAX_GAME_EVENTS]
+def tank_next_entity_id(state):
+    """Small per-room integer id for obstacles, targets and AI tanks (bullets number themselves in TankBulletStore)."""
+    entity_id=state['next_entity_id'];state['next_entity_id']+=1
+    return entity_id
+def tank_generate_map(state, rng, num_obstacles_base=5):
+    if 'map' not in state: state['map'] = {}
+    state['map']['obstacles'] = []
+    player_data=state.get('player_tank',tank_get_initial_player_state()); player_spawn={'x':player_data['x']-50,'y':player_data['y']-50,'width':100,'height':100}
+    num_obs=min(num_obstacles_base+state['current_level']//2,10)
+    for _ in range(num_obs):
+        for _ in range(10):
+            w=min(rng.randint(30+state['current_level']*2,70+state['current_level']*5),120);h=min(rng.randint(30+state['current_level']*2,70+state['current_level']*5),120)
+            x,y=rng.uniform(0,TANK_GAME_CANVAS_WIDTH-w),rng.uniform(0,TANK_GAME_CANVAS_HEIGHT-h)
+            new_obs={'id':None,'x':x,'y':y,'width':w,'height':h}
+            if tank_check_aabb_collision(new_obs,player_spawn):continue
+            if any(tank_check_aabb_collision(new_obs,obs) for obs in state['map']['obstacles']):continue
+            new_obs['id']=tank_next_entity_id(state);state['map']['obstacles'].append(new_obs);break
+def tank_initialize_targets(state, rng):
+    state['targets']=[]
+    for _ in range(TANK_NUM_DUMMY_TARGETS):
+        for _ in range(20):
+            w,h=30,30;x,y=rng.uniform(0,TANK_GAME_CANVAS_WIDTH-w),rng.uniform(0,TANK_GAME_CANVAS_HEIGHT-h)
+            new_target={'id':None,'x':x,'y':y,'width':w,'height':h,'status':'active'}
+            player_data=state.get('player_tank',tank_get_initial_player_state());player_spawn={'x':player_data['x']-50,'y':player_data['y']-50,'width':100,'height':100}
+            if any(tank_check_aabb_collision(new_target,obs) for obs in state['map']['obstacles']):continue
+            if tank_check_aabb_collision(new_target,player_spawn):continue
+            new_target['id']=tank_next_entity_id(state);state['targets'].append(new_target);break
+def tank_initialize_ai(state, level, rng, tick_scale=TANK_TICK_SCALE):
+    num=min(TANK_MAX_AI_TANKS,TANK_BASE_NUM_AI+(level-1));speed=min(TANK_MAX_AI_SPEED,TANK_BASE_AI_SPEED+(level-1)*0.2)*tick_scale;cooldown=tank_scale_ticks(max(TANK_MIN_AI_MAX_SHOOT_COOLDOWN,TANK_BASE_AI_MAX_SHOOT_COOLDOWN-(level-1)*10),tick_scale);move_timer=tank_scale_ticks(max(TANK_MIN_AI_MOVE_TIMER,TANK_BASE_AI_MOVE_TIMER-(level-1)*7),tick_scale);ai_tanks=[]
+    for _ in range(num):
+        for _ in range(20):
+            x,y=rng.uniform(TANK_BODY_WIDTH,TANK_GAME_CANVAS_WIDTH-TANK_BODY_WIDTH),rng.uniform(TANK_BODY_HEIGHT,TANK_GAME_CANVAS_HEIGHT*0.6)
+            ai_bbox={'x':x-TANK_COLLISION_RADIUS,'y':y-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}
+            player_data=state.get('player_tank',tank_get_initial_player_state());player_bbox={'x':player_data['x']-TANK_COLLISION_RADIUS*2,'y':player_data['y']-TANK_COLLISION_RADIUS*2,'width':TANK_COLLISION_RADIUS*4,'height':TANK_COLLISION_RADIUS*4}
+            if tank_check_aabb_collision(ai_bbox,player_bbox):continue
+            if any(tank_check_aabb_collision(ai_bbox,obs) for obs in state['map'].get('obstacles',[])):continue
+            if any(tank_check_aabb_collision(ai_bbox,{'x':o['x']-TANK_COLLISION_RADIUS,'y':o['y']-TANK_COLLISION_RADIUS,'width':TANK_COLLISION_RADIUS*2,'height':TANK_COLLISION_RADIUS*2}) for o in ai_tanks):continue
+            ai_tank={'id':tank_next_entity_id(state),'x':x,'y':y,'angle':rng.uniform(0,2*math.pi),'color':rng.choice(['#B22222','#8B4513','#A0522D']),'speed':speed,'rotation_speed':(0.05+(level-1)*0.005)*tick_scale,'shoot_cooldown':rng.randint(cooldown//2,cooldown),'max_shoot_cooldown':cooldown,'move_timer':rng.randint(move_timer//2,move_timer),'max_move_timer':move_timer,'status':'active'}
+            ai_tanks.append(ai_tank);break
+    state['ai_tanks']=ai_tanks
+def tank_new_game_state(rng, high_score=0, levels=None, tick_scale=TANK_TICK_SCALE):
+    """Fresh battle on level 1. Its levels come from a layout seed drawn from `rng` (see tank_generate_level_layout)."""
+    state={'player_tank':tank_get_initial_player_state(),'ai_tanks':[],'bullets':TankBulletStore(),'targets':[],'map':{'obstacles':[]},'game_events':[],'score':0,'current_level':1,'is_over':False,'high_score':high_score,'game_active':True,'next_entity_id':1,'input_acks':{},'ai_brains':{},
+           'layout_seed':rng.randrange(2**32)}
+    tank_install_level(state,tank_get_level_layout(levels,state['layout_seed'],1,tick_scale))
+    if levels is not None:levels.prefetch(state['layout_seed'],2,tick_scale)
+    tank_add_game_event(state,f"Tank Game Started! Level {state['current_level']}")
+    return state
+def tank_apply_player_inputs(state, grid, inputs, tick_scale=TANK_TICK_SCALE):
+    """Applies one tick's worth of player input, given as {client id: [(seq, action, direction), ...]}.
+
+    Moves get the same bounds and obstacle checks as the tick's own movement. Inputs beyond TANK_MAX_INPUTS_PER_TICK
+    (times `tick_scale`) are discarded, not deferred, so held keys never build a backlog. Every input is acknowledged
+    in state['input_acks'] (client id -> last processed seq). Returns (applied, discarded).
+    """
+    player_tank=state['player_tank'];alive=not state.get('is_over',False) and player_tank.get('status')!='destroyed'
+    used={action:0 for action in TANK_INPUT_ACTIONS};applied=discarded=0;acks=state['input_acks']
+    limits=tank_input_limits(tick_scale)
+    if alive:tank_sync_static_layers(state,grid)
+    for client,client_inputs in inputs.items():
+        last_seq=None
+        for seq,action,direction in client_inputs:
+            if seq is not None:last_seq=seq
+            if not alive or used[action]>=limits[action]:discarded+=1;continue
+            used[action]+=1;applied+=1
+            if action=='move':
+                px,py=player_tank['x'],player_tank['y'];speed=TANK_SPEED if direction=='forward' else -TANK_SPEED
+                player_tank['x']+=speed*math.cos(player_tank['angle']);player_tank['y']+=speed*math.sin(player_tank['angle'])
+                if not(TANK_COLLISION_RADIUS<=player_tank['x']<=TANK_GAME_CANVAS_WIDTH-TANK_COLLISION_RADIUS):player_tank['x']=px
+                if not(TANK_COLLISION_RADIUS<=player_tank['y']<=TANK_GAME_CANVAS_HEIGHT-TANK_COLLISION_RADIUS):player_tank['y']=py
+                if grid.any_hit('obstacles',*tank_bbox_of_tank(player_tank)):player_tank['x'],player_tank['y']=px,py
+            elif action=='rotate':player_tank['angle']=(player_tank['angle']-(TANK_ROTATION_SPEED if direction=='left' else -TANK_ROTATION_SPEED))%(2*math.pi)
+            else:
+                bx,by=player_tank['x']+TANK_TURRET_LENGTH*math.cos(player_tank['angle']),player_tank['y']+TANK_TURRET_LENGTH*math.sin(player_tank['angle'])
+                state['bullets'].spawn(bx,by,player_tank['angle'],TANK_BULLET_SPEED*tick_scale,TANK_BULLET_OWNER_PLAYER,'#00FFFF')
+        if last_seq is not None and acks.get(client)!=last_seq:acks[client]=last_seq
+    return applied,discarded
+def tank_check_aabb_collision(r1,r2): return r1['x']<r2['x']+r2['width'] and r1['x']+r1['width']>r2['x'] and r1['y']<r2['y']+r2['height'] and r1['y']+r1['height']>r2['y']
+def tank_bbox_of_tank(tank): return (tank['x']-TANK_COLLISION_RADIUS,tank['y']-TANK_COLLISION_RADIUS,TANK_COLLISION_RADIUS*2,TANK_COLLISION_RADIUS*2)
+def tank_new_spatial_grid(): return TankSpatialGrid(TANK_GAME_CANVAS_WIDTH,TANK_GAME_CANVAS_HEIGHT,TANK_GRID_CELL_SIZE)
+def tank_new_navigator(): return TankNavigator(TANK_GAME_CANVAS_WIDTH,TANK_GAME_CANVAS_HEIGHT,TANK_NAV_CELL_SIZE,TANK_COLLISION_RADIUS)
+def tank_sync_static_layers(state, grid):
+    """Rebuckets obstacles and targets only when the level (or a reset) replaced their lists."""
+    if grid.source('obstacles') is not state['map']['obstacles']:grid.build('obstacles',state['map']['obstacles'])
+    if grid.source('targets') is not state['targets']:grid.build('targets',state['targets'])
+def tank_bullet_hit_candidates(state, bullets, blocked_at):
+    """Indices (ascending) of bullets whose last move crossed an active target, an AI tank they can hit or the player
+    before reaching `blocked_at` (see TankBulletStore.advance)."""
+    n=len(bullets)
+    if not n:return np.arange(0)
+    first=np.full(n,np.inf);owner=bullets.owner[:n]
+    targets=[t for t in state['targets'] if t.get('status','inactive')=='active']
+    if targets:first=np.minimum(first,bullets.sweep(tank_boxes_array(targets),TANK_BULLET_RADIUS).min(axis=1))
+    if state['ai_tanks']:first=np.minimum(first,np.where(owner==TANK_BULLET_OWNER_PLAYER,bullets.sweep(tank_boxes_array(state['ai_tanks'],tank_bbox_of_tank),TANK_BULLET_RADIUS).min(axis=1),np.inf))
+    if state['player_tank']['status']=='active':first=np.minimum(first,np.where(owner==TANK_BULLET_OWNER_AI,bullets.sweep(tank_boxes_array([state['player_tank']],tank_bbox_of_tank),TANK_BULLET_RADIUS).min(axis=1),np.inf))
+    return np.nonzero(first<blocked_at)[0]
+def tank_first_bullet_hit(state, grid, bullets, i, limit):
+    """(layer, entity) that bullet `i` entered first on its last move, before `limit`, or None. Targets win ties."""
+    br=TANK_BULLET_RADIUS;x,y,dx,dy=bullets.x[i],bullets.y[i],bullets.dx[i],bullets.dy[i]
+    qx,qy,qw,qh=min(x,x-dx)-br,min(y,y-dy)-br,abs(dx)+br*2,abs(dy)+br*2
+    layers=[('targets',[t for t in grid.query('targets',qx,qy,qw,qh) if t.get('status','inactive')=='active'],None)]
+    if bullets.owner[i]==TANK_BULLET_OWNER_PLAYER:layers.append(('ai_tanks',[ai for ai in grid.query('ai_tanks',qx,qy,qw,qh) if ai.get('status')=='active'],tank_bbox_of_tank))
+    elif state['player_tank']['status']=='active':layers.append(('player_tank',[state['player_tank']],tank_bbox_of_tank))
+    hit=None
+    for layer,entities,bbox_of in layers:
+        if not entities:continue
+        times=bullets.sweep(tank_boxes_array(entities,bbox_of),br,[i])[0];j=int(np.argmin(times))
+        if times[j]<limit:hit=(layer,entities[j]);limit=times[j]
+    return hit
+def tank_record_phase(phase_ms, name, mark):
+    """Adds the time since `mark` to phase `name` (when profiling) and returns the new mark."""
+    now=time.perf_counter()
+    if phase_ms is not None:phase_ms[name]+=(now-mark)*1000
+    return now
+def tank_ai_think(tank, brain, player, nav):
+    """Picks an AI tank's heading (`brain.nav_angle`), whether to drive (`nav_move`) and whether it sees the player (`nav_sighted`).
+
+    With line of sight the tank closes in along the flow field until it is within TANK_AI_ENGAGE_RANGE, then turns to
+    aim. Without it the tank follows the flow field, and holds its fire. `nav_angle` None (no path) makes it wander.
+    Returns the squared distance to the player.
+    """
+    dx,dy=player['x']-tank['x'],player['y']-tank['y'];distance_sq=dx*dx+dy*dy
+    sighted=nav.line_of_sight(tank['x'],tank['y'],player['x'],player['y'])
+    heading=None if sighted and distance_sq<=TANK_AI_ENGAGE_RANGE**2 else nav.heading(tank['x'],tank['y'])
+    if heading is None and sighted:brain.nav_angle=math.atan2(dy,dx);brain.nav_move=False
+    else:brain.nav_angle=heading;brain.nav_move=heading is not None
+    brain.nav_sighted=sighted
+    return distance_sq
+def tank_schedule_ai_thinks(ai_tanks, brains, player, nav, think_budget=None, counters=None, tick_scale=TANK_TICK_SCALE):
+    """Runs tank_ai_think for the AI tanks whose brain's `think_timer` ran out, at most `think_budget` of them per tick.
+
+    The next think is TANK_AI_THINK_INTERVALS ticks away depending on distance to the player, so far tanks decide less
+    often while movement still integrates every tick. Tanks left over by the budget keep counting down and are picked
+    most-overdue first (ties in list order) on the next tick. A new brain thinks on its first tick.
+    """
+    due=[]
+    for tank in ai_tanks:
+        if tank.get('status')!='active':continue
+        brain=brains[tank['id']];brain.think_timer-=1
+        if brain.think_timer<=0:due.append((tank,brain))
+    if think_budget is not None and len(due)>think_budget:
+        if counters is not None:counters['ai_thinks_deferred']+=len(due)-think_budget
+        due=heapq.nsmallest(think_budget,due,key=lambda pair:pair[1].think_timer)
+    for tank,brain in due:
+        distance_sq=tank_ai_think(tank,brain,player,nav)
+        brain.think_timer=tank_scale_ticks(next(interval for limit,interval in TANK_AI_THINK_INTERVALS if distance_sq<=limit*limit),tick_scale)
+    if counters is not None:counters['ai_thinks']+=len(due)
+def tank_ai_has_shot(tank, brain, player):
+    """True if the tank saw the player at its last think and is aimed at where the player is now."""
+    if not brain.nav_sighted:return False
+    aim=math.atan2(player['y']-tank['y'],player['x']-tank['x'])
+    return abs((aim-tank['angle']+math.pi)%(2*math.pi)-math.pi)<=TANK_AI_AIM_TOLERANCE
+def tank_steer_ai(tank, brain):
+    """Turns an AI tank towards its brain's `nav_angle` at its own rotation speed and drives once it is roughly lined up."""
+    turn=(brain.nav_angle-tank['angle']+math.pi)%(2*math.pi)-math.pi;limit=tank['rotation_speed']
+    tank['angle']=(tank['angle']+max(-limit,min(limit,turn)))%(2*math.pi)
+    if brain.nav_move and abs(turn)<=TANK_AI_STEER_MOVE_ANGLE:tank['x']+=tank['speed']*math.cos(tank['angle']);tank['y']+=tank['speed']*math.sin(tank['angle'])
+def tank_slide_ai(tank, grid, nx, ny):
+    """After a blocked move to (nx, ny), keeps whichever single axis of it is free so steering tanks slide along walls."""
+    px,py=tank['x'],tank['y']
+    for x,y in ((nx,py),(px,ny)):
+        if (x,y)==(px,py):continue
+        tank['x'],tank['y']=x,y
+        if not grid.any_hit('obstacles',*tank_bbox_of_tank(tank)):return True
+    tank['x'],tank['y']=px,py
+    return False
+def tank_tick(state, grid, rng, phase_ms=None, levels=None, nav=None, counters=None, think_budget=None, tick_scale=TANK_TICK_SCALE):
+    """Advances one battle by a single tick: movement, AI, bullets, then level-up. Caller must hold the room's lock.
+
+    Tank collision queries go through `grid`: obstacles and targets are bucketed once per level, AI tanks every tick.
+    Bullets live in a TankBulletStore and are moved and swept against obstacles as whole arrays; only the few whose path
+    crosses a target or tank are resolved one by one, each against whatever it reached first. All randomness comes from `rng`. Pass a dict keyed by TANK_ENGINE_PHASES as
+    `phase_ms` to accumulate the time spent in each phase, and a TankLevelCache as `levels` to take level-ups from it.
+    With a TankNavigator as `nav` AI tanks hunt the player along its flow field and only fire with line of sight;
+    without one they wander and fire blindly. Their think updates are spread out by tank_schedule_ai_thinks, at most
+    `think_budget` per tick (None for no cap). A dict keyed by TANK_ENGINE_COUNTERS as `counters` tallies AI shots, AI
+    moves rolled back against obstacles, hits on the player and think updates run or deferred. Per-tick speeds, timers
+    and the levels reached are scaled by `tick_scale` (see tank_tick_scale).
+    """
+    if not state.get('is_over',False):
+        mark=time.perf_counter()
+        tank_sync_static_layers(state,grid)
+        all_tanks=[state['player_tank']]+state['ai_tanks'];brains=state['ai_brains']
+        for tank in all_tanks:
+            if tank.get('status','active')!='active':continue
+            brain=brains.get(tank.get('id'))  # None for the player
+            px,py=tank['x'],tank['y'];wander=brain is not None and brain.nav_angle is None
+            if wander:
+                brain.move_timer-=1
+                if brain.move_timer<=0:tank['angle']=(tank['angle']+rng.uniform(-math.pi/1.5,math.pi/1.5))%(2*math.pi);brain.move_timer=brain.max_move_timer
+                tank['x']+=tank['speed']*math.cos(tank['angle']);tank['y']+=tank['speed']*math.sin(tank['angle'])
+            elif brain is not None:tank_steer_ai(tank,brain)
+            if not(TANK_COLLISION_RADIUS<=tank['x']<=TANK_GAME_CANVAS_WIDTH-TANK_COLLISION_RADIUS):tank['x']=px;
+            if wander:tank['angle']=(tank['angle']+math.pi+rng.uniform(-0.1,0.1))%(2*math.pi)
+            if not(TANK_COLLISION_RADIUS<=tank['y']<=TANK_GAME_CANVAS_HEIGHT-TANK_COLLISION_RADIUS):tank['y']=py;
+            if wander:tank['angle']=(tank['angle']+math.pi+rng.uniform(-0.1,0.1))%(2*math.pi)
+            if grid.any_hit('obstacles',*tank_bbox_of_tank(tank)):
+                nx,ny=tank['x'],tank['y'];tank['x'],tank['y']=px,py
+                if not wander and brain is not None and tank_slide_ai(tank,grid,nx,ny):continue
+                if counters is not None and brain is not None:counters['ai_rollbacks']+=1
+                if wander:tank['angle']=(tank['angle']+math.pi/2+rng.uniform(-0.3,0.3))%(2*math.pi);brain.move_timer=brain.max_move_timer//2
+        mark=tank_record_phase(phase_ms,'movement',mark)
+        player=state['player_tank'];hunting=nav is not None and player.get('status')=='active'
+        if hunting:
+            nav.sync(state['map']['obstacles']);nav.update_target(player['x'],player['y'])
+            tank_schedule_ai_thinks(state['ai_tanks'],brains,player,nav,think_budget,counters,tick_scale)
+        for tank in state['ai_tanks']:
+            if tank.get('status')=='active':
+                brain=brains[tank['id']];clear_shot=tank_ai_has_shot(tank,brain,player) if hunting else True
+                brain.shoot_cooldown-=1
+                if brain.shoot_cooldown<=0 and not clear_shot:brain.shoot_cooldown=0  # Stay loaded until the player is in sight
+                elif brain.shoot_cooldown<=0:
+                    if counters is not None:counters['ai_shots']+=1
+                    b_x,b_y=tank['x']+TANK_TURRET_LENGTH*math.cos(tank['angle']),tank['y']+TANK_TURRET_LENGTH*math.sin(tank['angle'])
+                    state['bullets'].spawn(b_x,b_y,tank['angle'],(TANK_BULLET_SPEED+state['current_level']*0.15)*tick_scale,TANK_BULLET_OWNER_AI,tank['color'])
+                    brain.shoot_cooldown=brain.max_shoot_cooldown
+        mark=tank_record_phase(phase_ms,'ai',mark)
+        grid.build('ai_tanks',state['ai_tanks'],tank_bbox_of_tank)
+        bullets=state['bullets']
+        keep,blocked_at=bullets.advance(TANK_GAME_CANVAS_WIDTH,TANK_GAME_CANVAS_HEIGHT,TANK_BULLET_RADIUS,state['map']['obstacles'])
+        for i in tank_bullet_hit_candidates(state,bullets,blocked_at).tolist():
+            # Only bullets whose path crosses a target or tank reach this scalar pass; it runs in bullet order so scoring matches.
+            hit=tank_first_bullet_hit(state,grid,bullets,i,blocked_at[i])
+            if hit is None:continue
+            layer,entity=hit;keep[i]=False
+            if layer=='targets':
+                entity['status']='hit'
+                if bullets.owner[i]==TANK_BULLET_OWNER_PLAYER:state['score']+=TANK_TARGET_HIT_SCORE;tank_add_game_event(state,f"Target Hit! +{TANK_TARGET_HIT_SCORE}")
+            elif layer=='ai_tanks':
+                entity['status']='destroyed';points=TANK_AI_DESTROYED_SCORE_BASE+(state['current_level']-1)*10
+                state['score']+=points;tank_add_game_event(state,f"Enemy Down! +{points}")
+            else:
+                entity['status']='destroyed';state['is_over']=True;tank_add_game_event(state,"Tank Destroyed!")
+                if counters is not None:counters['player_hits']+=1
+                if state['score']>state['high_score']:state['high_score']=state['score'];tank_add_game_event(state,f"New Tank High Score: {state['high_score']}!")
+        bullets.compact(keep)
+        survivors=[t for t in state['ai_tanks'] if t.get('status')=='active']
+        if len(survivors)!=len(state['ai_tanks']):state['ai_brains']={t['id']:brains[t['id']] for t in survivors}
+        state['ai_tanks']=survivors
+        mark=tank_record_phase(phase_ms,'bullets',mark)
+        if not state['is_over'] and not state['ai_tanks']:
+            tank_advance_level(state,levels,tick_scale);tank_record_phase(phase_ms,'level_up',mark)
+    if state.get('score',0)>state.get('high_score',0):state['high_score']=state['score']
+def tank_advance_level(state, levels=None, tick_scale=TANK_TICK_SCALE):
+    """Swaps in the next level's layout (prepared ahead of time when `levels` is a background TankLevelCache)."""
+    state['current_level']+=1;tank_add_game_event(state,f"Reached Level {state['current_level']}!")
+    tank_install_level(state,tank_get_level_layout(levels,state['layout_seed'],state['current_level'],tick_scale))
+    if levels is not None:levels.prefetch(state['layout_seed'],state['current_level']+1,tick_scale)
+
+# --- Level Layouts ---
+# A level's obstacles, targets and AI tanks depend only on (layout seed, level number), never on the battle's own RNG or
+# on where the player happens to be, so they can be generated on another thread before they are needed. Levels always
+# start with the player back at the spawn point, which the generator keeps clear.
+def tank_generate_level_layout(layout_seed, level, tick_scale=TANK_TICK_SCALE):
+    """Runs the rejection-sampling generators for one level on a scratch state. Entity ids are assigned on install.
+    AI speeds and countdowns are per tick, so a layout is only valid for the `tick_scale` it was generated for."""
+    rng=random.Random(f'{layout_seed}:{level}')
+    scratch={'current_level':level,'player_tank':tank_get_initial_player_state(),'map':{'obstacles':[]},'targets':[],'next_entity_id':1}
+    tank_generate_map(scratch,rng);tank_initialize_targets(scratch,rng);tank_initialize_ai(scratch,level,rng,tick_scale)
+    return {'level':level,'obstacles':scratch['map']['obstacles'],'targets':scratch['targets'],'ai_tanks':scratch['ai_tanks']}
+def tank_get_level_layout(levels, layout_seed, level, tick_scale=TANK_TICK_SCALE):
+    return levels.get(layout_seed,level,tick_scale) if levels is not None else tank_generate_level_layout(layout_seed,level,tick_scale)
+def tank_install_level(state, layout):
+    """Copies a (possibly cached and shared) layout into the battle with fresh per-room ids and respawns the player.
+    Each AI tank's countdowns move off its dict into a TankAIBrain."""
+    def fresh(entities):return [dict(entity,id=tank_next_entity_id(state)) for entity in entities]
+    state['map']={'obstacles':fresh(layout['obstacles'])};state['targets']=fresh(layout['targets'])
+    state['ai_tanks']=[TankAIBrain.strip(entity,id=tank_next_entity_id(state)) for entity in layout['ai_tanks']]
+    state['ai_brains']={tank['id']:TankAIBrain.from_layout(entity) for tank,entity in zip(state['ai_tanks'],layout['ai_tanks'])}
+    spawn=tank_get_initial_player_state();state['player_tank']['x']=spawn['x'];state['player_tank']['y']=spawn['y']
+
+
+class TankAIBrain:
+    """An AI tank's private bookkeeping: fire and wander countdowns plus its last navigation decision.
+
+    Brains live in state['ai_brains'] (tank id -> brain) instead of on the tank dicts, so countdowns that change every
+    tick never reach keyframes or deltas, and each tank carries eight slots instead of eight more dict entries.
+    """
+    __slots__ = ('shoot_cooldown', 'max_shoot_cooldown', 'move_timer', 'max_move_timer', 'think_timer', 'nav_angle', 'nav_move', 'nav_sighted')
+    LAYOUT_FIELDS = ('shoot_cooldown', 'max_shoot_cooldown', 'move_timer', 'max_move_timer')  # Generated with the level layout
+
+    def __init__(self, shoot_cooldown, max_shoot_cooldown, move_timer, max_move_timer):
+        self.shoot_cooldown = shoot_cooldown; self.max_shoot_cooldown = max_shoot_cooldown
+        self.move_timer = move_timer; self.max_move_timer = max_move_timer
+        self.think_timer = 0; self.nav_angle = None; self.nav_move = False; self.nav_sighted = False
+
+    @classmethod
+    def from_layout(cls, entity):
+        """New brain from a layout AI tank's countdown fields."""
+        return cls(*(entity[name] for name in cls.LAYOUT_FIELDS))
+
+    @classmethod
+    def strip(cls, entity, **changes):
+        """Copy of a layout AI tank without the fields a brain holds (built fresh, since dicts never shrink on pop)."""
+        tank = {key: value for key, value in entity.items() if key not in cls.LAYOUT_FIELDS}
+        tank.update(changes)
+        return tank
+
+
+class TankLevelCache:
+    """Bounded LRU of level layouts keyed by (layout seed, level, tick scale).
+
+    `prefetch()` queues a layout for a background worker thread, so the tick that reaches the level only copies it in.
+    `get()` falls back to generating inline (counted as a miss) when the layout is not ready. With `background=False`
+    prefetch is a no-op and the cache only memoises.
+    """
+
+    def __init__(self, capacity=TANK_LEVEL_CACHE_SIZE, background=True):
+        self.capacity = capacity
+        self.layouts = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.requests = queue.Queue() if background else None
+        self.worker = None
+        self.stats = {'hits': 0, 'misses': 0, 'prefetched': 0, 'evicted': 0, 'generate_ms': 0.0}
+
+    def _generate(self, key):
+        start = time.perf_counter()
+        layout = tank_generate_level_layout(*key)
+        with self.lock: self.stats['generate_ms'] += (time.perf_counter() - start) * 1000
+        return layout
+
+    def _store(self, key, layout):
+        with self.lock:
+            self.layouts[key] = layout; self.layouts.move_to_end(key)
+            while len(self.layouts) > self.capacity:
+                self.layouts.popitem(last=False); self.stats['evicted'] += 1
+
+    def get(self, layout_seed, level, tick_scale=TANK_TICK_SCALE):
+        key = (layout_seed, level, tick_scale)
+        with self.lock:
+            layout = self.layouts.get(key)
+            if layout is not None:
+                self.layouts.move_to_end(key); self.stats['hits'] += 1
+                return layout
+            self.stats['misses'] += 1
+        layout = self._generate(key)
+        self._store(key, layout)
+        return layout
+
+    def prefetch(self, layout_seed, level, tick_scale=TANK_TICK_SCALE):
+        if self.requests is None: return
+        key = (layout_seed, level, tick_scale)
+        with self.lock:
+            if key in self.layouts or key in self.pending: return
+            self.pending.add(key)
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, daemon=True); self.worker.start()
+        self.requests.put(key)
+
+    def _run(self):
+        while True:
+            key = self.requests.get()
+            layout = self._generate(key)
+            self._store(key, layout)
+            with self.lock: self.pending.discard(key); self.stats['prefetched'] += 1
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, cached=len(self.layouts), pending=len(self.pending), generate_ms=round(self.stats['generate_ms'], 3))
+
+
+class TankEngine:
+    """One battle: its state, collision grid and RNG. `step(inputs)` advances it by one tick of `tick_interval` seconds.
+
+    `seed` fixes the RNG (None draws a random seed, kept in `self.seed` so the battle can be reproduced). `levels` is the
+    TankLevelCache level layouts come from; without one each level is generated when it is reached. With
+    `profile=True` the engine accumulates per-phase milliseconds in `phase_ms`. AI tanks navigate with `self.nav` unless
+    `navigation=False`, which brings back the old wandering, blind-firing AI. At most `ai_think_budget` AI tanks make
+    decisions per tick (None for no cap). `counters` tallies TANK_ENGINE_COUNTERS. A `recorder` (tank_replay.py) is told
+    about every step and reset, which is all it takes to replay the battle. The per-tick rules are scaled to
+    `tick_interval` for this engine alone, so battles at different tick rates can run side by side.
+    """
+
+    def __init__(self, seed=None, high_score=0, profile=False, levels=None, navigation=True, ai_think_budget=TANK_AI_THINK_BUDGET,
+                 tick_interval=TANK_GAME_LOOP_INTERVAL):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.tick_interval = tick_interval; self.tick_scale = tank_tick_scale(tick_interval)
+        self.rng = random.Random(self.seed)
+        self.grid = tank_new_spatial_grid()
+        self.ticks = 0
+        self.phase_ms = {phase: 0.0 for phase in TANK_ENGINE_PHASES} if profile else None
+        self.levels = levels
+        self.nav = tank_new_navigator() if navigation else None
+        self.ai_think_budget = ai_think_budget
+        self.counters = dict.fromkeys(TANK_ENGINE_COUNTERS, 0)
+        self.recorder = None
+        self.state = tank_new_game_state(self.rng, high_score, levels, self.tick_scale)
+
+    def reset(self, high_score=None):
+        """Starts a new battle on the same RNG stream, keeping the high score unless one is given."""
+        self.state = tank_new_game_state(self.rng, self.state['high_score'] if high_score is None else high_score, self.levels, self.tick_scale)
+        if self.recorder is not None: self.recorder.record_reset(self)
+
+    def step(self, inputs=None, departed=None):
+        """Applies `inputs` ({client id: [(seq, action, direction), ...]}) and advances one tick. Returns (applied, discarded).
+
+        `departed` lists clients that left the battle; their input acks are dropped as part of the step, so a replay
+        drops them on the same tick.
+        """
+        applied = discarded = 0
+        if self.recorder is not None: self.recorder.record_step(self, inputs, departed)
+        for client in departed or (): self.state['input_acks'].pop(client, None)
+        if inputs:
+            mark = time.perf_counter()
+            applied, discarded = tank_apply_player_inputs(self.state, self.grid, inputs, self.tick_scale)
+            tank_record_phase(self.phase_ms, 'inputs', mark)
+        tank_tick(self.state, self.grid, self.rng, self.phase_ms, self.levels, self.nav, self.counters, self.ai_think_budget, self.tick_scale)
+        self.ticks += 1
+        return applied, discarded
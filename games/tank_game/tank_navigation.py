@@ -0,0 +1,122 @@
+"""Flow-field navigation and line-of-sight checks for AI tanks.
+
+A TankNavigator is rebuilt once per level from the obstacle list. Two coarse grids come out of that rebuild. The
+walkable grid marks cells whose centre a tank can occupy, with obstacles inflated by the tank's collision radius. The
+opaque grid marks cells an obstacle overlaps, and blocks sight. One breadth-first distance field is grown from the
+player's cell and shared by every AI tank. It is only regrown when the player moves into another cell. Sight checks
+walk the opaque grid between two cells and are memoised per (from cell, to cell) until the level changes.
+"""
+import collections
+import math
+
+import numpy as np
+
+TANK_NAV_UNREACHABLE = -1
+TANK_NAV_LOS_CACHE_LIMIT = 20000  # Memoised sight lines per level before the cache is cleared
+_NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class TankNavigator:
+    def __init__(self, width, height, cell_size, clearance):
+        self.width = width; self.height = height; self.cell_size = cell_size; self.clearance = clearance
+        self.cols = max(1, int(math.ceil(width / cell_size))); self.rows = max(1, int(math.ceil(height / cell_size)))
+        self.obstacles_source = None
+        self.walkable = np.ones((self.rows, self.cols), dtype=bool)
+        self.opaque = np.zeros((self.rows, self.cols), dtype=bool)
+        self.links = []  # Flat cell index -> walkable orthogonal neighbours' indices, rebuilt with the walkable grid
+        self.target_cell = None
+        self.distance = None  # Flat list of BFS steps to the target cell, TANK_NAV_UNREACHABLE where there is no path
+        self.next_cell = {}  # Cell -> neighbouring cell one step closer to the target, filled lazily per flow field
+        self.los_cache = {}
+        self.stats = {'level_builds': 0, 'flow_builds': 0, 'los_queries': 0, 'los_cache_hits': 0}
+
+    def cell_of(self, x, y):
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1); row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return row, col
+
+    def cell_center(self, cell):
+        return (cell[1] + 0.5) * self.cell_size, (cell[0] + 0.5) * self.cell_size
+
+    def sync(self, obstacles):
+        """Rebuilds the grids when the level replaced its obstacle list; a no-op otherwise."""
+        if obstacles is self.obstacles_source: return
+        self.obstacles_source = obstacles
+        cs = self.cell_size; c = self.clearance
+        centers_x = (np.arange(self.cols) + 0.5) * cs; centers_y = (np.arange(self.rows) + 0.5) * cs
+        walkable = np.outer((centers_y >= c) & (centers_y <= self.height - c), (centers_x >= c) & (centers_x <= self.width - c))
+        opaque = np.zeros((self.rows, self.cols), dtype=bool)
+        for o in obstacles:
+            # Same strict inequalities as the AABB tests, so a centre exactly `clearance` away still counts as free
+            rows = (centers_y > o['y'] - c) & (centers_y < o['y'] + o['height'] + c)
+            cols = (centers_x > o['x'] - c) & (centers_x < o['x'] + o['width'] + c)
+            walkable &= ~np.outer(rows, cols)
+            r0, c0 = self.cell_of(o['x'], o['y']); r1, c1 = self.cell_of(o['x'] + o['width'], o['y'] + o['height'])
+            opaque[r0:r1 + 1, c0:c1 + 1] = True
+        self.walkable = walkable; self.opaque = opaque
+        cols = self.cols; open_cells = walkable.ravel().tolist(); links = []
+        for index in range(self.rows * cols):
+            row, col = divmod(index, cols)
+            links.append([(row + dr) * cols + col + dc for dr, dc in _NEIGHBOURS[:4]
+                          if 0 <= row + dr < self.rows and 0 <= col + dc < cols and open_cells[(row + dr) * cols + col + dc]])
+        self.links = links
+        self.target_cell = None; self.distance = None; self.next_cell = {}; self.los_cache = {}
+        self.stats['level_builds'] += 1
+
+    def update_target(self, x, y):
+        """Regrows the shared distance field if (x, y) is in a different cell than the last target."""
+        cell = self.cell_of(x, y)
+        if cell == self.target_cell: return
+        self.target_cell = cell; self.next_cell = {}
+        links = self.links; distance = [TANK_NAV_UNREACHABLE] * (self.rows * self.cols)
+        start = cell[0] * self.cols + cell[1]; distance[start] = 0
+        frontier = collections.deque([start])
+        while frontier:
+            index = frontier.popleft(); step = distance[index] + 1
+            for neighbour in links[index]:
+                if distance[neighbour] == TANK_NAV_UNREACHABLE: distance[neighbour] = step; frontier.append(neighbour)
+        self.distance = distance
+        self.stats['flow_builds'] += 1
+
+    def _step_from(self, cell):
+        """Neighbouring cell with the smallest distance; diagonals only when both orthogonal cells are open."""
+        cached = self.next_cell.get(cell)
+        if cached is not None or cell in self.next_cell: return cached
+        cols = self.cols; distance = self.distance; walkable = self.walkable
+        best = None; best_distance = None
+        for dr, dc in _NEIGHBOURS:
+            r = cell[0] + dr; c = cell[1] + dc
+            if not (0 <= r < self.rows and 0 <= c < cols): continue
+            d = distance[r * cols + c]
+            if d == TANK_NAV_UNREACHABLE: continue
+            if dr and dc and not (walkable[cell[0] + dr, cell[1]] and walkable[cell[0], cell[1] + dc]): continue
+            if best_distance is None or d < best_distance: best = (r, c); best_distance = d
+        own = distance[cell[0] * cols + cell[1]]
+        if best is not None and own != TANK_NAV_UNREACHABLE and best_distance >= own: best = None  # Already at the target
+        self.next_cell[cell] = best
+        return best
+
+    def heading(self, x, y):
+        """Angle from (x, y) towards the next cell on the shortest path to the target, or None if there is no path."""
+        if self.distance is None: return None
+        step = self._step_from(self.cell_of(x, y))
+        if step is None: return None
+        tx, ty = self.cell_center(step)
+        return math.atan2(ty - y, tx - x)
+
+    def line_of_sight(self, x0, y0, x1, y1):
+        """True if no obstacle cell lies on the segment between the two points' cells (memoised per cell pair)."""
+        self.stats['los_queries'] += 1
+        key = (self.cell_of(x0, y0), self.cell_of(x1, y1))
+        cached = self.los_cache.get(key)
+        if cached is not None:
+            self.stats['los_cache_hits'] += 1
+            return cached
+        (r0, c0), (r1, c1) = key
+        steps = max(abs(r1 - r0), abs(c1 - c0)) * 2 + 1  # Half-cell sampling never skips a cell the segment crosses
+        opaque = self.opaque; clear = True
+        for i in range(steps + 1):
+            t = i / steps
+            if opaque[int(round(r0 + (r1 - r0) * t)), int(round(c0 + (c1 - c0) * t))]: clear = False; break
+        if len(self.los_cache) >= TANK_NAV_LOS_CACHE_LIMIT: self.los_cache.clear()
+        self.los_cache[key] = clear
+        return clear
@@ -0,0 +1,204 @@
+"""Deterministic replay logs for tank battles.
+
+A TankEngine only draws randomness from its seeded RNG, so a battle is fully determined by the state it starts from,
+the inputs applied on each tick, the clients dropped from it and the resets in between. TankReplayRecorder is attached
+as `engine.recorder` and appends exactly that to a compact binary log: inputs and departures become fixed-size records
+on the tick they were applied, quiet ticks are not written at all. Every `keyframe_interval` ticks it also writes a
+keyframe (the RNG state and the game state, pickled and zlib-compressed), so TankReplay can seek to any tick by
+restoring the nearest keyframe before it and re-simulating at most one interval. Keyframes are pickles: only load logs this server wrote.
+
+Log layout (little-endian): header, then records until the end of the stream (a crash leaves a readable prefix).
+  header:   4-byte magic, u8 version, u64 seed, f64 tick interval, u8 flags, i32 AI think budget (-1 for none),
+            u32 keyframe interval
+  record:   u8 kind, u32 tick, then the kind's body
+    client:   u8-length utf-8 client id; clients are numbered in the order they first appear
+    inputs:   u8 client count, per client u16 client index and u16 input count, per input i64 seq, u8 action, u8 direction;
+              then u16 count of departed client indexes (u16 each)
+    reset:    u32 high score
+    keyframe: u32 length, compressed (rng state, game state)
+    end:      no body
+"""
+import pickle
+import struct
+import zlib
+
+from tank_engine import TankEngine, TANK_INPUT_ACTIONS
+
+TANK_REPLAY_MAGIC = b'TKRP'
+TANK_REPLAY_VERSION = 2
+TANK_REPLAY_KEYFRAME_INTERVAL = 300  # Ticks between keyframes: 30 s of play at 10 Hz, the most a seek re-simulates
+TANK_REPLAY_DIRECTIONS = ('forward', 'backward', 'left', 'right')  # Anything else plays back as None, which the engine treats alike
+TANK_REPLAY_FLAG_NAVIGATION = 1
+TANK_REPLAY_KIND_CLIENT = 1
+TANK_REPLAY_KIND_INPUTS = 2
+TANK_REPLAY_KIND_RESET = 3
+TANK_REPLAY_KIND_KEYFRAME = 4
+TANK_REPLAY_KIND_END = 5
+
+_HEADER = struct.Struct('<4sBQdBiI')
+_RECORD = struct.Struct('<BI')
+_CLIENT_INPUTS = struct.Struct('<HH')
+_INPUT = struct.Struct('<qBB')
+_U8 = struct.Struct('<B'); _U16 = struct.Struct('<H'); _U32 = struct.Struct('<I')
+_NO_SEQ = -2 ** 63  # Also stands in for seqs outside int64; seqs only feed input acks, never the simulation
+_NO_DIRECTION = 255
+
+
+class TankReplayRecorder:
+    """Appends one engine's inputs, resets and keyframes to `stream` (any binary file object).
+
+    Creating the recorder writes the header and a keyframe of the engine as it is, so recording can start mid-battle.
+    The engine calls `record_step` and `record_reset` itself once the recorder is set as `engine.recorder`.
+    """
+
+    def __init__(self, stream, engine, keyframe_interval=TANK_REPLAY_KEYFRAME_INTERVAL):
+        self.stream = stream
+        self.keyframe_interval = keyframe_interval
+        self.clients = {}
+        self.last_keyframe = None
+        self.stats = {'bytes': 0, 'input_records': 0, 'keyframes': 0, 'keyframe_bytes': 0}
+        flags = TANK_REPLAY_FLAG_NAVIGATION if engine.nav is not None else 0
+        budget = -1 if engine.ai_think_budget is None else engine.ai_think_budget
+        self._write(_HEADER.pack(TANK_REPLAY_MAGIC, TANK_REPLAY_VERSION, engine.seed % 2 ** 64, engine.tick_interval,
+                                 flags, budget, keyframe_interval))
+        self._write_keyframe(engine)
+
+    def _write(self, data):
+        self.stream.write(data); self.stats['bytes'] += len(data)
+
+    def _write_keyframe(self, engine):
+        blob = zlib.compress(pickle.dumps((engine.rng.getstate(), engine.state), pickle.HIGHEST_PROTOCOL))
+        self._write(_RECORD.pack(TANK_REPLAY_KIND_KEYFRAME, engine.ticks) + _U32.pack(len(blob)) + blob)
+        self.last_keyframe = engine.ticks
+        self.stats['keyframes'] += 1; self.stats['keyframe_bytes'] += len(blob)
+        self.stream.flush()
+
+    def _client_index(self, client, tick):
+        index = self.clients.get(client)
+        if index is None:
+            name = str(client).encode('utf-8')[:255]
+            index = self.clients[client] = len(self.clients)
+            self._write(_RECORD.pack(TANK_REPLAY_KIND_CLIENT, tick) + _U8.pack(len(name)) + name)
+        return index
+
+    def record_step(self, engine, inputs, departed=None):
+        """Called by TankEngine.step before it applies `inputs` and drops the `departed` clients on tick `engine.ticks`."""
+        tick = engine.ticks
+        if tick % self.keyframe_interval == 0 and tick != self.last_keyframe: self._write_keyframe(engine)
+        if not inputs and not departed: return
+        body = []; clients = 0
+        for client, client_inputs in (inputs or {}).items():
+            if not client_inputs: continue
+            clients += 1
+            body.append(_CLIENT_INPUTS.pack(self._client_index(client, tick), len(client_inputs)))
+            for seq, action, direction in client_inputs:
+                seq = seq if isinstance(seq, int) and _NO_SEQ < seq < 2 ** 63 else _NO_SEQ
+                direction = TANK_REPLAY_DIRECTIONS.index(direction) if direction in TANK_REPLAY_DIRECTIONS else _NO_DIRECTION
+                body.append(_INPUT.pack(seq, TANK_INPUT_ACTIONS.index(action), direction))
+        departed = [self._client_index(client, tick) for client in departed or ()]
+        if not clients and not departed: return
+        self._write(_RECORD.pack(TANK_REPLAY_KIND_INPUTS, tick) + _U8.pack(clients) + b''.join(body)
+                    + _U16.pack(len(departed)) + b''.join(_U16.pack(index) for index in departed))
+        self.stats['input_records'] += 1
+
+    def record_reset(self, engine):
+        """Called by TankEngine.reset after the new battle was set up."""
+        self._write(_RECORD.pack(TANK_REPLAY_KIND_RESET, engine.ticks) + _U32.pack(engine.state['high_score']))
+
+    def close(self, engine=None):
+        """Writes the end record (with the engine's final tick when given) and closes the stream."""
+        if engine is not None: self._write(_RECORD.pack(TANK_REPLAY_KIND_END, engine.ticks))
+        self.stream.close()
+
+
+class TankReplay:
+    """A parsed replay log. `seek(tick)` returns a TankEngine exactly as the recorded one was before step `tick`.
+
+    Playback engines run at the tick interval the log was recorded with, whatever the live rooms use. `levels` is an
+    optional TankLevelCache.
+    """
+
+    def __init__(self, data, levels=None):
+        magic, version, self.seed, self.tick_interval, flags, budget, self.keyframe_interval = _HEADER.unpack_from(data, 0)
+        if magic != TANK_REPLAY_MAGIC or version != TANK_REPLAY_VERSION: raise ValueError("not a tank replay log (or an unsupported version)")
+        self.navigation = bool(flags & TANK_REPLAY_FLAG_NAVIGATION)
+        self.ai_think_budget = None if budget < 0 else budget
+        self.levels = levels
+        self.clients = []
+        self.records = []  # (tick, kind, value) in log order; keyframes keep their compressed blob until restored
+        self.keyframes = []  # (tick, index into records)
+        self.end_tick = 0
+        self._parse(data, _HEADER.size)
+        if not self.keyframes: raise ValueError("replay log has no keyframe")
+
+    @classmethod
+    def load(cls, path, levels=None):
+        with open(path, 'rb') as f: return cls(f.read(), levels)
+
+    def _parse(self, data, offset):
+        size = len(data)
+        while offset + _RECORD.size <= size:
+            kind, tick = _RECORD.unpack_from(data, offset); start = offset; offset += _RECORD.size
+            try:
+                if kind == TANK_REPLAY_KIND_CLIENT:
+                    length = data[offset]; name = bytes(data[offset + 1:offset + 1 + length])
+                    if len(name) < length: break
+                    offset += 1 + length; self.clients.append(name.decode('utf-8', 'replace')); continue
+                if kind == TANK_REPLAY_KIND_INPUTS:
+                    count = data[offset]; offset += 1; inputs = {}
+                    for _ in range(count):
+                        index, n = _CLIENT_INPUTS.unpack_from(data, offset); offset += _CLIENT_INPUTS.size
+                        inputs[self.clients[index]] = [(None if seq == _NO_SEQ else seq, TANK_INPUT_ACTIONS[action],
+                                                       None if direction == _NO_DIRECTION else TANK_REPLAY_DIRECTIONS[direction])
+                                                      for seq, action, direction in _INPUT.iter_unpack(data[offset:offset + n * _INPUT.size])]
+                        offset += n * _INPUT.size
+                    count, = _U16.unpack_from(data, offset); offset += _U16.size
+                    departed = [self.clients[index] for index, in _U16.iter_unpack(data[offset:offset + count * _U16.size])]
+                    if len(departed) < count: break
+                    offset += count * _U16.size; value = (inputs, departed)
+                    self.end_tick = max(self.end_tick, tick + 1)
+                elif kind == TANK_REPLAY_KIND_RESET:
+                    value, = _U32.unpack_from(data, offset); offset += _U32.size
+                elif kind == TANK_REPLAY_KIND_KEYFRAME:
+                    length, = _U32.unpack_from(data, offset); offset += _U32.size
+                    value = bytes(data[offset:offset + length])
+                    if len(value) < length: break
+                    offset += length; self.keyframes.append((tick, len(self.records)))
+                elif kind == TANK_REPLAY_KIND_END:
+                    value = None
+                else:
+                    raise ValueError(f"unknown replay record kind {kind} at byte {start}")
+            except (struct.error, IndexError):
+                break  # Truncated tail of a log whose writer never closed it
+            self.records.append((tick, kind, value)); self.end_tick = max(self.end_tick, tick)
+
+    def _restore(self, position):
+        tick, index = self.keyframes[position]
+        rng_state, state = pickle.loads(zlib.decompress(self.records[index][2]))
+        engine = TankEngine(seed=self.seed, levels=self.levels, navigation=self.navigation, ai_think_budget=self.ai_think_budget,
+                            tick_interval=self.tick_interval)
+        engine.rng.setstate(rng_state); engine.state = state; engine.ticks = tick
+        return engine, index + 1
+
+    def seek(self, tick, from_start=False):
+        """Engine after `tick` steps (and any reset logged before step `tick`), re-simulated from the nearest keyframe.
+
+        With `from_start=True` it is re-simulated from the first keyframe instead, which checks the whole log.
+        """
+        tick = max(self.keyframes[0][0], min(tick, self.end_tick))
+        position = 0 if from_start else max(i for i, (keyframe_tick, _) in enumerate(self.keyframes) if keyframe_tick <= tick)
+        engine, index = self._restore(position)
+        for record_tick, kind, value in self.records[index:]:
+            if record_tick > tick or (record_tick == tick and kind == TANK_REPLAY_KIND_INPUTS): break
+            while engine.ticks < record_tick: engine.step()
+            if kind == TANK_REPLAY_KIND_INPUTS: engine.step(*value)
+            elif kind == TANK_REPLAY_KIND_RESET: engine.reset(value)
+        while engine.ticks < tick: engine.step()
+        return engine
+
+    def play(self):
+        """Engine at the end of the log, replayed from its first keyframe."""
+        return self.seek(self.end_tick, from_start=True)
+
+    def get_stats(self):
+        return {'ticks': self.end_tick, 'records': len(self.records), 'keyframes': len(self.keyframes), 'clients': len(self.clients)}
@@ -0,0 +1,80 @@
+"""Uniform-grid spatial index for the tank arena.
+
+Entities live in named layers. A layer is rebuilt from a list of entities and queried with an AABB; queries return the
+overlapping entities in their original list order, so swapping a linear scan for a grid query never changes which
+entity a collision resolves against.
+"""
+import math
+
+
+def tank_entity_bbox(entity):
+    """Bounding box of a rectangle entity (obstacle, target) as an (x, y, width, height) tuple."""
+    return (entity['x'], entity['y'], entity['width'], entity['height'])
+
+
+class TankSpatialGrid:
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size
+        self.cols = max(1, int(math.ceil(width / cell_size)))
+        self.rows = max(1, int(math.ceil(height / cell_size)))
+        self.layers = {}  # layer name -> (entities, {cell index: [entity index, ...]}, [bbox tuple, ...])
+
+    def _cell_span(self, x, y, w, h):
+        """Clamped (col0, col1, row0, row1) covered by a box; the arena edge cells absorb anything outside it."""
+        cs = self.cell_size; last_col = self.cols - 1; last_row = self.rows - 1
+        c0 = int(x // cs); c1 = int((x + w) // cs); r0 = int(y // cs); r1 = int((y + h) // cs)
+        c0 = 0 if c0 < 0 else (last_col if c0 > last_col else c0); c1 = 0 if c1 < 0 else (last_col if c1 > last_col else c1)
+        r0 = 0 if r0 < 0 else (last_row if r0 > last_row else r0); r1 = 0 if r1 < 0 else (last_row if r1 > last_row else r1)
+        return c0, c1, r0, r1
+
+    def build(self, name, entities, bbox_of=tank_entity_bbox):
+        """(Re)buckets `entities` into layer `name`. Static layers are built once per level, moving ones every tick."""
+        cells = {}; boxes = []; cols = self.cols
+        for index, entity in enumerate(entities):
+            box = bbox_of(entity); boxes.append(box)
+            c0, c1, r0, r1 = self._cell_span(*box)
+            for row in range(r0, r1 + 1):
+                for cell in range(row * cols + c0, row * cols + c1 + 1):
+                    bucket = cells.get(cell)
+                    if bucket is None: cells[cell] = [index]
+                    else: bucket.append(index)
+        self.layers[name] = (entities, cells, boxes)
+
+    def source(self, name):
+        """The entity list layer `name` was built from, or None. Lets callers rebuild only when the list was replaced."""
+        layer = self.layers.get(name)
+        return layer[0] if layer else None
+
+    def query(self, name, x, y, w, h):
+        """Entities in layer `name` whose bbox overlaps (x, y, w, h), in list order."""
+        layer = self.layers.get(name)
+        if layer is None: return []
+        entities, cells, boxes = layer
+        c0, c1, r0, r1 = self._cell_span(x, y, w, h)
+        if c0 == c1 and r0 == r1:  # Common case for bullets: one cell, whose bucket is already in list order
+            hits = []
+            for index in cells.get(r0 * self.cols + c0, ()):
+                bx, by, bw, bh = boxes[index]
+                if x < bx + bw and x + w > bx and y < by + bh and y + h > by: hits.append(entities[index])
+            return hits
+        found = set()
+        for row in range(r0, r1 + 1):
+            for cell in range(row * self.cols + c0, row * self.cols + c1 + 1):
+                for index in cells.get(cell, ()):
+                    if index in found: continue
+                    bx, by, bw, bh = boxes[index]
+                    if x < bx + bw and x + w > bx and y < by + bh and y + h > by: found.add(index)
+        return [entities[index] for index in sorted(found)]
+
+    def any_hit(self, name, x, y, w, h):
+        """True if anything in layer `name` overlaps (x, y, w, h); cheaper than query() when the hit itself is unused."""
+        layer = self.layers.get(name)
+        if layer is None: return False
+        _, cells, boxes = layer
+        c0, c1, r0, r1 = self._cell_span(x, y, w, h)
+        for row in range(r0, r1 + 1):
+            for cell in range(row * self.cols + c0, row * self.cols + c1 + 1):
+                for index in cells.get(cell, ()):
+                    bx, by, bw, bh = boxes[index]
+                    if x < bx + bw and x + w > bx and y < by + bh and y + h > by: return True
+        return False